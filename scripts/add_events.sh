@@ -11,9 +11,9 @@ if ! command -v python3 &> /dev/null; then
 fi
 
 # Check if required packages are installed
-if ! python3 -c "import google, pandas" &> /dev/null; then
+if ! python3 -c "import google, googleapiclient, google_auth_oauthlib" &> /dev/null; then
     echo "Installing required packages..."
-    pip install google-auth google-auth-oauthlib google-api-python-client pandas
+    pip install google-auth google-auth-oauthlib google-api-python-client
 fi
 
 # Check if credentials file exists
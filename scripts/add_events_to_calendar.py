@@ -7,21 +7,24 @@ Requirements:
 - google-auth
 - google-auth-oauthlib
 - google-api-python-client
-- pandas
 
-Install with: pip install google-auth google-auth-oauthlib google-api-python-client pandas
+Install with: pip install google-auth google-auth-oauthlib google-api-python-client
 """
 
 import os
 import sys
+import csv
+import time
+import hashlib
 import argparse
-import pandas as pd
+import itertools
 from datetime import datetime
 from google.oauth2.service_account import Credentials
 from google.oauth2.credentials import Credentials as UserCredentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import pickle
 
 # Google Calendar API settings
@@ -29,6 +32,10 @@ SCOPES = ['https://www.googleapis.com/auth/calendar']
 CALENDAR_ID = '8d4036a00ad9265a9e585749fed4f2c2ecebad265c42789dbb1f9f5042191859@group.calendar.google.com'
 TOKEN_FILE = 'token.pickle'
 CREDENTIALS_FILE = 'credentials.json'  # OAuth client ID credentials
+BATCH_SIZE = 50  # Calendar API limit for requests in one batch
+MAX_RETRIES = 5  # Retries for rate-limited or failed requests
+EVENT_KEY_PROPERTY = 'csvEventKey'  # Private extended property holding the row key
+REQUIRED_COLUMNS = ['summary', 'start_date', 'start_time', 'end_date', 'end_time', 'location', 'organizer']
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -67,14 +74,54 @@ def get_credentials():
     
     return creds
 
+def row_error(row):
+    """Return a description of what is wrong with a CSV row, or None if it is usable."""
+    if not row['summary']:
+        return "summary is empty"
+    for column, date_format in (('start_date', '%Y-%m-%d'), ('end_date', '%Y-%m-%d'),
+                                ('start_time', '%H:%M'), ('end_time', '%H:%M')):
+        try:
+            datetime.strptime(row[column], date_format)
+        except ValueError:
+            return f"{column} {row[column]!r} does not match {date_format}"
+    return None
+
+def read_rows(reader):
+    """
+    Yield the valid rows of a csv.DictReader one at a time.
+    Bad rows are reported with their line number and skipped.
+    """
+    for row in reader:
+        if None in row or None in row.values():
+            print(f"Skipping line {reader.line_num}: expected {len(reader.fieldnames)} columns")
+            continue
+        row = {column: value.strip() for column, value in row.items()}
+        error = row_error(row)
+        if error:
+            print(f"Skipping line {reader.line_num}: {error}")
+            continue
+        yield row
+
+def event_key(row):
+    """
+    Return a stable key for a CSV row, derived from its title, start date and start time.
+    Hex digits are valid base32hex, so the key doubles as the Google Calendar event ID
+    and a rerun with the same row updates the existing event instead of duplicating it.
+    """
+    identity = '|'.join(str(row[col]).strip() for col in ('summary', 'start_date', 'start_time'))
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
 def create_event(row, timezone='America/Phoenix'):
     """Create a Google Calendar event from a CSV row."""
+    key = event_key(row)
+
     # Format datetime strings
     start_datetime = f"{row['start_date']}T{row['start_time']}:00"
     end_datetime = f"{row['end_date']}T{row['end_time']}:00"
     
     # Create event object
     event = {
+        'id': key,
         'summary': row['summary'],
         'location': row['location'],
         'description': f"Organizer: {row['organizer']}",
@@ -86,16 +133,71 @@ def create_event(row, timezone='America/Phoenix'):
             'dateTime': end_datetime,
             'timeZone': timezone,
         },
+        'extendedProperties': {
+            'private': {EVENT_KEY_PROPERTY: key},
+        },
     }
     
     return event
 
+def is_retryable(error):
+    """Return True for rate-limit and transient server errors."""
+    status = error.resp.status
+    if status == 429 or status >= 500:
+        return True
+    return status == 403 and b'ratelimitexceeded' in (error.content or b'').lower()
+
+def execute_in_batches(service, calls):
+    """
+    Execute API calls as batch HTTP requests of up to BATCH_SIZE calls each.
+    calls maps a request ID to a function returning a fresh HttpRequest.
+    Rate-limited calls are retried with exponential backoff.
+    Returns ({request_id: response}, {request_id: HttpError}).
+    """
+    results = {}
+    errors = {}
+    pending = dict(calls)
+    
+    for attempt in range(MAX_RETRIES + 1):
+        retry = {}
+        
+        def callback(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+            elif is_retryable(exception) and attempt < MAX_RETRIES:
+                retry[request_id] = pending[request_id]
+            else:
+                errors[request_id] = exception
+        
+        request_ids = list(pending)
+        for start in range(0, len(request_ids), BATCH_SIZE):
+            chunk = request_ids[start:start + BATCH_SIZE]
+            batch = service.new_batch_http_request(callback=callback)
+            for request_id in chunk:
+                batch.add(pending[request_id](), request_id=request_id)
+            try:
+                batch.execute()
+            except HttpError as e:
+                # The whole batch was rejected, so every call in it is retried or failed
+                for request_id in chunk:
+                    callback(request_id, None, e)
+        
+        if not retry:
+            break
+        delay = 2 ** attempt
+        print(f"Rate limited on {len(retry)} requests, retrying in {delay}s...")
+        time.sleep(delay)
+        pending = retry
+    
+    return results, errors
+
 def add_events_to_calendar(events, dry_run=False):
     """Add events to Google Calendar."""
     if dry_run:
         print("DRY RUN - Events will not be added to calendar")
         for event in events:
             print(f"Event: {event['summary']}")
+            print(f"  ID: {event['id']}")
             print(f"  Start: {event['start']['dateTime']}")
             print(f"  End: {event['end']['dateTime']}")
             print(f"  Location: {event['location']}")
@@ -106,14 +208,52 @@ def add_events_to_calendar(events, dry_run=False):
     # Get credentials and build service
     creds = get_credentials()
     service = build('calendar', 'v3', credentials=creds)
+    upsert_events(service, events)
+
+def upsert_events(service, events):
+    """
+    Upsert events, BATCH_SIZE at a time.
+    events can be any iterable; only one chunk is held in memory.
+    """
+    events = iter(events)
+    while True:
+        chunk = list(itertools.islice(events, BATCH_SIZE))
+        if not chunk:
+            break
+        upsert_chunk(service, chunk)
+
+def upsert_chunk(service, events):
+    """
+    Insert events under their deterministic IDs.
+    Events that already exist (409 Conflict) are updated in a second pass.
+    """
+    events_by_id = {event['id']: event for event in events}
     
-    # Add each event
-    for event in events:
-        try:
-            created_event = service.events().insert(calendarId=CALENDAR_ID, body=event).execute()
-            print(f"Event created: {event['summary']} ({created_event['htmlLink']})")
-        except Exception as e:
-            print(f"Error creating event {event['summary']}: {e}")
+    inserts = {
+        event_id: lambda event=event: service.events().insert(calendarId=CALENDAR_ID, body=event)
+        for event_id, event in events_by_id.items()
+    }
+    created, errors = execute_in_batches(service, inserts)
+    for event_id, created_event in created.items():
+        print(f"Event created: {events_by_id[event_id]['summary']} ({created_event['htmlLink']})")
+    
+    # Already added by an earlier run; an update also restores events deleted in the calendar
+    existing_ids = [event_id for event_id, e in errors.items() if e.resp.status == 409]
+    updates = {
+        event_id: lambda event_id=event_id: service.events().update(
+            calendarId=CALENDAR_ID, eventId=event_id,
+            body=dict(events_by_id[event_id], status='confirmed'))
+        for event_id in existing_ids
+    }
+    updated, update_errors = execute_in_batches(service, updates)
+    for event_id, updated_event in updated.items():
+        print(f"Event updated: {events_by_id[event_id]['summary']} ({updated_event['htmlLink']})")
+    
+    for event_id in existing_ids:
+        del errors[event_id]
+    errors.update(update_errors)
+    for event_id, e in errors.items():
+        print(f"Error creating event {events_by_id[event_id]['summary']}: {e}")
 
 def main():
     """Main function."""
@@ -124,26 +264,21 @@ def main():
         print(f"Error: File {args.file} not found!")
         sys.exit(1)
     
-    # Read CSV file
-    try:
-        df = pd.read_csv(args.file)
-        print(f"Found {len(df)} events in {args.file}")
-    except Exception as e:
-        print(f"Error reading CSV file: {e}")
-        sys.exit(1)
-    
-    # Check required columns
-    required_columns = ['summary', 'start_date', 'start_time', 'end_date', 'end_time', 'location', 'organizer']
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        print(f"Error: CSV file is missing required columns: {', '.join(missing_columns)}")
-        sys.exit(1)
-    
-    # Create events
-    events = [create_event(row) for _, row in df.iterrows()]
-    
-    # Add events to calendar
-    add_events_to_calendar(events, args.dry_run)
+    # utf-8-sig drops the byte order mark spreadsheet programs add
+    with open(args.file, newline='', encoding='utf-8-sig') as csv_file:
+        reader = csv.DictReader(csv_file)
+        
+        # Check required columns
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in (reader.fieldnames or [])]
+        if missing_columns:
+            print(f"Error: CSV file is missing required columns: {', '.join(missing_columns)}")
+            sys.exit(1)
+        
+        # Rows are read, validated and turned into events as the uploader consumes them
+        events = (create_event(row) for row in read_rows(reader))
+        
+        # Add events to calendar
+        add_events_to_calendar(events, args.dry_run)
     
     print("Done!")
 
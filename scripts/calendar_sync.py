@@ -0,0 +1,733 @@
+#!/usr/bin/env python3
+"""
+Imports events from the Google Calendar iCal feeds into events.json.
+
+sync() fetches the configured feeds, parses them, matches the calendar events
+with the events already in events.json, saves the result and returns a
+SyncDelta saying what changed. It can be called in-process (the event editor
+does, from a worker thread, so it can merge the delta into its unsaved events);
+import-calendar.py is the command line front end.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+import pytz
+import os
+import threading
+import contextlib
+from dataclasses import dataclass, field
+
+from ical_stream import iter_events, collect_events, UNKNOWN_OCCURRENCES
+from event_time import sort_key
+import event_archive
+import event_classifier
+import event_feed
+import geocoder
+import event_registry
+import event_snapshot
+import event_store
+
+# Build paths relative to the script's location
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+
+# Configuration
+ICAL_URL = "https://calendar.google.com/calendar/ical/f81dd042d9553c506027f96a0335662281bfcb7c772ee33f7f5629f6294779e3%40group.calendar.google.com/public/basic.ics"
+# List of calendars to import ({"name", "url"} plus optional "organizer"/"timeout").
+# Falls back to ICAL_URL alone when the file does not exist.
+FEEDS_FILE = os.path.join(SCRIPT_DIR, "feeds.json")
+OUTPUT_FILE = os.path.join(BASE_DIR, "themes/mcp-theme/data/events.json")
+TIMEZONE = "America/Phoenix"
+DEFAULT_IMAGE = "/images/demo.png"
+DEFAULT_FEED_NAME = "Take Action Tucson"
+DEFAULT_ORGANIZER = {"name": "Take Action Tucson", "email": "contact@takeactiontucson.org", "phone": "(520) 555-0123"}
+FETCH_MONTHS = 4
+
+# Local copy of the last feed we downloaded from each calendar, plus the
+# validators Google sent with it, so scheduled runs can ask "has anything
+# changed?" cheaply.
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache")
+FEED_CACHE_DIR = os.path.join(CACHE_DIR, "feeds")
+# calendarUid -> SEQUENCE / LAST-MODIFIED / hash of the fields we imported
+SYNC_STATE_FILE = os.path.join(CACHE_DIR, "sync_state.json")
+REQUEST_TIMEOUT = 30
+REQUEST_RETRIES = 3
+MAX_CONCURRENT_FEEDS = 8
+# Stages passed to sync()'s on_stage callback, in order. A cancelled sync stops
+# at the next stage before "save"; once saving has started it runs to the end.
+STAGES = ("fetch", "parse", "match", "save", "geocode")
+CANCELLABLE_STAGES = ("fetch", "parse", "match")
+
+# Output and progress hooks of the sync() call in progress; the lock allows one at a time
+_sync_lock = threading.Lock()
+_log = print
+_on_stage = None
+_cancel = None
+
+
+class SyncCancelled(Exception):
+    """Raised by sync() when it was cancelled before anything was saved."""
+
+
+@dataclass
+class EventUpdate:
+    """Fields of one event that changed upstream; keys may be dotted, e.g. "location.name"."""
+    uid: str
+    title: str
+    fields: dict
+
+
+@dataclass
+class SyncDelta:
+    """What a sync() changed in events.json."""
+    added: list = field(default_factory=list)  # New events, as saved (with ids and registry references)
+    updated: list = field(default_factory=list)  # EventUpdate per event changed upstream
+    deleted: list = field(default_factory=list)  # Upcoming events that were removed from their calendar
+    matched: dict = field(default_factory=dict)  # Event id -> calendar UID, for events linked to the calendar
+    skipped: list = field(default_factory=list)  # UIDs of known events unchanged upstream
+    archived: list = field(default_factory=list)  # Ids of ended events moved to the archive
+    failed_feeds: list = field(default_factory=list)  # Names of the feeds that could not be imported
+
+    @property
+    def changed(self):
+        """True when events.json was rewritten."""
+        return bool(self.added or self.updated or self.deleted or self.matched or self.archived)
+
+def log(message=""):
+    """Print a line of progress output, or pass it to sync()'s log callback."""
+    _log(message)
+
+def report_stage(stage):
+    """Tell sync()'s caller that a stage started; raises SyncCancelled if it was cancelled meanwhile."""
+    if _cancel is not None and _cancel.is_set() and stage in CANCELLABLE_STAGES:
+        raise SyncCancelled("The calendar update was cancelled.")
+    if _on_stage is not None:
+        _on_stage(stage)
+
+def load_feeds():
+    """Load the list of calendar feeds to import."""
+    if not os.path.exists(FEEDS_FILE):
+        return [{"name": DEFAULT_FEED_NAME, "url": ICAL_URL}]
+
+    with open(FEEDS_FILE, 'r', encoding='utf-8') as f:
+        feeds = json.load(f).get("feeds", [])
+    for feed in feeds:
+        if not feed.get("name") or not feed.get("url"):
+            raise ValueError(f"Every feed in {FEEDS_FILE} needs a name and a url: {feed}")
+    return feeds
+
+def create_session(pool_size):
+    """Create a requests session with connection pooling and retries for transient errors."""
+    retry = Retry(
+        total=REQUEST_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = "gzip"
+    return session
+
+def feed_cache_paths(url):
+    """Return the (body, metadata) cache file paths for a feed URL."""
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(FEED_CACHE_DIR, f"{key}.ics"), os.path.join(FEED_CACHE_DIR, f"{key}.json")
+
+def load_feed_cache(url):
+    """Return (body, meta) for the cached feed, or (None, {}) if there is no usable cache."""
+    body_file, meta_file = feed_cache_paths(url)
+    if not os.path.exists(body_file):
+        return None, {}
+
+    meta = {}
+    try:
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        meta = {}
+
+    # Validators only mean something for the URL they were issued for.
+    if meta.get("url") != url:
+        meta = {}
+
+    with open(body_file, 'r', encoding='utf-8') as f:
+        return f.read(), meta
+
+def save_feed_cache(url, body, etag, last_modified):
+    """Store the downloaded feed and its validators for the next run."""
+    body_file, meta_file = feed_cache_paths(url)
+    os.makedirs(FEED_CACHE_DIR, exist_ok=True)
+    tmp_file = body_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(body)
+    os.replace(tmp_file, body_file)
+
+    meta = {
+        "url": url,
+        "etag": etag,
+        "lastModified": last_modified,
+        "fetched": datetime.now().isoformat() + "Z",
+    }
+    with open(meta_file, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+def fetch_ical_data(session, feed, force=False):
+    """
+    Fetch iCal data for one feed.
+    Sends the cached ETag/Last-Modified validators so an unchanged feed costs a
+    single 304 response. Returns (feed text, validators), or (None, None) if the
+    feed has not changed. The caller stores the validators with save_feed_cache()
+    once the feed has been processed successfully.
+    """
+    url = feed["url"]
+    cached_body, meta = (None, {}) if force else load_feed_cache(url)
+
+    headers = {}
+    if cached_body is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("lastModified"):
+            headers["If-Modified-Since"] = meta["lastModified"]
+
+    response = session.get(url, headers=headers, timeout=feed.get("timeout", REQUEST_TIMEOUT))
+    if response.status_code == 304:
+        log(f"[{feed['name']}] Calendar feed has not changed since the last sync.")
+        return None, None
+    response.raise_for_status()
+    response.encoding = "utf-8"  # RFC 5545 feeds are UTF-8 even when the header omits the charset
+
+    log(f"[{feed['name']}] Downloaded {len(response.content)} bytes of calendar data.")
+    return response.text, (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+def read_offline_ical_data(feed, ical_file=None):
+    """Read iCal data from a local file, defaulting to the cached copy of the feed."""
+    path = ical_file or feed_cache_paths(feed["url"])[0]
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No offline calendar data at {path}. Run once online or pass --ical-file.")
+    log(f"[{feed['name']}] Reading calendar data from {path} (offline)...")
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def get_import_window(tz):
+    """Return (now, future_limit): the range of start times that get imported."""
+    now = datetime.now(tz)
+    return now, now + timedelta(days=30 * FETCH_MONTHS)
+
+def load_feed(feed, session, parse_pool, window, offline=False, ical_file=None, force=False):
+    """
+    Fetch (or read offline) and parse one feed. Runs on a worker thread.
+    Returns a result dict; "ical_data" is None when the feed is unchanged, and
+    "error" is set instead of raising so one bad feed cannot stop the others.
+    """
+    result = {"feed": feed, "ical_data": None, "validators": None, "events": [], "uids": set(), "error": None}
+    try:
+        if offline or ical_file:
+            result["ical_data"] = read_offline_ical_data(feed, ical_file)
+        else:
+            result["ical_data"], result["validators"] = fetch_ical_data(session, feed, force=force)
+        if result["ical_data"] is None:
+            return result
+
+        report_stage("parse")
+        tz = pytz.timezone(TIMEZONE)
+        now, future_limit = window
+        if parse_pool is not None:
+            future = parse_pool.submit(collect_events, result["ical_data"], tz, now, future_limit)
+            result["events"], result["uids"] = future.result()
+        else:
+            result["events"], result["uids"] = collect_events(result["ical_data"], tz, now, future_limit)
+    except SyncCancelled:
+        raise
+    except Exception as e:
+        log(f"[{feed['name']}] Error: {e}")
+        result["error"] = e
+    return result
+
+def load_all_feeds(feeds, window, session=None, **source):
+    """
+    Fetch and parse all feeds concurrently over one pooled session.
+    Parsing is CPU-bound, so with more than one feed it is handed to a process
+    pool; total time tracks the slowest feed rather than the sum of all feeds.
+    A session passed in (see create_session) is used and left open, so a
+    long-running caller keeps its connections; otherwise one is made per call.
+    """
+    workers = max(1, min(MAX_CONCURRENT_FEEDS, len(feeds)))
+    report_stage("fetch")
+    log(f"Fetching {len(feeds)} calendar feed(s)...")
+    with contextlib.nullcontext(session) if session is not None else create_session(workers) as session:
+        parse_pool = None
+        if len(feeds) > 1:
+            # forkserver: workers must not be forked from this (threaded) process
+            context = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None)
+            parse_pool = ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1), mp_context=context)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(lambda feed: load_feed(feed, session, parse_pool, window, **source), feeds))
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown()
+
+def load_sync_state():
+    """Load the per-UID sync state recorded by previous runs."""
+    try:
+        with open(SYNC_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get("events", {})
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {}
+
+def save_sync_state(sync_state):
+    """Save the per-UID sync state for the next run."""
+    event_store.write_json(SYNC_STATE_FILE, {"events": sync_state}, backups=0)
+
+def calendar_event_fields(cal_event, tz):
+    """Return the fields of a JSON event that are imported from a calendar event."""
+    # For all-day events we avoid timezone conversion to preserve the literal calendar date.
+    if cal_event.all_day:
+        start_dt_raw = cal_event.begin  # midnight of the literal calendar date
+        start_date_str = start_dt_raw.strftime("%Y-%m-%d")
+
+        # For all-day events, iCal DTEND is exclusive; subtract one day to get true end.
+        if cal_event.end:
+            true_end = cal_event.end - timedelta(days=1)
+        else:
+            true_end = start_dt_raw
+
+        end_date_str = true_end.strftime("%Y-%m-%d")
+
+        start_time_str = "00:00"
+        end_time_str = "23:59"
+    else:
+        start_dt = cal_event.begin.astimezone(tz)
+        end_dt = cal_event.end.astimezone(tz) if cal_event.end else start_dt + timedelta(hours=1)
+
+        start_date_str = start_dt.strftime("%Y-%m-%d")
+        end_date_str = end_dt.strftime("%Y-%m-%d")
+        start_time_str = start_dt.strftime("%H:%M")
+        end_time_str = end_dt.strftime("%H:%M")
+
+    return {
+        "title": cal_event.name or "Untitled Event",
+        "description": cal_event.description or "",
+        "startDate": start_date_str,
+        "dayOfWeek": datetime.strptime(start_date_str, "%Y-%m-%d").strftime("%A"),
+        "startTime": start_time_str,
+        "endDate": end_date_str,
+        "endTime": end_time_str,
+        "allDay": cal_event.all_day or False,
+        "location.name": cal_event.location if cal_event.location else "TBD",
+        "location.address": cal_event.location if cal_event.location else "",
+    }
+
+def fields_hash(fields):
+    """Stable content hash of a calendar_event_fields() dict."""
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def sync_state_entry(cal_event, fields, source):
+    """Build the sync state entry recorded for an imported calendar event."""
+    return {
+        "source": source,
+        "sequence": cal_event.sequence,
+        "lastModified": cal_event.last_modified,
+        "hash": fields_hash(fields),
+        "fields": fields,
+    }
+
+def set_field(event, key, value):
+    """Set a possibly dotted key (e.g. 'location.name') on a JSON event."""
+    keys = key.split('.')
+    for k in keys[:-1]:
+        if not isinstance(event.get(k), dict):
+            event[k] = {}
+        event = event[k]
+    event[keys[-1]] = value
+
+def print_feed_listing(ical_data, tz):
+    """Print every event in the feed sorted by title (debugging aid for --verbose)."""
+    log("\n--- All Events Found in Calendar Feed (Sorted by Title) ---")
+    listing = sorted((event.name or '', event.begin, event.all_day) for event in iter_events(ical_data, tz))
+    for name, begin, all_day in listing:
+        start_dt_str = 'All-day event' if all_day else begin.strftime('%Y-%m-%d %H:%M')
+        log(f"  - Found: {name} (Starts: {start_dt_str})")
+    log("----------------------------------------------------------\n")
+
+def match_untagged_events(existing_events, cal_events, tz):
+    """
+    Pair the JSON events that have no calendarUid with calendar events that
+    start on the same local date and HH:MM and whose title contains the JSON
+    event's title, ignoring case. Each calendar UID is used at most once; the
+    first unused match in feed order wins. Returns (JSON event, calendar event)
+    pairs in the order of existing_events; nothing is modified.
+    """
+    # Index the candidates once by local (date, HH:MM) with lower-cased titles, so
+    # each JSON event only looks at calendar events starting in the same minute.
+    cal_events_by_slot = {}
+    for cal_event in cal_events:
+        start_dt_cal = cal_event.begin.astimezone(tz)
+        slot = (start_dt_cal.strftime("%Y-%m-%d"), start_dt_cal.strftime("%H:%M"))
+        cal_title = cal_event.name.lower() if cal_event.name else ""
+        cal_events_by_slot.setdefault(slot, []).append((cal_title, cal_event))
+
+    pairs = []
+    used_uids = set()
+    for event_json in existing_events:
+        if event_json.get("calendarUid"):
+            continue
+
+        # Fuzzy match based on date, time, and title substring.
+        # More robust time matching: compare only the HH:MM part.
+        json_time = event_json.get("startTime", "")
+        if not json_time or len(json_time) < 5:
+            continue
+        candidates = cal_events_by_slot.get((event_json.get("startDate"), json_time[:5]))
+        if not candidates:
+            continue
+
+        json_title = event_json.get("title", "").lower()
+        for cal_title, cal_event in candidates:
+            if cal_event.uid in used_uids:
+                continue
+            if json_title in cal_title:
+                pairs.append((event_json, cal_event))
+                used_uids.add(cal_event.uid)
+                break # Move to next JSON event
+    return pairs
+
+def parse_and_match_events(feed_results, existing_events, sync_state, window, verbose=False):
+    """
+    Compares the parsed feeds with existing events and the sync state.
+    feed_results are the load_feed() results for the feeds that changed.
+    Returns a SyncDelta; "added" holds the new events without ids yet. Updates
+    and matches are applied to existing_events in-place; deleted events are
+    only reported, and sync_state is updated in-place.
+    """
+    log("Parsing and matching calendar events...")
+    delta = SyncDelta()
+    new_events = delta.added
+    
+    tz = pytz.timezone(TIMEZONE)
+    now, future_limit = window
+    
+    if verbose:
+        for result in feed_results:
+            log(f"\n[{result['feed']['name']}]")
+            print_feed_listing(result["ical_data"], tz)
+    
+    log(f"Looking for events between {now.strftime('%Y-%m-%d')} and {future_limit.strftime('%Y-%m-%d')}")
+    
+    events_by_uid = {event["calendarUid"]: event for event in existing_events if event.get("calendarUid")}
+    existing_uids = set(events_by_uid)
+    log(f"Found {len(existing_uids)} existing events with UIDs.")
+
+    # Each feed was streamed one VEVENT at a time and anything outside the window
+    # was discarded by the parser; merge what is left, remembering the source.
+    feed_uids = set()
+    feeds_by_source = {result["feed"]["name"]: result["feed"] for result in feed_results}
+    parsed_sources = set(feeds_by_source)
+    source_by_uid = {}
+    unmatched_cal_events = []
+    for result in feed_results:
+        source = result["feed"]["name"]
+        feed_uids |= result["uids"]
+        for cal_event in result["events"]:
+            if source_by_uid.setdefault(cal_event.uid, source) != source:
+                continue # Also in an earlier feed; the first feed in feeds.json wins
+            if cal_event.uid not in existing_uids:
+                unmatched_cal_events.append(cal_event)
+                continue
+
+            # Known event: unchanged upstream if SEQUENCE and LAST-MODIFIED still match. Feeds
+            # that send no LAST-MODIFIED always "match", so those are compared by content below.
+            entry = sync_state.get(cal_event.uid)
+            if entry and entry.get("source") != source:
+                entry["source"] = source
+            if (entry and cal_event.last_modified is not None and entry.get("sequence") == cal_event.sequence
+                    and entry.get("lastModified") == cal_event.last_modified):
+                delta.skipped.append(cal_event.uid)
+                continue
+
+            fields = calendar_event_fields(cal_event, tz)
+            new_entry = sync_state_entry(cal_event, fields, source)
+            sync_state[cal_event.uid] = new_entry
+            if not entry or entry.get("hash") == new_entry["hash"]:
+                delta.skipped.append(cal_event.uid)
+                continue # First time we track it, or only the metadata changed
+
+            # Only overwrite the fields that changed upstream, so local edits to the
+            # other fields survive.
+            json_event = events_by_uid[cal_event.uid]
+            previous = entry.get("fields", {})
+            changed = [key for key, value in fields.items() if previous.get(key) != value]
+            for key in changed:
+                set_field(json_event, key, fields[key])
+            log(f"  ~ Updated '{fields['title']}' from calendar: {', '.join(changed)}")
+            delta.updated.append(EventUpdate(cal_event.uid, fields["title"], {key: fields[key] for key in changed}))
+
+    log(f"Found {len(unmatched_cal_events)} calendar events to process after filtering.")
+
+    # Try to match existing events that are missing a UID
+    matched_cal_events_by_uid = set()
+    for event_json, cal_event in match_untagged_events(existing_events, unmatched_cal_events, tz):
+        log(f"  ✓ Matched existing event '{event_json.get('title', '').lower()}' to calendar event. Adding UID: {cal_event.uid}")
+        event_json["calendarUid"] = cal_event.uid
+        sync_state[cal_event.uid] = sync_state_entry(cal_event, calendar_event_fields(cal_event, tz),
+                                                     source_by_uid[cal_event.uid])
+        matched_cal_events_by_uid.add(cal_event.uid)
+        delta.matched[event_json.get("id")] = cal_event.uid
+        existing_uids.add(cal_event.uid) # Add to set to prevent re-adding as new
+
+    # Add any remaining unmatched calendar events as new events
+    log("Identifying truly new events...")
+    classifier = event_classifier.load_classifier()
+    for cal_event in unmatched_cal_events:
+        if cal_event.uid in matched_cal_events_by_uid or cal_event.uid in existing_uids:
+            continue
+            
+        log(f"  + Found new event to add: {cal_event.name}")
+        source = source_by_uid[cal_event.uid]
+        fields = calendar_event_fields(cal_event, tz)
+        sync_state[cal_event.uid] = sync_state_entry(cal_event, fields, source)
+
+        location = {"name": fields["location.name"], "address": fields["location.address"], "city": "Tucson", "state": "AZ"}
+        # Category, tags, event types and featured come from the rules in classifier_rules.json
+        classified = classifier.classify({"title": cal_event.name, "description": cal_event.description,
+                                          "location": location})
+
+        json_event = {
+            "id": "event-placeholder-id",
+            "calendarUid": cal_event.uid,
+            "title": fields["title"],
+            "description": fields["description"] or f"Join us for {cal_event.name}",
+            "startDate": fields["startDate"],
+            "dayOfWeek": fields["dayOfWeek"],
+            "startTime": fields["startTime"],
+            "endDate": fields["endDate"],
+            "endTime": fields["endTime"],
+            "allDay": fields["allDay"],
+            "location": location,
+            "organizer": dict(feeds_by_source[source].get("organizer", DEFAULT_ORGANIZER)),
+            "image": DEFAULT_IMAGE, "eventType": classified["eventType"],
+            "category": classified["category"], "tags": classified["tags"], "cost": "free",
+            "registrationRequired": False, "registrationUrl": None, "capacity": None,
+            "status": "confirmed", "featured": classified["featured"],
+            "source": source
+        }
+        new_events.append(json_event)
+
+    # Upcoming events we imported that have disappeared from their feed were
+    # deleted upstream. Only feeds parsed in this run can tell us that, and an
+    # empty feed is never treated as "everything was deleted".
+    deleted_events = delta.deleted
+    if feed_uids:
+        today_str = now.strftime("%Y-%m-%d")
+        for uid, json_event in events_by_uid.items():
+            if uid in feed_uids or uid not in sync_state:
+                continue
+            series_uid = uid.rpartition("/")[0]
+            if series_uid and f"{series_uid}/{UNKNOWN_OCCURRENCES}" in feed_uids:
+                continue # The series could not be expanded this time, so its occurrences are kept
+            if sync_state[uid].get("source", DEFAULT_FEED_NAME) not in parsed_sources:
+                continue
+            if json_event.get("startDate", "") >= today_str:
+                log(f"  - Event was removed from the calendar: {json_event.get('title')}")
+                deleted_events.append(json_event)
+            del sync_state[uid]
+
+    # Forget UIDs that are no longer in events.json (e.g. deleted in the editor).
+    tracked_uids = existing_uids | {event["calendarUid"] for event in new_events}
+    for uid in [uid for uid in sync_state if uid not in tracked_uids]:
+        del sync_state[uid]
+        
+    log(f"\nFound {len(new_events)} new, {len(delta.updated)} updated and {len(deleted_events)} deleted events.")
+    return delta
+
+
+def load_existing_events(filename):
+    """Load existing events from the JSON file."""
+    if not os.path.exists(filename):
+        log("No existing events file found. Starting fresh.")
+        return []
+        
+    try:
+        data = event_snapshot.load_json(filename)
+        events = data.get("events", [])
+        log(f"Loaded {len(events)} existing events.")
+        return events
+    except (json.JSONDecodeError, FileNotFoundError):
+        log("Could not read or parse existing events file. Starting fresh.")
+        return []
+
+def get_next_event_id(existing_events):
+    """
+    Get the next available event ID. Archived events count too: an id they
+    still hold would make archive_events() skip the new event later.
+    """
+    event_ids = [event.get("id") or "event-0" for event in existing_events]
+    event_ids += event_archive.load_manifest()[0]["ids"]
+    max_id = 0
+    for event_id in event_ids:
+        try:
+            numeric_id = int(event_id.split("-")[-1])
+            if numeric_id > max_id:
+                max_id = numeric_id
+        except (ValueError, IndexError):
+            continue
+    return max_id + 1
+
+def create_json_output(events):
+    """Create the JSON output structure"""
+    output = {
+        "calendar": {
+            "name": "Take Action Tucson",
+            "lastUpdated": datetime.now().isoformat() + "Z",
+            "timezone": TIMEZONE
+        },
+        "events": events
+    }
+    
+    return output
+
+def save_json_file(data, filename):
+    """Save data to JSON file atomically, keeping a backup of the previous version"""
+    log(f"Saving {len(data['events'])} total events to {filename}")
+    event_feed.save_events(filename, data) # Also rewrites the templates' feed.json
+
+def update_events_file(changed, window, verbose=False):
+    """
+    Merge the parsed feeds into events.json and the sync state, move events that
+    have ended into the archive, and return the SyncDelta.
+    events.json stays locked from reading to writing, so a save from the event
+    editor cannot land in between and be overwritten.
+    """
+    report_stage("match")
+    with event_store.file_lock(OUTPUT_FILE):
+        # Load existing events and what we knew about them after the last run
+        existing_events = load_existing_events(OUTPUT_FILE)
+        sync_state = load_sync_state()
+        # Feed updates set location fields on the events, so work on resolved copies
+        registries = event_registry.load_registries()
+        for event in existing_events:
+            event_registry.resolve_event(event, registries)
+
+        # This function modifies existing_events and sync_state in place
+        if changed:
+            delta = parse_and_match_events(changed, existing_events, sync_state, window, verbose=verbose)
+        else:
+            delta = SyncDelta()
+        new_events = delta.added
+
+        # Combine, sort, and assign IDs
+        deleted_ids = {id(event) for event in delta.deleted}
+        kept_events = [event for event in existing_events if id(event) not in deleted_ids]
+        all_events = kept_events + new_events
+
+        # Refer to the shared organizer and venue records again, adding new ones before any event uses them
+        report_stage("save")
+        all_events = [event_registry.store_event(event, registries) for event in all_events]
+        registries.save()
+
+        # Keep only live events in events.json, ended ones go to the archive
+        live_events, archived = event_archive.archive_finished(all_events, window[0])
+        if archived:
+            live_ids = {id(event) for event in live_events}
+            delta.archived = [event.get("id") for event in all_events if id(event) not in live_ids]
+            log(f"Archived {archived} events that have ended.")
+
+        if not delta.changed:
+            log("No changes found; events.json is already up to date.")
+            if event_feed.refresh_feed():
+                log("Rewrote feed.json, which was older than events.json.")
+        else:
+            log(f"Adding {len(new_events)} new events to the list.")
+            live_events.sort(key=sort_key)
+
+            next_id = get_next_event_id(existing_events) # Pass original list to get starting ID
+            for event in live_events:
+                if event.get("id") == "event-placeholder-id":
+                    event["id"] = f"event-{next_id:03d}"
+                    next_id += 1
+            # Report the new events as saved, with their ids
+            added_uids = {event["calendarUid"] for event in new_events}
+            delta.added = [event for event in live_events if event.get("calendarUid") in added_uids]
+
+            json_data = create_json_output(live_events)
+
+            # Save to file
+            save_json_file(json_data, OUTPUT_FILE)
+
+        if changed:
+            save_sync_state(sync_state)
+    return delta
+
+def geocode_venues(offline):
+    """Add coordinates to the venues of events.json that have none (cached lookups only when offline)."""
+    report_stage("geocode")
+    events = event_snapshot.load_json(OUTPUT_FILE).get("events", [])
+    venue_geocoder = geocoder.Geocoder(offline=offline)
+    try:
+        updated = geocoder.geocode_venues(events, venue_geocoder, cancel=_cancel)
+    finally:
+        venue_geocoder.close()
+    if updated:
+        log(f"Added map coordinates to {updated} venues ({venue_geocoder.lookups} lookups).")
+
+def sync(offline=False, ical_file=None, force=False, verbose=False, geocode=True,
+         log=print, on_stage=None, cancel=None, session=None):
+    """
+    Import the calendar feeds into events.json and return a SyncDelta.
+
+    offline replays the cached feeds; ical_file reads the first feed from a
+    local .ics file instead (and implies offline). log receives each line of
+    progress output and on_stage the name of each stage (see STAGES) as it
+    starts. Setting the threading.Event cancel stops the sync with SyncCancelled
+    at the next stage, unless saving has already started; geocoding after the
+    save stops between two lookups. session is a requests session to fetch
+    with, e.g. from create_session(), kept open for the next call. Feeds that
+    fail are listed in the delta's failed_feeds; other errors are raised. When
+    no feed changed and no event has ended, events.json is not even read.
+    """
+    global _log, _on_stage, _cancel
+    with _sync_lock:
+        _log, _on_stage, _cancel = log, on_stage, cancel
+        try:
+            return _sync(offline, ical_file, force, verbose, geocode, session)
+        finally:
+            _log, _on_stage, _cancel = print, None, None
+
+def _sync(offline, ical_file, force, verbose, geocode, session):
+    feeds = load_feeds()
+    if ical_file:
+        feeds = feeds[:1]
+    offline = offline or ical_file is not None
+
+    # Fetch and parse all calendar data first; if no feed changed only archiving is left to do
+    tz = pytz.timezone(TIMEZONE)
+    window = get_import_window(tz)
+    results = load_all_feeds(feeds, window, session=session, offline=offline, ical_file=ical_file, force=force)
+    failed = [result["feed"]["name"] for result in results if result["error"] is not None]
+    changed = [result for result in results if result["error"] is None and result["ical_data"] is not None]
+    if not changed:
+        log("No calendar changes.")
+        if not event_feed.has_ended_events(window[0]):
+            # Nothing to merge or archive, so events.json, the registries and the venues are left alone
+            log("No events have ended either; events.json is already up to date.")
+            return SyncDelta(failed_feeds=failed)
+    delta = update_events_file(changed, window, verbose=verbose)
+    delta.failed_feeds = failed
+    if geocode and not (_cancel is not None and _cancel.is_set()):
+        geocode_venues(offline=offline)
+
+    # Only remember a feed once it has been fully processed, so a failed
+    # run is retried in full next time instead of being answered with a 304.
+    for result in changed:
+        if result["validators"] is not None:
+            save_feed_cache(result["feed"]["url"], result["ical_data"], *result["validators"])
+    return delta
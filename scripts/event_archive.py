@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Month-partitioned archive of past events.
+
+Archived events live in themes/mcp-theme/data/archive/YYYY-MM.json, one file
+per month of their start date, with events that have no usable date in
+undated.json. Archiving only rewrites the months it adds to, so the cost no
+longer grows with the whole history. manifest.json in the same directory maps
+every archived id to its month, which is how duplicates are detected without
+reading the partitions. Hugo loads the partitions as site.Data.archive; the
+archived-events.html partial merges them back into a single list.
+
+Usage:
+    python event_archive.py migrate   # Split the old completed_events.json into partitions
+    python event_archive.py rebuild   # Recreate the manifest from the partition files
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime, timezone
+
+import event_store
+from event_time import event_end, sort_key
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+
+ARCHIVE_DIR = os.path.join(BASE_DIR, "themes/mcp-theme/data/archive")
+MANIFEST_FILE = os.path.join(ARCHIVE_DIR, "manifest.json")
+LEGACY_FILE = os.path.join(BASE_DIR, "themes/mcp-theme/data/completed_events.json")  # Before partitioning
+UNDATED_PARTITION = "undated"
+CALENDAR_NAME = "Take Action Tucson Completed Events"
+
+_PARTITION_RE = re.compile(r"^(\d{4}-\d{2}|%s)\.json$" % UNDATED_PARTITION)
+
+
+def partition_of(event):
+    """Return the partition ("YYYY-MM" or "undated") an event is archived in."""
+    try:
+        start = datetime.strptime(event.get('startDate') or '', '%Y-%m-%d')
+    except ValueError:
+        return UNDATED_PARTITION
+    return start.strftime('%Y-%m')
+
+
+def partition_path(partition):
+    return os.path.join(ARCHIVE_DIR, f"{partition}.json")
+
+
+def partition_files():
+    """Return the paths of every partition file, oldest month first."""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    return [os.path.join(ARCHIVE_DIR, name) for name in sorted(os.listdir(ARCHIVE_DIR)) if _PARTITION_RE.match(name)]
+
+
+def read_partition(partition):
+    """Return the events stored in a partition, or [] if it does not exist."""
+    try:
+        with open(partition_path(partition), "r", encoding="utf-8") as f:
+            return json.load(f).get("events", [])
+    except FileNotFoundError:
+        return []
+
+
+def _write_partition(partition, events):
+    events.sort(key=sort_key)
+    data = {
+        "calendar": {"name": CALENDAR_NAME, "lastUpdated": datetime.now().isoformat() + "Z"},
+        "events": events,
+    }
+    event_store.write_json(partition_path(partition), data)
+
+
+def content_hash(event):
+    """Return a hash of an event's contents, which identifies archived events that have no id."""
+    return hashlib.sha1(json.dumps(event, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _file_info(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def load_manifest():
+    """
+    Return the manifest, {"partitions": {name: {"size", "mtime", "count"}},
+    "ids": {id: name}, "hashes": {content hash of an event without id: name}}.
+    Partitions whose file size or mtime no longer matches (edited by hand, or
+    written by an older tool) are re-read, so the manifest is always in step
+    with the files. The second value is True if the manifest had to be corrected.
+    """
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    manifest.setdefault("partitions", {})
+    manifest.setdefault("ids", {})
+    manifest.setdefault("hashes", {})
+
+    on_disk = {os.path.basename(path)[:-len(".json")]: _file_info(path) for path in partition_files()}
+    stale = {name for name, info in manifest["partitions"].items()
+             if name not in on_disk or {key: info.get(key) for key in ("size", "mtime")} != on_disk[name]}
+    stale |= on_disk.keys() - manifest["partitions"].keys()
+    if not stale:
+        return manifest, False
+
+    manifest["ids"] = {event_id: name for event_id, name in manifest["ids"].items() if name not in stale}
+    manifest["hashes"] = {digest: name for digest, name in manifest["hashes"].items() if name not in stale}
+    for name in stale:
+        manifest["partitions"].pop(name, None)
+        if name in on_disk:
+            _index_partition(manifest, name, read_partition(name))
+    return manifest, True
+
+
+def _index_partition(manifest, name, events):
+    # Edited events without id have a new hash; forget the old ones
+    manifest["hashes"] = {digest: partition for digest, partition in manifest["hashes"].items() if partition != name}
+    for event in events:
+        if event.get('id'):
+            manifest["ids"][event['id']] = name
+        else:
+            manifest["hashes"][content_hash(event)] = name
+    manifest["partitions"][name] = dict(_file_info(partition_path(name)), count=len(events))
+
+
+def _save_manifest(manifest):
+    manifest["partitions"] = dict(sorted(manifest["partitions"].items()))
+    manifest["ids"] = dict(sorted(manifest["ids"].items()))
+    manifest["hashes"] = dict(sorted(manifest["hashes"].items()))
+    event_store.write_json(MANIFEST_FILE, manifest, backups=0)
+
+
+def archive_events(events):
+    """
+    Add events to their month partitions, skipping ids that are already archived,
+    and events without id whose contents are. Only the partitions that gain events
+    are read and rewritten. Returns the number added.
+    """
+    with event_store.file_lock(MANIFEST_FILE):
+        manifest, changed = load_manifest()
+        by_partition = {}
+        seen = set()
+        for event in events:
+            key = event.get('id') or content_hash(event)
+            if key in seen or key in manifest["ids" if event.get('id') else "hashes"]:
+                continue
+            seen.add(key)
+            by_partition.setdefault(partition_of(event), []).append(event)
+
+        for name, new_events in sorted(by_partition.items()):
+            with event_store.file_lock(partition_path(name)):
+                merged = read_partition(name) + new_events
+                _write_partition(name, merged)
+                _index_partition(manifest, name, merged)
+        if by_partition or changed:
+            _save_manifest(manifest)
+    return sum(len(new_events) for new_events in by_partition.values())
+
+
+def update_archived(update):
+    """
+    Call update(events) for the events of each partition; it changes them in place
+    and returns how many it changed. Partitions with changes are rewritten.
+    Returns the total number of events changed.
+    """
+    changed = 0
+    with event_store.file_lock(MANIFEST_FILE):
+        manifest, manifest_changed = load_manifest()
+        for path in partition_files():
+            name = os.path.basename(path)[:-len(".json")]
+            with event_store.file_lock(path):
+                events = read_partition(name)
+                count = update(events)
+                if count:
+                    _write_partition(name, events)
+                    _index_partition(manifest, name, events)
+                    changed += count
+        if changed or manifest_changed:
+            _save_manifest(manifest)
+    return changed
+
+
+def split_finished(events, now=None):
+    """Return (live events, finished events), where finished events ended before now."""
+    now = now or datetime.now(timezone.utc)
+    live, finished = [], []
+    for event in events:
+        end = event_end(event)
+        (finished if end is not None and end <= now else live).append(event)
+    return live, finished
+
+
+def archive_finished(events, now=None):
+    """
+    Archive the events that have ended and return (live events, number archived).
+    The archive is written first, so a crash before the caller saves the live
+    events only leaves copies that the next run skips as already archived.
+    """
+    live, finished = split_finished(events, now)
+    if finished:
+        archive_events(finished)
+    return live, len(finished)
+
+
+def iter_archived_events():
+    """Yield every archived event, oldest month first."""
+    for path in partition_files():
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f).get("events", [])
+
+
+def migrate_legacy():
+    """Move the events of completed_events.json into partitions and delete it. Returns the count moved."""
+    if not os.path.exists(LEGACY_FILE):
+        return 0
+    with open(LEGACY_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    events = data.get("events", []) if isinstance(data, dict) else data  # Oldest files are a bare list
+    added = archive_events(events)
+    os.remove(LEGACY_FILE)
+    return added
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Maintain the month-partitioned event archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("migrate", help="Split completed_events.json into month partitions")
+    subparsers.add_parser("rebuild", help="Recreate manifest.json from the partition files")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    if args.command == "migrate":
+        added = migrate_legacy()
+        print(f"Archived {added} events from {os.path.basename(LEGACY_FILE)} into {ARCHIVE_DIR}")
+        return 0
+
+    with event_store.file_lock(MANIFEST_FILE):
+        manifest = {"partitions": {}, "ids": {}, "hashes": {}}
+        for path in partition_files():
+            name = os.path.basename(path)[:-len(".json")]
+            _index_partition(manifest, name, read_partition(name))
+        _save_manifest(manifest)
+    print(f"Indexed {len(manifest['ids'])} events in {len(manifest['partitions'])} partitions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
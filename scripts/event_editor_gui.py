@@ -1,28 +1,185 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, scrolledtext
+import argparse
 import json
 import os
-import shutil
+import random
+import statistics
+import sys
+import tempfile
+import time
 from pathlib import Path
 import tkinterdnd2 as tkdnd
-from PIL import Image, ImageTk # For image previews
-import sys
-import subprocess
-from datetime import datetime
+from PIL import ImageTk # For image previews
+from datetime import datetime, timedelta
 import copy
+import bisect
 import threading
+import queue
 import requests
 
+import calendar_sync
+import event_archive
+import event_feed
+import event_registry
+import event_snapshot
+import event_store
+import geocoder
+import image_pipeline
+import image_store
+import thumbnail_cache
+from event_time import sort_key
+
+# Labels for calendar_sync.STAGES in the update window
+UPDATE_STAGES = {
+    "fetch": "Downloading calendars...",
+    "parse": "Reading calendar events...",
+    "match": "Matching with existing events...",
+    "save": "Saving events.json...",
+    "geocode": "Looking up venue locations...",
+}
+UPDATE_POLL_MS = 100
+UPDATE_EVENTS_PER_POLL = 500 # Output lines handled per poll, so a flood of output cannot freeze the window
+BENCHMARK_EVENTS = 10000
+
+class VirtualEventList:
+    """
+    Event list that only creates Treeview rows for the lines currently in view.
+
+    The widget holds one Treeview item per visible line and asks get_label(index)
+    for the text of the events in the current window, so scrolling, selecting and
+    editing cost the same with ten events or ten thousand.
+    """
+
+    def __init__(self, parent, get_label, on_select):
+        self.get_label = get_label
+        self.on_select = on_select
+        self.count = 0
+        self.offset = 0  # Index of the event shown on the first line
+        self.selected_index = None
+        self.items = []  # Treeview item ids, one per visible line
+        self.row_height = 20  # Replaced by the measured height once a row is drawn
+
+        self.tree = ttk.Treeview(parent, show="tree", selectmode="browse", height=1)
+        self.tree.column("#0", width=280)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", lambda e: self.refresh())
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self._step(-1))
+        self.tree.bind("<Down>", lambda e: self._step(1))
+        self.tree.bind("<Prior>", lambda e: self._step(-max(1, len(self.items) - 1)))
+        self.tree.bind("<Next>", lambda e: self._step(max(1, len(self.items) - 1)))
+
+    def set_count(self, count):
+        """Set the number of events in the list and redraw the visible rows."""
+        self.count = count
+        if self.selected_index is not None and self.selected_index >= count:
+            self.selected_index = count - 1 if count else None
+        self.refresh()
+
+    def select(self, index):
+        """Highlight a row, scrolling it into view, without calling on_select."""
+        self.selected_index = index
+        visible = len(self.items) or self._visible_rows()
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + visible:
+            self.offset = index - visible + 1
+        self.refresh()
+
+    def update_row(self, index):
+        """Relabel a single row after its event was edited."""
+        row = index - self.offset
+        if 0 <= row < len(self.items):
+            self.tree.item(self.items[row], text=self.get_label(index))
+
+    def refresh(self):
+        """Relabel the visible rows after scrolling, resizing or a change to the events."""
+        if self.items:
+            bbox = self.tree.bbox(self.items[0])
+            if bbox:
+                self.row_height = bbox[3]
+
+        visible = min(self._visible_rows(), self.count)
+        self.offset = max(0, min(self.offset, self.count - visible))
+        while len(self.items) < visible:
+            self.items.append(self.tree.insert("", tk.END, text=""))
+        while len(self.items) > visible:
+            self.tree.delete(self.items.pop())
+
+        for row, item in enumerate(self.items):
+            self.tree.item(item, text=self.get_label(self.offset + row))
+
+        row = -1 if self.selected_index is None else self.selected_index - self.offset
+        if 0 <= row < len(self.items):
+            self.tree.selection_set(self.items[row])
+            self.tree.focus(self.items[row])
+        else:
+            self.tree.selection_set(())
+
+        if self.count:
+            self.scrollbar.set(self.offset / self.count, (self.offset + len(self.items)) / self.count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, rows):
+        self.offset += rows
+        self.refresh()
+        return "break"
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"|"pages")."""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.count)
+            self.refresh()
+        elif args[0] == "scroll":
+            rows = int(args[1])
+            if args[2] == "pages":
+                rows *= max(1, len(self.items) - 1)
+            self.scroll(rows)
+
+    def _visible_rows(self):
+        return max(1, self.tree.winfo_height() // self.row_height)
+
+    def _step(self, rows):
+        if self.count:
+            current = self.selected_index if self.selected_index is not None else 0
+            self._choose(max(0, min(self.count - 1, current + rows)))
+        return "break"
+
+    def _choose(self, index):
+        if index == self.selected_index:
+            self.select(index)
+            return
+        self.select(index)
+        self.on_select(index)
+
+    def _on_tree_select(self, event=None):
+        # Selections made by select()/refresh() land on selected_index and are ignored here
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self.items:
+            return
+        index = self.offset + self.items.index(selection[0])
+        if index != self.selected_index:
+            self.selected_index = index
+            self.on_select(index)
+
 class EventEditor:
-    def __init__(self, root):
+    def __init__(self, root, json_path=None):
         self.root = root
         self.root.title("CIA - Event Editor")
         self.root.geometry("1150x900")
 
         # Define file paths
         self.base_path = Path(__file__).resolve().parent.parent
-        self.json_path = self.base_path / "themes/mcp-theme/data/events.json"
-        self.completed_json_path = self.base_path / "themes/mcp-theme/data/completed_events.json"
+        self.json_path = Path(json_path) if json_path else self.base_path / "themes/mcp-theme/data/events.json"
         self.image_dir = self.base_path / "themes/mcp-theme/assets/images"
 
         # Form fields definition
@@ -45,35 +202,50 @@ class EventEditor:
         
         # Load data
         self.events = []
+        self.sort_keys = [] # sort_key() of each event, kept in step with self.events
+        self.event_positions = {} # Event id -> index in self.events
         self.organizers = {}
         self.current_event_index = 0
-        self.event_listbox = None # For the new event list
-        self.is_programmatic_selection = False # Flag to prevent event loops
+        self.event_list = None # Virtualized event list, created in create_widgets
+        self.writer = event_store.BackgroundWriter(on_done=self._on_save_done, write=event_feed.save_events) # Saves off the Tk thread; also writes feed.json
+        self.thumbnails = thumbnail_cache.ThumbnailCache() # Image previews, decoded off the Tk thread
+        self.displayed_image = None # (path, size) of the preview being shown or loaded
+        self.geocoder = None # Cached, rate-limited address lookups, created on first use
+        self.update_thread = None # The running calendar update, if any
+        self.closing = False # The window was closed while an update was running
+        self.update_cancel = None # Set to stop it before it saves
+        self.update_events = queue.Queue() # Its output, stage changes and result, for the Tk thread
+        self.update_window = None
         self.load_events()
 
         # Create UI
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Display first event
         if self.events:
-            self.populate_event_listbox()
+            self.populate_event_list()
             self.display_event()
         else:
             messagebox.showinfo("No Events", f"No events found in {self.json_path}. Please run the import script or create a new event.")
 
     def load_events(self):
         try:
-            with open(self.json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.events = data.get("events", [])
-                self.extract_organizers()
-                self.sort_events() # Sort on initial load
+            # Events refer to shared organizer and venue records; the form edits resolved copies
+            self.registries = event_registry.load_registries()
+            data = event_snapshot.load_json(self.json_path) # Fast binary copy when it is up to date
+            self.events = data.get("events", [])
+            for event in self.events:
+                event_registry.resolve_event(event, self.registries)
+            self.extract_organizers()
+            self.sort_events() # Sort on initial load
+            self.writer.track(self.json_path) # Saving over a newer file will ask first
         except (FileNotFoundError, json.JSONDecodeError) as e:
             messagebox.showerror("Error Loading File", f"Could not load or parse events.json:\n{e}")
             self.events = []
             self.organizers = {}
 
-    def save_events(self):
+    def save_events(self, force=False):
         if not self.events:
             messagebox.showwarning("No Events", "There is nothing to save.")
             return
@@ -81,33 +253,113 @@ class EventEditor:
         # First, apply the currently displayed data
         self.apply_changes()
 
+        try:
+            stored_events = self.stored_events(self.events)
+        except (OSError, json.JSONDecodeError, event_store.LockTimeout) as e:
+            messagebox.showerror("Error Saving File", f"Could not save the organizer and venue lists:\n{e}")
+            return
+
         output_data = {
             "calendar": {
                 "name": "Collective Improvement Association Events",
                 "lastUpdated": self.get_current_iso_time(),
             },
-            "events": self.events,
+            "events": stored_events,
         }
 
-        try:
-            with open(self.json_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+        # Written on a background thread; _save_finished reports the result
+        self.writer.save(self.json_path, output_data, force=force)
+        self.save_button.config(text="Saving...")
+
+    def _on_save_done(self, path, version, error):
+        # Called on the writer thread; hand the result to the Tk thread
+        self.root.after(0, self._save_finished, path, error)
+
+    def _save_finished(self, path, error):
+        self.save_button.config(text="Save All Events")
+        if error is None:
             messagebox.showinfo("Success", "events.json has been saved successfully!")
-        except Exception as e:
-            messagebox.showerror("Error Saving File", f"Could not save events.json:\n{e}")
+        elif isinstance(error, event_store.ConflictError):
+            overwrite = messagebox.askyesno(
+                "File Changed",
+                "events.json was changed by another program (for example the calendar update) "
+                "since it was loaded.\n\nOverwrite it with the events in the editor?"
+            )
+            if overwrite:
+                self.save_events(force=True)
+        else:
+            messagebox.showerror("Error Saving File", f"Could not save events.json:\n{error}")
+
+    def on_close(self):
+        """Stops a running calendar update and waits for any save still being written before closing the window."""
+        if self.update_thread is not None:
+            # It stops before saving, or finishes the save it has started. The Tk loop keeps
+            # running meanwhile; _update_finished() closes the window once the thread is done.
+            self.update_cancel.set()
+            self.closing = True
+            self.root.withdraw()
+            return
+        self.writer.flush()
+        if self.geocoder is not None:
+            self.geocoder.close()
+        self.root.destroy()
 
     def extract_organizers(self):
+        """Builds the organizer picker's name -> record map from the organizer registry."""
         self.organizers = {}
-        for event in self.events:
-            organizer = event.get("organizer")
-            if organizer and isinstance(organizer, dict) and "name" in organizer:
-                name = organizer.get("name", "").strip()
-                if name and name not in self.organizers:
-                    self.organizers[name] = {
-                        "name": name,
-                        "email": organizer.get("email", ""),
-                        "website": organizer.get("website", "")
-                    }
+        for record in self.registries.organizers.records.values():
+            name = (record.get("name") or "").strip()
+            if name and name not in self.organizers:
+                self.organizers[name] = record
+        if getattr(self, "organizer_combobox", None) is not None:
+            self.organizer_combobox['values'] = sorted(self.organizers)
+
+    def stored_events(self, events):
+        """Returns events as saved: referring to registry ids, which are written first."""
+        stored = [event_registry.store_event(event, self.registries) for event in events]
+        self.registries.save()
+        self.extract_organizers() # Pick up organizers added by this save
+        return stored
+
+    def _link_registry_records(self, event, old_location, old_organizer):
+        """Points an edited location or organizer at its registry record. Changing
+        the details of a venue or organizer that other events share asks first,
+        because the change shows up on all of them."""
+        links = (
+            (self.registries.venues, "venueId", "location", old_location, "venue"),
+            (self.registries.organizers, "organizerIds", "organizer", old_organizer, "organizer"),
+        )
+        for registry, field, key, old_record, label in links:
+            record = event.get(key)
+            if record == old_record or registry.is_empty(record):
+                continue # Not edited; store_event() handles legacy and cleared records
+            ids = event.get(field)
+            current_id = (ids[0] if ids else None) if field == "organizerIds" else ids
+            if current_id and registry.get(current_id) == record:
+                continue
+
+            target_id = registry.find(record) or current_id
+            if target_id is None:
+                continue # A new record, added by store_event() on save
+            if registry.get(target_id) != record:
+                others = event_registry.count_users(self.events, field, target_id) - (target_id == current_id)
+                if others and not messagebox.askyesno(
+                    f"Shared {label.title()}",
+                    f"{others} other event(s) use the {label} '{registry.get(target_id).get('name')}'.\n\n"
+                    f"Apply these {label} details to all of them?\n"
+                    f"Choose No to save them as a separate {label} for this event only."
+                ):
+                    target_id = registry.add(record)
+                else:
+                    registry.update(target_id, record)
+                    for other in self.events:
+                        if other is not event and event_registry.count_users([other], field, target_id):
+                            event_registry.resolve_event(other, self.registries)
+
+            if field == "organizerIds":
+                event[field] = [target_id] + [i for i in (ids or [])[1:] if i != target_id]
+            else:
+                event[field] = target_id
 
     def create_widgets(self):
         # --- Main Layout ---
@@ -122,15 +374,8 @@ class EventEditor:
         list_frame = ttk.LabelFrame(main_container, text="Events", padding=(5, 10))
         list_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=False)
         
-        # --- Event Listbox ---
-        self.event_listbox = tk.Listbox(list_frame, selectmode=tk.SINGLE, exportselection=False, width=40)
-        self.event_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        list_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.event_listbox.yview)
-        list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.event_listbox.config(yscrollcommand=list_scrollbar.set)
-        
-        self.event_listbox.bind('<<ListboxSelect>>', self.on_listbox_select)
+        # --- Event List ---
+        self.event_list = VirtualEventList(list_frame, self.event_label, self.on_event_list_select)
 
         # --- Navigation (always visible above tabs) ---
         nav_frame = ttk.Frame(editor_frame)
@@ -330,9 +575,8 @@ class EventEditor:
         self.archive_button = ttk.Button(action_frame, text="Archive Past Events", command=self.archive_past_events)
         self.archive_button.pack(side=tk.LEFT, padx=(0, 5))
 
-        if sys.platform in ["linux", "darwin"]:
-            self.update_button = ttk.Button(action_frame, text="Update from Calendar", command=self.run_update_script)
-            self.update_button.pack(side=tk.LEFT)
+        self.update_button = ttk.Button(action_frame, text="Update from Calendar", command=self.update_from_calendar)
+        self.update_button.pack(side=tk.LEFT)
 
         self.save_button = ttk.Button(action_frame, text="Save All Events", command=self.save_events)
         self.save_button.pack(side=tk.RIGHT)
@@ -483,14 +727,8 @@ class EventEditor:
         current_image = event.get("image")
         self.image_path_var.set(current_image or "No image selected.")
 
-        full_image_path = None
-        if current_image:
-            # image paths are like '/images/foo.jpg'. We need to find them in the assets directory.
-            relative_image_path = current_image.lstrip('/')
-            assets_dir = self.base_path / "themes/mcp-theme/assets"
-            full_image_path = assets_dir / relative_image_path
-        
-        self._load_and_display_image(full_image_path)
+        self._load_and_display_image(self.event_image_path(event))
+        self._prefetch_neighbour_images()
 
         # Update button states
         num_events = len(self.events)
@@ -501,14 +739,9 @@ class EventEditor:
             self.prev_button.config(state="disabled")
             self.next_button.config(state="disabled")
 
-        # Update selection in the listbox
-        if self.event_listbox and self.event_listbox.size() > self.current_event_index:
-            self.is_programmatic_selection = True
-            self.event_listbox.selection_clear(0, tk.END)
-            self.event_listbox.selection_set(self.current_event_index)
-            self.event_listbox.activate(self.current_event_index)
-            self.event_listbox.see(self.current_event_index)
-            self.is_programmatic_selection = False
+        # Update selection in the event list
+        if self.event_list:
+            self.event_list.select(self.current_event_index)
 
     def on_organizer_selected(self, event=None):
         selected_name = self.organizer_combobox.get()
@@ -545,7 +778,9 @@ class EventEditor:
         old_date = event.get('startDate')
         old_time = event.get('startTime')
         old_title = event.get('title')
-        current_id = event.get('id')
+        old_location = copy.deepcopy(event.get('location'))
+        old_address = self.get_in_dict(event, 'location.address')
+        old_organizer = copy.deepcopy(event.get('organizer'))
 
         for key, widget in self.fields.items():
             if isinstance(widget, ttk.Entry):
@@ -564,21 +799,34 @@ class EventEditor:
         selected_types = [type_name for type_name, var in self.event_type_vars.items() if var.get()]
         event["eventType"] = selected_types
 
+        # Coordinates found for the old address would put the map links in the wrong place
+        if isinstance(event.get('location'), dict) and self.get_in_dict(event, 'location.address') != old_address:
+            event['location'].pop('lat', None)
+            event['location'].pop('lon', None)
+
+        self._link_registry_records(event, old_location, old_organizer)
+
         # Handle image update
         if self.new_image_path:
-            event_id = event.get('id', f"event_{self.get_current_iso_time()}")
-            ext = Path(self.new_image_path).suffix
-            new_filename = f"{event_id}{ext}"
-            dest_path = self.image_dir / new_filename
-            
             try:
-                # Ensure the destination directory exists
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy(self.new_image_path, dest_path)
-                event['image'] = f"/images/{new_filename}"
+                # Images are stored once under their content hash, so re-uploads cost nothing
+                hash_cache = image_store.HashCache()
+                similar = image_store.similar_images(self.new_image_path, hash_cache)
+                if similar and messagebox.askyesno(
+                    "Similar Image Found",
+                    f"This image looks like one already used:\n{Path(similar[0][0]).name}\n\nUse the existing image instead?"
+                ):
+                    image_url = image_store.store_url(*os.path.splitext(os.path.basename(similar[0][0])))
+                else:
+                    image_url = image_store.add_image(self.new_image_path, hash_cache)
+                hash_cache.save()
+                if event.get('image') != image_url:
+                    event['image'] = image_url
+                    event.pop('imageVariants', None) # Describes the previous image
+                    self._generate_image_variants(event.get('id'), image_url, image_pipeline.image_url_to_path(image_url))
                 self.image_path_var.set(event['image'])
                 self.new_image_path = None # Reset after copy
-                print(f"Image copied to {dest_path}")
+                print(f"Image stored as {event['image']}")
             except Exception as e:
                 messagebox.showerror("Image Copy Error", f"Could not copy image:\n{e}")
 
@@ -588,20 +836,13 @@ class EventEditor:
         new_title = event.get('title')
         
         if old_date != new_date or old_time != new_time or old_title != new_title:
-            self.sort_events(keep_selection_id=current_id)
-        else:
-            # Update listbox entry to reflect changes if not re-sorting
-            if self.event_listbox and self.events:
-                idx = self.current_event_index
-                event_data = self.events[idx]
-                date = event_data.get('startDate', 'No Date')
-                title = event_data.get('title', 'Untitled Event')
-
-                self.is_programmatic_selection = True
-                self.event_listbox.delete(idx)
-                self.event_listbox.insert(idx, f"{date} - {title}")
-                self.event_listbox.selection_set(idx)
-                self.is_programmatic_selection = False
+            # Move just this event to its new place instead of re-sorting everything
+            self.current_event_index = self.reposition_event(self.current_event_index)
+            if self.event_list:
+                self.event_list.select(self.current_event_index)
+        elif self.event_list:
+            # Only this event's row changed
+            self.event_list.update_row(self.current_event_index)
 
     def next_event(self):
         self.apply_changes()  # Save current event before navigating
@@ -619,46 +860,104 @@ class EventEditor:
         self.current_event_index = (self.current_event_index - 1 + num_events) % num_events
         self.display_event()
     
+    def event_image_path(self, event):
+        """Returns the file of an event's image in the assets directory, or None."""
+        if not event.get("image"):
+            return None
+        # image paths are like '/images/foo.jpg'. We need to find them in the assets directory.
+        return Path(image_pipeline.image_url_to_path(event["image"]))
+
+    def _preview_size(self):
+        """Returns the largest thumbnail size that fits the image canvas."""
+        if self.image_canvas.winfo_width() <= 1:
+            self.image_canvas.update_idletasks() # Not laid out yet; only happens for the first event
+        return (max(1, self.image_canvas.winfo_width() - 10), max(1, self.image_canvas.winfo_height() - 10))
+
+    def _prefetch_neighbour_images(self):
+        """Starts decoding the previews of the events around the current one."""
+        paths = []
+        for offset in (1, -1, 2, -2):
+            event = self.events[(self.current_event_index + offset) % len(self.events)]
+            path = self.event_image_path(event)
+            if path is not None and path not in paths:
+                paths.append(path)
+        self.thumbnails.prefetch(paths, self._preview_size())
+
     def _load_and_display_image(self, image_path):
-        """Loads, resizes, and displays an image on the canvas."""
+        """Displays an image on the canvas, decoding it on a worker thread unless it is cached."""
         self.image_canvas.delete("all")
         self.photo_image = None # Clear old image reference
+        self.displayed_image = None
 
-        try:
-            # Get actual canvas dimensions after UI updates
-            self.image_canvas.update_idletasks()
-            canvas_w = self.image_canvas.winfo_width()
-            canvas_h = self.image_canvas.winfo_height()
-
-            if not image_path or not Path(image_path).exists():
-                self.image_canvas.create_text(
-                    canvas_w / 2, canvas_h / 2,
-                    text="Drag and drop an image here\nor click to select",
-                    font=("", 12, "italic"), fill="grey", justify=tk.CENTER, anchor="center"
-                )
-                if image_path:
-                    self.image_path_var.set(f"Not Found: {Path(image_path).name}")
-                return
+        size = self._preview_size()
+        canvas_w, canvas_h = self.image_canvas.winfo_width(), self.image_canvas.winfo_height()
 
-            # Open image with Pillow
-            with Image.open(image_path) as img:
-                # Resize image to fit canvas while maintaining aspect ratio
-                img.thumbnail((canvas_w - 10, canvas_h - 10), Image.Resampling.LANCZOS)
-                
-                # Create Tkinter-compatible image and keep a reference
-                self.photo_image = ImageTk.PhotoImage(img)
-                
-                # Display image on canvas
-                self.image_canvas.create_image(canvas_w / 2, canvas_h / 2, image=self.photo_image, anchor="center")
+        if not image_path or not Path(image_path).exists():
+            self.image_canvas.create_text(
+                canvas_w / 2, canvas_h / 2,
+                text="Drag and drop an image here\nor click to select",
+                font=("", 12, "italic"), fill="grey", justify=tk.CENTER, anchor="center"
+            )
+            if image_path:
+                self.image_path_var.set(f"Not Found: {Path(image_path).name}")
+            return
 
-        except Exception as e:
+        self.displayed_image = (str(image_path), size)
+        thumbnail = self.thumbnails.get_cached(str(image_path), size)
+        if thumbnail is not None:
+            self._show_thumbnail(thumbnail)
+            return
+
+        self.image_canvas.create_text(
+            canvas_w / 2, canvas_h / 2, text="Loading image...",
+            font=("", 10, "italic"), fill="grey", justify=tk.CENTER, anchor="center"
+        )
+        request = self.displayed_image
+        self.thumbnails.request(
+            str(image_path), size,
+            lambda image, error: self.root.after(0, lambda: self._thumbnail_ready(request, image, error))
+        )
+
+    def _thumbnail_ready(self, request, image, error):
+        if request != self.displayed_image:
+            return # The user has moved on to another event or image
+        image_path = request[0]
+        if error is not None:
+            canvas_w, canvas_h = self.image_canvas.winfo_width(), self.image_canvas.winfo_height()
             self.image_canvas.delete("all")
             self.canvas_text_id = self.image_canvas.create_text(
                 canvas_w / 2, canvas_h / 2,
                 text=f"Error loading image:\n{Path(image_path).name}",
                 font=("", 10), fill="red", justify=tk.CENTER, anchor="center"
             )
-            messagebox.showerror("Image Error", f"Could not display image: {image_path}\n\nMake sure Pillow is installed (pip install Pillow).\n\nError: {e}")
+            messagebox.showerror("Image Error", f"Could not display image: {image_path}\n\nMake sure Pillow is installed (pip install Pillow).\n\nError: {error}")
+            return
+        self._show_thumbnail(image)
+
+    def _show_thumbnail(self, image):
+        canvas_w, canvas_h = self.image_canvas.winfo_width(), self.image_canvas.winfo_height()
+        self.image_canvas.delete("all")
+        # Create Tkinter-compatible image and keep a reference
+        self.photo_image = ImageTk.PhotoImage(image)
+        self.image_canvas.create_image(canvas_w / 2, canvas_h / 2, image=self.photo_image, anchor="center")
+
+    def _generate_image_variants(self, event_id, image_url, image_path):
+        """Creates the resized web versions of a new image on a worker thread."""
+        def worker():
+            try:
+                record = image_pipeline.ingest_image(str(image_path))
+            except Exception as e:
+                print(f"Could not create web versions of {image_path}: {e}")
+                return
+            self.root.after(0, lambda: self._image_variants_ready(event_id, image_url, record))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _image_variants_ready(self, event_id, image_url, record):
+        index = self.event_positions.get(event_id)
+        # Ignore the result if the event was deleted or given another image meanwhile
+        if index is not None and self.events[index].get('image') == image_url:
+            self.events[index]['imageVariants'] = record
 
     def select_image(self):
         filepath = filedialog.askopenfilename(
@@ -683,69 +982,182 @@ class EventEditor:
             self.image_path_var.set(f"NEW: {Path(filepath).name}")
             self._load_and_display_image(filepath)
 
-    def run_update_script(self):
-        """Runs the update-calendar.sh script."""
-        script_path = self.base_path / 'scripts' / 'update-calendar.sh'
-        if not script_path.exists():
-            messagebox.showerror("Script Not Found", f"The script was not found at:\n{script_path}")
+    def update_from_calendar(self):
+        """Imports the calendar feeds on a worker thread and merges the changes into the events being edited."""
+        if self.update_thread is not None:
+            self.update_window.lift()
             return
 
-        if not os.access(script_path, os.X_OK):
-            messagebox.showwarning("Permission Denied", "The update script is not executable.\nAttempting to set permissions...")
-            try:
-                # Add execute permission for the user (chmod u+x)
-                os.chmod(script_path, os.stat(script_path).st_mode | 0o100)
-            except Exception as e:
-                messagebox.showerror("Permission Error", f"Could not make script executable:\n{e}")
-                return
-
         proceed = messagebox.askyesno(
             "Confirm Update",
-            "This will fetch the latest events from Google Calendar, overwriting local data.\n\n"
-            "It is highly recommended you save any changes first.\n\n"
+            "This will fetch the latest events from Google Calendar and save them to events.json.\n\n"
+            "Your unsaved changes are kept, but fields that were changed in the calendar take the calendar's values.\n\n"
             "Do you want to continue?"
         )
         if not proceed:
             return
 
-        progress_window = tk.Toplevel(self.root)
-        progress_window.title("Updating...")
-        progress_window.geometry("300x100")
-        progress_window.transient(self.root)
-        progress_window.grab_set()
-        ttk.Label(progress_window, text="Running update script, please wait...").pack(pady=20, padx=20)
-        self.root.update_idletasks()
+        # The update reads events.json, so let any pending save land first
+        self.apply_changes()
+        self.writer.flush()
+
+        self.update_cancel = threading.Event()
+        self.update_events = queue.Queue()
+        self.update_thread = threading.Thread(target=self._run_calendar_sync, name="CalendarSync", daemon=True,
+                                              args=(self.update_events, self.update_cancel))
+        self._open_update_window()
+        self.update_button.config(state=tk.DISABLED)
+        self.save_button.config(state=tk.DISABLED) # Saving now would conflict with the update's own save
+        self.update_thread.start()
+        self.root.after(UPDATE_POLL_MS, self._poll_update)
 
+    @staticmethod
+    def _run_calendar_sync(events, cancel):
+        """Runs on the worker thread; everything is reported through the events queue."""
         try:
-            result = subprocess.run(
-                [str(script_path)],
-                cwd=self.base_path,
-                capture_output=True,
-                text=True,
-                check=False
-            )
-        finally:
-            progress_window.destroy()
-
-        if result.returncode == 0:
-            reload = messagebox.askyesno(
-                "Success!",
-                "Calendar update completed successfully.\n\nDo you want to reload the events in the editor now?\n(Any unsaved changes will be lost)"
-            )
-            if reload:
-                self.current_event_index = 0
-                self.load_events()
-                self.display_event()
+            delta = calendar_sync.sync(log=lambda line: events.put(("line", line)),
+                                       on_stage=lambda stage: events.put(("stage", stage)), cancel=cancel)
+            events.put(("done", delta, None))
+        except Exception as e:
+            events.put(("done", None, e))
+
+    def _open_update_window(self):
+        """Non-modal window with the update's stage, a progress bar, its output and a Cancel button."""
+        window = tk.Toplevel(self.root)
+        window.title("Updating from Calendar")
+        window.geometry("640x400")
+        window.transient(self.root)
+        window.protocol("WM_DELETE_WINDOW", self._close_update_window)
+
+        self.update_stage_var = tk.StringVar(value="Starting...")
+        ttk.Label(window, textvariable=self.update_stage_var).pack(fill=tk.X, padx=10, pady=(10, 5))
+        self.update_progress = ttk.Progressbar(window, mode="determinate", maximum=len(UPDATE_STAGES))
+        self.update_progress.pack(fill=tk.X, padx=10)
+
+        self.update_log = scrolledtext.ScrolledText(window, height=15, state=tk.DISABLED, wrap=tk.WORD)
+        self.update_log.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        self.update_close_button = ttk.Button(window, text="Cancel", command=self._close_update_window)
+        self.update_close_button.pack(pady=(0, 10))
+        self.update_window = window
+
+    def _close_update_window(self):
+        """Cancel while the update runs; afterwards, close the window."""
+        if self.update_thread is not None:
+            self.update_stage_var.set("Cancelling...")
+            self.update_close_button.config(state=tk.DISABLED)
+            self.update_cancel.set()
         else:
-            error_details = result.stderr or result.stdout or "No output from script."
-            messagebox.showerror("Update Failed", f"The calendar update script failed (code {result.returncode}):\n\n{error_details}")
+            self.update_window.destroy()
+            self.update_window = None
+
+    def _poll_update(self):
+        """Moves the update's output and stage changes into the window; runs on the Tk thread."""
+        lines = []
+        finished = None
+        for _ in range(UPDATE_EVENTS_PER_POLL):
+            try:
+                event = self.update_events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "line":
+                lines.append(event[1])
+            elif event[0] == "stage":
+                if event[1] in UPDATE_STAGES:
+                    self.update_progress["value"] = list(UPDATE_STAGES).index(event[1])
+                    self.update_stage_var.set(UPDATE_STAGES[event[1]])
+            else:
+                finished = event
+                break
+
+        if lines:
+            at_end = self.update_log.yview()[1] >= 1.0
+            self.update_log.config(state=tk.NORMAL)
+            self.update_log.insert(tk.END, "\n".join(lines) + "\n")
+            self.update_log.config(state=tk.DISABLED)
+            if at_end: # Follow the output unless the user scrolled up to read
+                self.update_log.see(tk.END)
+
+        if finished is None:
+            self.root.after(UPDATE_POLL_MS, self._poll_update)
+        else:
+            self._update_finished(*finished[1:])
+
+    def _update_finished(self, delta, error):
+        self.update_thread.join() # Returns at once: "done" is the last thing the thread does
+        self.update_thread = None
+        if self.closing:
+            self.on_close()
+            return
+        self.update_button.config(state=tk.NORMAL)
+        self.save_button.config(state=tk.NORMAL)
+        self.update_close_button.config(text="Close", state=tk.NORMAL)
+        if isinstance(error, calendar_sync.SyncCancelled):
+            self.update_stage_var.set("Cancelled before anything was saved.")
+            return
+        if error is not None:
+            self.update_stage_var.set("Failed; see the output below.")
+            messagebox.showerror("Update Failed", f"The calendar update failed:\n\n{error}", parent=self.update_window)
+            return
+
+        self.merge_calendar_changes(delta)
+        self.update_progress["value"] = len(UPDATE_STAGES)
+        self.update_stage_var.set(
+            f"Finished: {len(delta.added)} new, {len(delta.updated)} updated, "
+            f"{len(delta.deleted)} removed and {len(delta.archived)} archived events."
+        )
+        if delta.failed_feeds:
+            messagebox.showwarning("Some Calendars Failed",
+                                   f"These calendars could not be imported:\n{', '.join(delta.failed_feeds)}",
+                                   parent=self.update_window)
+
+    def merge_calendar_changes(self, delta):
+        """Applies a calendar_sync.SyncDelta to the events in memory, keeping unsaved edits to other fields."""
+        self.apply_changes()
+        current_id = self.events[self.current_event_index].get('id') if self.events else None
+        self.registries = event_registry.load_registries() # The update may have added organizers and venues
+
+        by_uid = {event['calendarUid']: event for event in self.events if event.get('calendarUid')}
+        by_id = {event.get('id'): event for event in self.events}
+        for update in delta.updated:
+            if update.uid in by_uid:
+                for key, value in update.fields.items():
+                    calendar_sync.set_field(by_uid[update.uid], key, value)
+        for event_id, uid in delta.matched.items():
+            if event_id in by_id:
+                by_id[event_id]['calendarUid'] = uid
+
+        deleted_uids = {event.get('calendarUid') for event in delta.deleted}
+        archived_ids = set(delta.archived)
+        self.events = [event for event in self.events
+                       if event.get('id') not in archived_ids
+                       and not (event.get('calendarUid') and event['calendarUid'] in deleted_uids)]
+        for event in delta.added:
+            if event.get('calendarUid') not in by_uid:
+                self.events.append(event_registry.resolve_event(copy.deepcopy(event), self.registries))
+
+        self.extract_organizers()
+        self.sort_events(keep_selection_id=current_id)
+        # events.json now holds what the editor has, apart from its unsaved edits
+        self.writer.track(self.json_path)
+        self.display_event()
+
+    def new_event_id(self):
+        """Return a new event id that no live or archived event has."""
+        taken = set(self.event_positions) | event_archive.load_manifest()[0]["ids"].keys()
+        stamp = datetime.now()
+        new_id = f"evt_{stamp.strftime('%Y%m%d%H%M%S%f')}"
+        while new_id in taken:
+            stamp += timedelta(microseconds=1)
+            new_id = f"evt_{stamp.strftime('%Y%m%d%H%M%S%f')}"
+        return new_id
 
     def add_new_event(self):
         """Creates a new, blank event and displays it for editing."""
         if self.events:
             self.apply_changes()
 
-        new_id = f"evt_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+        new_id = self.new_event_id()
         today_str = datetime.now().strftime('%Y-%m-%d')
         day_of_week = datetime.now().strftime('%A')
 
@@ -766,9 +1178,8 @@ class EventEditor:
             "image": ""
         }
 
-        self.events.append(new_event)
-        self.current_event_index = len(self.events) - 1
-        self.populate_event_listbox()
+        self.current_event_index = self.insert_event_sorted(new_event)
+        self.populate_event_list()
         self.display_event()
 
         messagebox.showinfo(
@@ -800,13 +1211,13 @@ class EventEditor:
         # Move to archive
         if self._add_events_to_archive([event_to_delete]):
             # Remove from main list
-            del self.events[self.current_event_index]
+            self.remove_event(self.current_event_index)
 
             # If we deleted the last event, clamp index to the new last event
             if self.current_event_index >= len(self.events) and self.events:
                 self.current_event_index = len(self.events) - 1
 
-            self.sort_events()  # Re-sort and repopulate listbox
+            self.populate_event_list()  # Removing an event keeps the rest in order
             self.display_event()  # Display new current event or clear form
 
             messagebox.showinfo(
@@ -828,14 +1239,11 @@ class EventEditor:
         current_event = self.events[self.current_event_index]
         new_event = copy.deepcopy(current_event)
 
-        new_id = f"evt_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
-        new_event['id'] = new_id
+        new_event['id'] = self.new_event_id()
 
-        self.events.append(new_event)
-        
-        # Sort and select the new one
-        self.sort_events(keep_selection_id=new_id)
-        
+        # Insert in sorted position and select the new one
+        self.current_event_index = self.insert_event_sorted(new_event)
+        self.populate_event_list()
         self.display_event()
 
         messagebox.showinfo(
@@ -870,8 +1278,9 @@ class EventEditor:
             self._end_time_entry.config(state=state)
 
     def archive_past_events(self):
-        """Finds events from yesterday or earlier, moves them to a separate JSON file,
-        and removes them from the main event list in the editor."""
+        """Finds events that have already ended, moves them to the archive,
+        and removes them from the main event list in the editor.
+        The importer does the same on every run; this is for events edited by hand."""
 
         if not self.events:
             messagebox.showinfo("No Events", "There are no events to archive.")
@@ -879,7 +1288,7 @@ class EventEditor:
 
         proceed = messagebox.askyesno(
             "Confirm Archive",
-            "This will move all events dated yesterday or earlier into 'completed_events.json' "
+            "This will move all events that have already ended into the archive "
             "and remove them from the editor.\n\n"
             "You must click 'Save All Events' afterwards to make this change permanent.\n\n"
             "Continue?"
@@ -887,74 +1296,40 @@ class EventEditor:
         if not proceed:
             return
 
-        today = datetime.now().date()
-        past_events = []
-        upcoming_events = []
-
-        for event in self.events:
-            try:
-                event_date = datetime.strptime(event.get('startDate', ''), '%Y-%m-%d').date()
-                if event_date < today:
-                    past_events.append(event)
-                else:
-                    upcoming_events.append(event)
-            except (ValueError, TypeError):
-                upcoming_events.append(event)
+        # Same end-time rules as the website and the importer
+        upcoming_events, past_events = event_archive.split_finished(self.events)
+        upcoming_ids = {id(event) for event in upcoming_events}
+        upcoming_keys = [key for event, key in zip(self.events, self.sort_keys) if id(event) in upcoming_ids]
 
         if not past_events:
-            messagebox.showinfo("No Past Events", "No events from yesterday or earlier were found.")
+            messagebox.showinfo("No Past Events", "No events that have ended were found.")
             return
 
         if self._add_events_to_archive(past_events):
             self.events = upcoming_events
+            self.sort_keys = upcoming_keys
+            self.event_positions = {}
+            self.reindex_events()
             self.current_event_index = 0
-            self.sort_events() # Re-sort and repopulate
+            self.populate_event_list() # Filtering keeps the remaining events in order
             self.display_event()
 
             messagebox.showinfo(
                 "Archive Complete",
-                f"{len(past_events)} event(s) were archived to completed_events.json.\n\n"
+                f"{len(past_events)} event(s) were archived to {os.path.relpath(event_archive.ARCHIVE_DIR, self.base_path)}.\n\n"
                 "IMPORTANT: Click 'Save All Events' to finalize the changes."
             )
 
     def _add_events_to_archive(self, events_to_archive):
-        """Helper function to read the archive, add new events, and write it back."""
+        """Helper function to add events to their month partitions of the archive."""
         if not events_to_archive:
             return True
-
-        existing_completed = []
-        if self.completed_json_path.exists():
-            try:
-                with open(self.completed_json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, dict) and "events" in data:
-                        existing_completed = data.get("events", [])
-                    elif isinstance(data, list): # Handle old format
-                        existing_completed = data
-            except (json.JSONDecodeError, IOError) as e:
-                messagebox.showwarning("Archive Warning", f"Could not read existing completed_events.json. A new file will be created.\nError: {e}")
-
-        # Prevent adding duplicates by checking event IDs
-        existing_ids = {event.get('id') for event in existing_completed if event.get('id')}
-        new_events = [event for event in events_to_archive if event.get('id') not in existing_ids]
-
-        if not new_events:
-            return True # All events to be archived were already there
-
-        all_completed = existing_completed + new_events
-        output_data = {
-            "calendar": {
-                "name": "Take Action Tucson Completed Events",
-                "lastUpdated": self.get_current_iso_time(),
-            },
-            "events": all_completed,
-        }
         try:
-            with open(self.completed_json_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            # Only the months being added to are rewritten; already-archived ids are skipped
+            event_archive.archive_events(self.stored_events(events_to_archive))
             return True
-        except IOError as e:
-            messagebox.showerror("Archive Error", f"Failed to write to completed_events.json.\nError: {e}")
+        except (OSError, json.JSONDecodeError, event_store.LockTimeout) as e:
+            messagebox.showerror("Archive Error", f"Failed to write to the event archive.\nError: {e}")
             return False
 
     def clear_form(self):
@@ -984,70 +1359,80 @@ class EventEditor:
         self.image_path_var.set("No event loaded.")
         self._load_and_display_image(None)
 
-    def populate_event_listbox(self):
-        if not self.event_listbox:
-            return
-        self.event_listbox.delete(0, tk.END)
-        for event in self.events:
-            date = event.get('startDate', 'No Date')
-            title = event.get('title', 'Untitled Event')
-            self.event_listbox.insert(tk.END, f"{date} - {title}")
-
-    def on_listbox_select(self, event=None):
-        if self.is_programmatic_selection:
-            return
-            
-        selection = self.event_listbox.curselection()
-        if not selection:
+    def event_label(self, index):
+        event = self.events[index]
+        date = event.get('startDate', 'No Date')
+        title = event.get('title', 'Untitled Event')
+        return f"{date} - {title}"
+
+    def populate_event_list(self):
+        if not self.event_list:
             return
-            
-        selected_index = selection[0]
-        
+        self.event_list.set_count(len(self.events))
+
+    def on_event_list_select(self, selected_index):
         if selected_index == self.current_event_index:
             return
-            
+
+        selected_id = self.events[selected_index].get('id')
         self.apply_changes()
-        
-        self.current_event_index = selected_index
+
+        # apply_changes may have moved the current event and shifted the rows after it
+        self.current_event_index = self.event_positions.get(selected_id, selected_index)
         self.display_event()
 
     def sort_events(self, keep_selection_id=None):
         """Sorts events by date/time/title and optionally keeps an event selected."""
-        def sort_key(event):
-            date_str = event.get('startDate', '')
-            time_str = event.get('startTime', '00:00:00')
-
-            # Default to midnight for TBD times for sorting purposes
-            if 'tbd' in time_str.lower():
-                time_str = '00:00:00'
-
-            # Try to build a full datetime object for sorting
-            try:
-                # Attempt to parse with seconds (more specific)
-                dt_obj = datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                try:
-                    # Fallback to parsing without seconds
-                    dt_obj = datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %H:%M')
-                except ValueError:
-                    # If date is invalid, push to the very end
-                    return (datetime.max, event.get('title', ''))
-            
-            # Primary key: datetime, Secondary key: title (for events at the same time)
-            return (dt_obj, event.get('title', ''))
-
-        self.events.sort(key=sort_key)
+        keys = [sort_key(event) for event in self.events]
+        order = sorted(range(len(self.events)), key=keys.__getitem__)
+        self.events = [self.events[i] for i in order]
+        self.sort_keys = [keys[i] for i in order]
+        self.event_positions = {}
+        self.reindex_events()
 
         # After sorting, we need to find the new index of our selected event
         if keep_selection_id:
-            try:
-                self.current_event_index = next(i for i, event in enumerate(self.events) if event.get('id') == keep_selection_id)
-            except StopIteration:
-                # If the event somehow disappeared (e.g., archived), default to first.
-                self.current_event_index = 0
+            # If the event somehow disappeared (e.g., archived), default to first.
+            self.current_event_index = self.event_positions.get(keep_selection_id, 0)
         
-        # Refresh the listbox with sorted events
-        self.populate_event_listbox()
+        # Refresh the event list with sorted events
+        self.populate_event_list()
+
+    def reindex_events(self, start=0, stop=None):
+        """Records the positions of self.events[start:stop] in event_positions."""
+        for index in range(start, len(self.events) if stop is None else stop):
+            self.event_positions[self.events[index].get('id')] = index
+
+    def insert_event_sorted(self, event):
+        """Inserts an event at its sorted position and returns its index."""
+        key = sort_key(event)
+        index = bisect.bisect_right(self.sort_keys, key)
+        self.events.insert(index, event)
+        self.sort_keys.insert(index, key)
+        self.reindex_events(index)
+        return index
+
+    def remove_event(self, index):
+        """Removes and returns the event at index, keeping the sort keys and positions in step."""
+        event = self.events.pop(index)
+        del self.sort_keys[index]
+        self.event_positions.pop(event.get('id'), None)
+        self.reindex_events(index)
+        return event
+
+    def reposition_event(self, index):
+        """
+        Moves an edited event to its new sorted position and returns its new index.
+        Only this event's sort key is recomputed, and only the rows it moves past are renumbered.
+        """
+        event = self.events.pop(index)
+        del self.sort_keys[index]
+        key = sort_key(event)
+        new_index = bisect.bisect_right(self.sort_keys, key)
+        self.events.insert(new_index, event)
+        self.sort_keys.insert(new_index, key)
+        self.reindex_events(min(index, new_index), max(index, new_index) + 1)
+        return new_index
 
     def insert_weblink_template(self):
         """Insert hyperlink template at cursor position in description text box."""
@@ -1068,7 +1453,7 @@ class EventEditor:
                 self.description_text.insert(tk.END, template)
 
     def validate_address(self):
-        """Use Nominatim to validate the address in location.address field."""
+        """Use Nominatim to validate the address in location.address field. Lookups are cached."""
         entry_widget = self.fields.get("location.address")
         validate_btn = getattr(self, '_validate_btn', None)
         if not entry_widget:
@@ -1081,29 +1466,23 @@ class EventEditor:
         # Show visual feedback that validation is in progress
         if validate_btn:
             validate_btn.config(state="disabled")
-            self._start_countdown(validate_btn, 5)  # 5 second countdown
+            self._start_countdown(validate_btn, geocoder.REQUEST_TIMEOUT)
         entry_widget.config(style="TEntry")  # Reset to normal while checking
 
-        def worker():
+        def done(future):
+            # Runs on the geocoder's thread; hand the result to the Tk thread
             try:
-                params = {"q": address, "format": "json", "limit": 1}
-                headers = {"User-Agent": "TAT-EventEditor/1.0"}
-                resp = requests.get("https://nominatim.openstreetmap.org/search", 
-                                  params=params, headers=headers, timeout=5)
-                if resp.status_code != 200:
-                    raise RuntimeError(f"HTTP {resp.status_code}")
-                data = resp.json()
-                if not data:
-                    self.root.after(0, lambda: self._validation_complete(entry_widget, validate_btn, success=False))
-                    return
-                # On success, color green
-                self.root.after(0, lambda: self._validation_complete(entry_widget, validate_btn, success=True))
+                found = future.result() is not None
             except requests.exceptions.Timeout:
                 self.root.after(0, lambda: self._validation_timeout(entry_widget, validate_btn))
+                return
             except Exception:
-                self.root.after(0, lambda: self._validation_complete(entry_widget, validate_btn, success=False))
+                found = False
+            self.root.after(0, lambda: self._validation_complete(entry_widget, validate_btn, success=found))
 
-        threading.Thread(target=worker, daemon=True).start()
+        if self.geocoder is None:
+            self.geocoder = geocoder.Geocoder()
+        self.geocoder.submit(address).add_done_callback(done)
 
     def _validation_complete(self, widget, button, success: bool):
         """Handle completion of address validation."""
@@ -1183,7 +1562,132 @@ class EventEditor:
             return f"{parts[0].zfill(2)}:{parts[1].zfill(2)}"
         return time_str.strip()
 
-if __name__ == "__main__":
+def _benchmark_events(count):
+    """count synthetic events over two years, at 50 venues, in no particular order."""
+    rng = random.Random(1)
+    venues = [{"name": f"Venue {number}", "address": f"{100 + number} N Stone Ave, Tucson, AZ"} for number in range(50)]
+    events = []
+    for number in range(count):
+        day = datetime(2026, 1, 1) + timedelta(days=rng.randrange(730))
+        hour = rng.randrange(8, 21)
+        events.append({
+            "id": f"evt_benchmark_{number:06d}", "title": f"Event {number}", "description": "Benchmark event",
+            "startDate": f"{day:%Y-%m-%d}", "dayOfWeek": f"{day:%A}", "startTime": f"{hour:02d}:00",
+            "endDate": f"{day:%Y-%m-%d}", "endTime": f"{hour + 1:02d}:00", "allDay": False,
+            "location": dict(rng.choice(venues)),
+            "organizer": {"name": "Take Action Tucson", "email": "", "website": ""},
+            "eventType": ["In-Person"],
+        })
+    return events
+
+
+def benchmark(count, steps):
+    """
+    Time navigation in the editor with count events: each step runs what a
+    click or key press runs and then lets Tk redraw the window. For
+    comparison, also time refilling a tk.Listbox with every event, which is
+    what the old list did after each change to a date, time or title. Needs a
+    display; on a headless machine, run it under Xvfb.
+    """
+    try:
+        root = tkdnd.Tk()
+    except tk.TclError as e:
+        print(f"The benchmark needs a display ({e}). Run it under Xvfb: xvfb-run -a python event_editor_gui.py benchmark")
+        return 1
+
+    # A dialog would stop the benchmark until someone clicks it; count them and answer No instead
+    dialogs = []
+    def answer_dialog(title, message, **options):
+        dialogs.append(title)
+        return False
+    for name in ("askyesno", "showinfo", "showwarning", "showerror"):
+        setattr(messagebox, name, answer_dialog)
+
+    rng = random.Random(2)
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Keep the registries and snapshot the editor writes away from the real data
+        event_registry.ORGANIZERS_FILE = os.path.join(data_dir, "organizers.json")
+        event_registry.VENUES_FILE = os.path.join(data_dir, "venues.json")
+        event_snapshot.SNAPSHOT_DIR = os.path.join(data_dir, "snapshots")
+        json_path = os.path.join(data_dir, "events.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"events": _benchmark_events(count)}, f)
+
+        started = time.perf_counter()
+        app = EventEditor(root, json_path)
+        root.update()
+        app.event_list.refresh() # Now that the list has its real height
+        print(f"{count} events, {len(app.event_list.items)} rows on screen, "
+              f"window ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        def timed(action, repeat=steps):
+            times = []
+            for _ in range(repeat):
+                began = time.perf_counter()
+                action()
+                root.update()
+                times.append((time.perf_counter() - began) * 1000)
+            return times
+
+        def move_to_random_date():
+            # Navigating after a date change moves the edited event to its new place in the list
+            date = f"{datetime(2026, 1, 1) + timedelta(days=rng.randrange(730)):%Y-%m-%d}"
+            app.start_date_var.set(date) # Also sets the day of the week
+            end_date_entry = app.fields["endDate"]
+            end_date_entry.delete(0, tk.END)
+            end_date_entry.insert(0, date)
+            app.next_event()
+
+        results = [
+            ("next event", timed(app.next_event)),
+            ("previous event", timed(app.prev_event)),
+            ("click a random row", timed(lambda: app.event_list._choose(rng.randrange(count)))),
+            ("scroll a page", timed(lambda: app.event_list.yview("scroll", 1, "pages"))),
+            ("change date, then next", timed(move_to_random_date)),
+        ]
+
+        # The old list: sort every event and put every row back in a Listbox
+        window = tk.Toplevel(root)
+        listbox = tk.Listbox(window, height=len(app.event_list.items))
+        listbox.pack()
+
+        def refill_listbox():
+            app.sort_events(keep_selection_id=app.events[app.current_event_index].get("id"))
+            listbox.delete(0, tk.END)
+            for index in range(len(app.events)):
+                listbox.insert(tk.END, app.event_label(index))
+
+        results.append(("old: sort and refill Listbox", timed(refill_listbox, max(1, steps // 20))))
+        for name, times in results:
+            print(f"{name:30} median {statistics.median(times):7.2f} ms   max {max(times):7.2f} ms   ({len(times)} runs)")
+        app.on_close()
+    if dialogs:
+        print(f"{len(dialogs)} dialogs opened during the benchmark ({', '.join(sorted(set(dialogs)))}), so the times include them!")
+        return 1
+    return 0
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Edit the events in events.json")
+    subparsers = parser.add_subparsers(dest="command")
+    bench = subparsers.add_parser("benchmark", help="Time navigating a large event list (needs a display, e.g. Xvfb)")
+    bench.add_argument("--events", type=int, default=BENCHMARK_EVENTS, help="Number of synthetic events")
+    bench.add_argument("--steps", type=int, default=200, help="Times each action is repeated")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    if args.command == "benchmark":
+        return benchmark(args.events, args.steps)
     root = tkdnd.Tk()
     app = EventEditor(root)
-    root.mainloop() 
\ No newline at end of file
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+ 
\ No newline at end of file
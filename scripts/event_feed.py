@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Build-ready copy of events.json for the Hugo templates.
+
+The home page used to parse every date and time with Hugo's `time`, pad times,
+build sort keys and sort the whole list on every build. The importer and the
+editor already have that logic in Python (event_time.py), so whenever they save
+events.json they also write themes/mcp-theme/data/feed.json:
+
+    {"generated": ..., "eventsUpdated": <events.json calendar.lastUpdated>,
+     "upcoming": [entry, ...], "past": [entry, ...]}
+
+Each entry holds the event itself under "data" plus everything the templates
+display or compare: the sort key, ISO start and end times at -07:00, the end as
+a Unix timestamp, the weekday, month and day labels, the time range text and the
+lower-cased event types. Both lists are sorted. An event whose end has passed
+when the feed is written goes into "past"; the template still compares
+"endUnix" with the build time, which is a cheap integer comparison.
+
+The home page only renders the first month of upcoming events. The rest are
+written as month shards, themes/mcp-theme/data/event_shards/YYYY-MM.json, with
+the venue and organizers resolved and everything main.js needs to draw them.
+The home template publishes each one as /data/events/months/YYYY-MM.json, after
+replacing the "image" of events without "imageVariants" by resized copies from
+Hugo's asset pipeline, the same ones the first month shows. Only Hugo can name
+those copies, so the shards cannot be served as written.
+static/data/events/index.json lists the months in order with their event
+counts per type, and for every event type the months that contain one. main.js
+fetches the next month as the visitor scrolls. With a type filter on, it skips
+months without that type.
+
+Usage:
+    python event_feed.py   # Rewrite feed.json and the month shards from events.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import event_registry
+import event_snapshot
+import event_store
+from event_time import ARIZONA, event_end
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+
+EVENTS_FILE = os.path.join(BASE_DIR, "themes/mcp-theme/data/events.json")
+FEED_FILE = os.path.join(BASE_DIR, "themes/mcp-theme/data/feed.json")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+SHARD_DIR = os.path.join(STATIC_DIR, "data/events")  # index.json, served as /data/events/
+SHARD_URL = "/data/events"
+MONTH_DIR = os.path.join(BASE_DIR, "themes/mcp-theme/data/event_shards")  # Published by the home template
+UNDATED_MONTH = "undated"
+
+
+def _full_time(value):
+    """Return HH:MM:SS for an HH:MM or HH:MM:SS string, or None for TBD/missing/malformed."""
+    if not value or 'tbd' in value.lower():
+        return None
+    parts = value.split(':')
+    if len(parts) == 2:
+        parts.append('00')
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+    return ':'.join(parts)
+
+
+def _clock(value, separator):
+    """Format HH:MM:SS like Go's "3:04 PM" (separator " ") or "3:04PM" (separator "")."""
+    hour, minute = value.split(':')[:2]
+    hour = int(hour)
+    return f"{(hour - 1) % 12 + 1}:{minute}{separator}{'PM' if hour >= 12 else 'AM'}"
+
+
+def _time_display(event, separator, range_separator):
+    start = _full_time(event.get('startTime'))
+    if event.get('allDay'):
+        return "All Day"
+    if not start:
+        return "Time TBD"
+    text = _clock(start, separator)
+    end = _full_time(event.get('endTime'))
+    if end:
+        text = f"{text}{range_separator}{_clock(end, separator)}"
+    return text
+
+
+def feed_entry(event):
+    """Return the precomputed template values for one event."""
+    start_time = _full_time(event.get('startTime')) if not event.get('allDay') else None
+    sort_time = start_time or "00:00:00"
+    try:
+        start = datetime.strptime(event.get('startDate') or '', '%Y-%m-%d')
+    except ValueError:
+        start = None  # The templates show no date rather than failing the build
+    end = event_end(event)
+    return {
+        "sortKey": f"{event.get('startDate', '')}T{sort_time}",
+        "start": f"{event['startDate']}T{sort_time}-07:00" if start else "",
+        "end": end.isoformat() if end else "",
+        "endUnix": int(end.timestamp()) if end else None,
+        "weekday": start.strftime("%A") if start else "",
+        "month": start.strftime("%b").upper() if start else "",
+        "day": str(start.day) if start else "",
+        "time": _time_display(event, " ", " - "),
+        "timeShort": _time_display(event, "", "-"),
+        "types": " ".join(event_type.lower() for event_type in event.get('eventType') or []),
+        "data": event,
+    }
+
+
+def build_feed(data, now=None):
+    """Return the feed for the parsed contents of events.json."""
+    now = now or datetime.now(timezone.utc)
+    upcoming, past = [], []
+    entries = sorted((feed_entry(event) for event in data.get("events", [])),
+                     key=lambda entry: (entry["sortKey"], entry["data"].get("title", "")))
+    for entry in entries:
+        ended = entry["endUnix"] is not None and entry["endUnix"] <= now.timestamp()
+        (past if ended else upcoming).append(entry)
+    return {
+        "generated": now.astimezone(ARIZONA).isoformat(),
+        "eventsUpdated": data.get("calendar", {}).get("lastUpdated"),
+        "upcoming": upcoming,
+        "past": past,
+    }
+
+
+def shard_entry(entry, registries):
+    """Return what main.js needs to draw one feed entry: display fields, venue, organizers and image."""
+    event = entry["data"]
+    resolved = event_registry.resolve_event(dict(event), registries)
+    organizers = [registries.organizers.get(i) for i in event.get("organizerIds") or []]
+    organizers = [o for o in organizers if o] or ([resolved["organizer"]] if resolved.get("organizer") else [])
+    item = {key: entry[key] for key in ("end", "endUnix", "weekday", "month", "day", "time", "timeShort", "types")}
+    item.update(title=event.get("title", ""), description=event.get("description", ""),
+                location=resolved.get("location") or {}, organizers=organizers)
+    if event.get("imageVariants"):
+        item["imageVariants"] = event["imageVariants"]
+    else:
+        item["image"] = event.get("image") or ""  # Resolved by the home template when it is an asset
+    return item
+
+
+def _write_compact(path, data):
+    event_store.write_text_atomic(path, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+
+def write_shards(feed, directory=None, registries=None, month_dir=None):
+    """
+    Write the upcoming events as month shards to month_dir (default MONTH_DIR) plus
+    index.json to directory (default SHARD_DIR); stale month files are removed.
+    """
+    directory = directory or SHARD_DIR
+    month_dir = month_dir or MONTH_DIR
+    registries = registries or event_registry.load_registries()
+    months = {}
+    for entry in feed["upcoming"]:
+        month = entry["sortKey"][:7] if entry["weekday"] else UNDATED_MONTH
+        months.setdefault(month, []).append(entry)
+
+    index = {"eventsUpdated": feed["eventsUpdated"], "months": [], "types": {}}
+    for month in sorted(months, key=lambda m: (m == UNDATED_MONTH, m)):
+        type_counts = {}
+        for entry in months[month]:
+            for event_type in entry["types"].split():
+                type_counts[event_type] = type_counts.get(event_type, 0) + 1
+                if month not in index["types"].setdefault(event_type, []):
+                    index["types"][event_type].append(month)
+        index["months"].append({"month": month, "url": f"{SHARD_URL}/months/{month}.json",
+                                "count": len(months[month]), "types": type_counts})
+        _write_compact(os.path.join(month_dir, f"{month}.json"),
+                       {"month": month, "events": [shard_entry(entry, registries) for entry in months[month]]})
+
+    if os.path.isdir(month_dir):
+        for name in os.listdir(month_dir):
+            if name.endswith(".json") and name[:-len(".json")] not in months:
+                os.remove(os.path.join(month_dir, name))
+    _write_compact(os.path.join(directory, "index.json"), index)
+
+
+def write_feed(data, path=None, now=None, shard_dir=None, month_dir=None):
+    """
+    Write the feed for events.json's data to path (default FEED_FILE) and its
+    month shards. No backups: they can always be rebuilt.
+    """
+    feed = build_feed(data, now)
+    event_store.write_json(path or FEED_FILE, feed, backups=0)
+    write_shards(feed, shard_dir, month_dir=month_dir)
+
+
+def save_events(path, data, **kwargs):
+    """
+    event_snapshot.write_json() for the data files; saving events.json also
+    rewrites feed.json, so the two never disagree.
+    """
+    with event_store.file_lock(path):
+        version = event_snapshot.write_json(path, data, **kwargs)
+        if os.path.abspath(path) == os.path.abspath(EVENTS_FILE):
+            write_feed(data)
+    return version
+
+
+def refresh_feed():
+    """Rewrite feed.json if it is missing or older than events.json (e.g. after a hand edit)."""
+    try:
+        if os.path.getmtime(FEED_FILE) >= os.path.getmtime(EVENTS_FILE):
+            return False
+    except FileNotFoundError:
+        if not os.path.exists(EVENTS_FILE):
+            return False
+    with event_store.file_lock(EVENTS_FILE):
+        write_feed(event_snapshot.load_json(EVENTS_FILE))
+    return True
+
+
+def has_ended_events(now=None):
+    """
+    Return True if events.json may hold events that have ended by now: feed.json
+    lists one in "past", or an upcoming one ends by now. A feed that is missing or
+    older than events.json cannot tell, so that counts as True as well.
+    """
+    now = now or datetime.now(timezone.utc)
+    try:
+        if os.path.getmtime(FEED_FILE) < os.path.getmtime(EVENTS_FILE):
+            return True
+        with open(FEED_FILE, "r", encoding="utf-8") as f:
+            feed = json.load(f)
+    except FileNotFoundError:
+        return os.path.exists(EVENTS_FILE)
+    except json.JSONDecodeError:
+        return True
+    ends = [entry["endUnix"] for entry in feed.get("upcoming", []) if entry.get("endUnix") is not None]
+    return bool(feed.get("past")) or (bool(ends) and min(ends) <= now.timestamp())
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Rewrite feed.json, the templates' precomputed copy of events.json")
+    parser.add_argument("--events", default=EVENTS_FILE, help="events.json to read")
+    parser.add_argument("--output", default=FEED_FILE, help="Feed file to write")
+    parser.add_argument("--shards", default=SHARD_DIR, help="Directory for the shard index.json")
+    parser.add_argument("--months", default=MONTH_DIR, help="Directory for the month shards")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    data = event_snapshot.load_json(args.events)
+    write_feed(data, args.output, shard_dir=args.shards, month_dir=args.months)
+    print(f"Wrote {len(data.get('events', []))} events to {args.output} and the month shards in {args.months}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
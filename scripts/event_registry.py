@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Shared registries of organizers and venues.
+
+Instead of every event carrying its own copy of the organizer and location,
+themes/mcp-theme/data/organizers.json and venues.json hold one record per
+organizer and venue under a stable id, and events refer to them with
+"organizerIds" (a list, the first one is the main organizer) and "venueId".
+Editing a record changes every event that uses it.
+
+The tools work on "resolved" events: resolve_event() adds the familiar
+"organizer" and "location" objects, and store_event() turns them back into ids
+before saving, reusing an existing record with the same name (and, for venues,
+address, city and state) or adding a new one. Records are never deleted, because archived
+events keep referring to them.
+
+Usage:
+    python event_registry.py migrate   # Move embedded organizers and locations into the registries
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+import event_archive
+import event_snapshot
+import event_store
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+
+DATA_DIR = os.path.join(BASE_DIR, "themes/mcp-theme/data")
+ORGANIZERS_FILE = os.path.join(DATA_DIR, "organizers.json")
+VENUES_FILE = os.path.join(DATA_DIR, "venues.json")
+EVENTS_FILE = os.path.join(DATA_DIR, "events.json")
+MAX_SLUG_LENGTH = 40
+
+
+def _normalize(value):
+    return " ".join(str(value or "").split()).casefold()
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:MAX_SLUG_LENGTH].strip("-") or "unnamed"
+
+
+class Registry:
+    """
+    The records of one registry file, indexed by id and by identifying fields.
+    A record with none of required_fields (default: the key fields) set is empty.
+    """
+
+    def __init__(self, path, root_key, prefix, key_fields, required_fields=None):
+        self.path = path
+        self.root_key = root_key
+        self.prefix = prefix
+        self.key_fields = key_fields
+        self.required_fields = required_fields or key_fields
+        self.records = {}  # id -> record
+        self._by_key = {}  # identifying fields -> id
+        self._changed = set()  # ids added or updated since loading
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.records = json.load(f).get(self.root_key, {})
+        except FileNotFoundError:
+            self.records = {}
+        self._by_key = {}
+        for record_id, record in self.records.items():
+            self._by_key.setdefault(self.key(record), record_id)
+
+    def key(self, record):
+        return tuple(_normalize(record.get(field)) for field in self.key_fields)
+
+    def is_empty(self, record):
+        return not isinstance(record, dict) or not any(_normalize(record.get(field)) for field in self.required_fields)
+
+    def get(self, record_id):
+        return self.records.get(record_id)
+
+    def find(self, record):
+        """Return the id of the record with the same identifying fields, or None."""
+        return self._by_key.get(self.key(record))
+
+    def add(self, record):
+        """Store a copy of record under a new id and return the id."""
+        base = f"{self.prefix}-{_slug(str(record.get(self.key_fields[0]) or ''))}"
+        record_id, number = base, 2
+        while record_id in self.records:
+            record_id, number = f"{base}-{number}", number + 1
+        self.records[record_id] = dict(record)
+        self._by_key.setdefault(self.key(record), record_id)
+        self._changed.add(record_id)
+        return record_id
+
+    def update(self, record_id, record):
+        """Replace a record; every event using record_id sees the change."""
+        old = self.records[record_id]
+        if self._by_key.get(self.key(old)) == record_id:
+            del self._by_key[self.key(old)]
+        self.records[record_id] = dict(record)
+        self._by_key.setdefault(self.key(record), record_id)
+        self._changed.add(record_id)
+
+    def match(self, record, current_id=None):
+        """
+        Return the id for an event's embedded record: current_id while it still
+        matches exactly, else the record with the same identifying fields, else a
+        new record. Never changes an existing record.
+        """
+        if self.is_empty(record):
+            return None
+        if current_id and self.records.get(current_id) == record:
+            return current_id
+        return self.find(record) or self.add(record)
+
+    def save(self):
+        """Write added and updated records, keeping records other programs added meanwhile."""
+        if not self._changed:
+            return
+        with event_store.file_lock(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    on_disk = json.load(f).get(self.root_key, {})
+            except FileNotFoundError:
+                on_disk = {}
+            for record_id in self._changed:
+                on_disk[record_id] = self.records[record_id]
+            for record_id, record in on_disk.items():
+                if record_id not in self.records:
+                    self.records[record_id] = record
+                    self._by_key.setdefault(self.key(record), record_id)
+            event_store.write_json(self.path, {self.root_key: dict(sorted(on_disk.items()))})
+        self._changed.clear()
+
+
+class Registries:
+    """Both registries, loaded together."""
+
+    def __init__(self):
+        self.organizers = Registry(ORGANIZERS_FILE, "organizers", "org", ("name",))
+        # Same-named places at the same street address in different towns are different venues
+        self.venues = Registry(VENUES_FILE, "venues", "venue", ("name", "address", "city", "state"),
+                               required_fields=("name", "address"))
+
+    def save(self):
+        self.organizers.save()
+        self.venues.save()
+
+
+def load_registries():
+    return Registries()
+
+
+def resolve_event(event, registries):
+    """Add the "location" and main "organizer" objects of an event that refers to the registries, in place."""
+    venue = registries.venues.get(event.get("venueId"))
+    if venue is not None:
+        event["location"] = dict(venue)
+    organizer_ids = event.get("organizerIds") or []
+    organizer = registries.organizers.get(organizer_ids[0]) if organizer_ids else None
+    if organizer is not None:
+        event["organizer"] = dict(organizer)
+    return event
+
+
+def store_event(event, registries):
+    """
+    Return a copy of a resolved event that refers to the registries instead of
+    embedding "location" and "organizer". Adds records for new venues and organizers.
+    """
+    stored = {}
+    organizer_ids = list(event.get("organizerIds") or [])
+    for key, value in event.items():
+        if key == "location":
+            venue_id = registries.venues.match(value, event.get("venueId"))
+            if venue_id:
+                stored["venueId"] = venue_id
+        elif key == "organizer":
+            current = organizer_ids[0] if organizer_ids else None
+            organizer_id = registries.organizers.match(value, current)
+            others = organizer_ids[1:] if current else organizer_ids
+            organizer_ids = ([organizer_id] if organizer_id else []) + [i for i in others if i != organizer_id]
+            if organizer_ids:
+                stored["organizerIds"] = organizer_ids
+        elif key == "venueId":
+            if "location" not in event:
+                stored[key] = value
+        elif key == "organizerIds":
+            if "organizer" not in event:
+                stored[key] = value
+        else:
+            stored[key] = value
+    return stored
+
+
+def count_users(events, field, record_id):
+    """Return how many events refer to record_id ("venueId" or "organizerIds" field)."""
+    if field == "venueId":
+        return sum(1 for event in events if event.get("venueId") == record_id)
+    return sum(1 for event in events if record_id in (event.get("organizerIds") or []))
+
+
+def migrate(registries=None):
+    """Convert events.json and the archive to registry references. Returns the number of events changed."""
+    registries = registries or load_registries()
+    changed_events = 0
+    for path in [EVENTS_FILE] + event_archive.partition_files():
+        with event_store.file_lock(path):
+            data = event_snapshot.load_json(path)
+            events = data.get("events", [])
+            stored = [store_event(event, registries) for event in events]
+            changed = sum(1 for before, after in zip(events, stored) if before != after)
+            if changed:
+                registries.save()  # Before the events that refer to the new records
+                data["events"] = stored
+                event_snapshot.write_json(path, data)
+                changed_events += changed
+    return changed_events
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Maintain the organizer and venue registries")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("migrate", help="Move embedded organizers and locations into the registries")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    parse_arguments()
+    registries = load_registries()
+    changed = migrate(registries)
+    print(f"Converted {changed} events; {len(registries.organizers.records)} organizers "
+          f"and {len(registries.venues.records)} venues registered.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Compact binary snapshots of the event data files, for fast loading.
+
+events.json stays the file Hugo reads and the one that is committed. Alongside
+it, in scripts/.cache/snapshots, a snapshot holds the same data in a form that is
+quicker to load. Each event is stored as a row of values plus an index into a
+table of key layouts, and equal strings (venue and organizer ids, dates,
+categories) are stored once, so the loader builds far fewer objects than
+json.load does. A snapshot is only used while the SHA-1 of the JSON file
+matches the one recorded in it. Otherwise the JSON is parsed and the snapshot
+rebuilt.
+
+Usage:
+    python event_snapshot.py benchmark [--file PATH] [--repeat N]
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import marshal
+import os
+import sys
+import time
+
+import event_store
+
+SNAPSHOT_DIR = os.path.join(event_store.CACHE_DIR, "snapshots")
+SNAPSHOT_MAGIC = b"EVSNAP3\n"
+SNAPSHOT_FORMAT = (3, marshal.version)  # Snapshots from another format or marshal version are ignored
+BASE_DIR = os.path.abspath(os.path.join(event_store.SCRIPT_DIR, os.pardir))
+EVENTS_FILE = os.path.join(BASE_DIR, "themes/mcp-theme/data/events.json")
+
+
+def snapshot_path(path):
+    path_hash = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(SNAPSHOT_DIR, f"{os.path.basename(path)}-{path_hash}.snap")
+
+
+def encode(data):
+    """Return data (a {"events": [...], ...} dict) in the snapshot layout."""
+    layouts, layout_index = [], {}
+    strings = {}  # Equal strings become one object, which marshal writes once and loads once
+    rows = []
+    for event in data.get("events", []):
+        keys = tuple(event)
+        if keys not in layout_index:
+            layout_index[keys] = len(layouts)
+            layouts.append(keys)
+        row = [layout_index[keys]]
+        for value in event.values():
+            if value.__class__ is str:
+                value = strings.setdefault(value, value)
+            elif value.__class__ is list:
+                value = [strings.setdefault(item, item) if item.__class__ is str else item for item in value]
+            row.append(value)
+        rows.append(tuple(row))
+    rest = {key: value for key, value in data.items() if key != "events"}
+    return {"rest": rest, "layouts": layouts, "rows": rows}
+
+
+def decode(snapshot):
+    """Rebuild the original data from encode()'s output."""
+    layouts = snapshot["layouts"]
+    events = [dict(zip(layouts[row[0]], row[1:])) for row in snapshot["rows"]]
+    data = dict(snapshot["rest"])
+    data["events"] = events
+    return data
+
+
+def save_snapshot(path, data, digest):
+    """Write the snapshot of data, the parsed contents of path whose bytes hash to digest."""
+    payload = marshal.dumps((SNAPSHOT_FORMAT, encode(data)))
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    target = snapshot_path(path)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC + digest + payload)
+    os.replace(tmp_path, target)
+
+
+def _read_snapshot(path, digest):
+    """Return the data from path's snapshot if it matches digest, else None."""
+    try:
+        with open(snapshot_path(path), "rb") as f:
+            header = f.read(len(SNAPSHOT_MAGIC) + len(digest))
+            if header != SNAPSHOT_MAGIC + digest:
+                return None
+            snapshot_format, snapshot = marshal.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if snapshot_format != SNAPSHOT_FORMAT:
+        return None
+    return decode(snapshot)
+
+
+def load_json(path, use_snapshot=True):
+    """
+    Load a JSON data file, from its snapshot when that is up to date.
+    Raises FileNotFoundError and json.JSONDecodeError like json.load.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).digest()
+
+    # Loading creates one container per event and nested object; pausing the
+    # cyclic garbage collector stops it from rescanning them as they pile up.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        data = _read_snapshot(path, digest) if use_snapshot else None
+        if data is not None:
+            return data
+        data = json.loads(raw.decode("utf-8-sig"))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    if use_snapshot and isinstance(data, dict):
+        try:
+            save_snapshot(path, data, digest)
+        except OSError as e:
+            print(f"Could not save snapshot of {path}: {e}")
+    return data
+
+
+def write_json(path, data, **kwargs):
+    """event_store.write_json() that also refreshes the snapshot, so the next load is fast."""
+    with event_store.file_lock(path):
+        version = event_store.write_json(path, data, **kwargs)
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).digest()
+    try:
+        save_snapshot(path, data, digest)
+    except OSError as e:
+        print(f"Could not save snapshot of {path}: {e}")
+    return version
+
+
+def benchmark(path, repeat):
+    """Print the best-of-repeat load time of path with json.load and from its snapshot."""
+    def best(function):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000, result
+
+    def plain_json():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    json_ms, expected = best(plain_json)
+    no_snapshot_ms, _ = best(lambda: load_json(path, use_snapshot=False))
+    load_json(path)  # Make sure the snapshot exists
+    snapshot_ms, loaded = best(lambda: load_json(path))
+    if loaded != expected:
+        print("Snapshot does not match the JSON file!")
+        return 1
+    print(f"{path}: {len(expected.get('events', []))} events, {os.path.getsize(path) / 1e6:.1f} MB JSON, "
+          f"{os.path.getsize(snapshot_path(path)) / 1e6:.1f} MB snapshot")
+    print(f"json.load:     {json_ms:7.1f} ms")
+    print(f"JSON, GC off:  {no_snapshot_ms:7.1f} ms (load_json when the snapshot is out of date)")
+    print(f"snapshot load: {snapshot_ms:7.1f} ms (including hashing the JSON file)")
+    return 0
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Fast-loading snapshots of the event data files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bench = subparsers.add_parser("benchmark", help="Compare load times of the JSON file and its snapshot")
+    bench.add_argument("--file", default=EVENTS_FILE, help="JSON file to load (default: events.json)")
+    bench.add_argument("--repeat", type=int, default=5, help="Loads to time; the best is reported")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    return benchmark(args.file, args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
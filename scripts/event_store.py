@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Crash-safe persistence for the site's JSON data files.
+
+Every write goes to a temporary file in the same directory, is flushed to disk
+and then moved over the real file with os.replace, so a crash mid-save leaves
+either the old file or the new one, never a truncated one. The versions being
+replaced are kept as numbered backups, and a lock file stops the event editor
+and the calendar importer from writing the same file at the same time.
+"""
+
+import glob
+import json
+import marshal
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache")
+BACKUP_DIR = os.path.join(CACHE_DIR, "backups")  # events.json.1 is the newest backup
+LOCK_DIR = os.path.join(CACHE_DIR, "locks")
+BACKUP_COUNT = 5
+LOCK_TIMEOUT = 30  # Seconds to wait for another process to finish writing
+LOCK_STALE_SECONDS = 600  # Where we cannot check the owner's pid, a lock this old is abandoned
+
+UMASK = os.umask(0o022)  # Reading the umask means setting it; put it straight back
+os.umask(UMASK)
+
+_held_locks = threading.local()
+
+
+class LockTimeout(Exception):
+    """Another process kept the file locked for longer than LOCK_TIMEOUT."""
+
+
+class ConflictError(Exception):
+    """The file was changed by another program since it was last loaded or saved."""
+
+
+def _lock_path(path):
+    return os.path.join(LOCK_DIR, os.path.basename(path) + ".lock")
+
+
+def _lock_is_stale(lock_path):
+    """Return True if the process that created the lock file is gone."""
+    try:
+        with open(lock_path, encoding="utf-8") as f:
+            pid = int(f.read().strip() or 0)
+    except ValueError:
+        pid = 0  # Still being written by its owner
+    if os.name == "posix" and pid:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+    return time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS
+
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+    """
+    Hold an exclusive lock on path for the duration of the with block.
+    The lock is a file created with O_EXCL, so it works across processes on any
+    platform. Re-entering the lock for the same path in the same thread is a no-op.
+    """
+    held = _held_locks.__dict__.setdefault("paths", set())
+    key = os.path.abspath(path)
+    if key in held:
+        yield
+        return
+
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    lock_path = _lock_path(path)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if _lock_is_stale(lock_path):
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue  # Released while we were looking at it
+            if time.monotonic() > deadline:
+                raise LockTimeout(f"{path} is locked by another process (see {lock_path})")
+            time.sleep(0.05)
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        break
+
+    held.add(key)
+    try:
+        yield
+    finally:
+        held.discard(key)
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+
+def file_version(path):
+    """Return a token that changes whenever path is rewritten, or None if it does not exist."""
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size)
+
+
+def rotate_backups(path, count=BACKUP_COUNT):
+    """Keep the current contents of path as backup 1, shifting older backups up to count."""
+    if count <= 0 or not os.path.exists(path):
+        return
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    base = os.path.join(BACKUP_DIR, os.path.basename(path))
+    for number in range(count - 1, 0, -1):
+        if os.path.exists(f"{base}.{number}"):
+            os.replace(f"{base}.{number}", f"{base}.{number + 1}")
+    newest = f"{base}.1"
+    if os.path.exists(newest):
+        os.remove(newest)
+    try:
+        # A hard link is free, and the os.replace that follows leaves it holding the old contents
+        os.link(path, newest)
+    except OSError:
+        shutil.copy2(path, newest)
+
+
+def _temp_prefix(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), f".{os.path.basename(path)}.")
+
+
+def new_file_mode(path):
+    """
+    Return the permissions a file written over path should get: those of the
+    existing file, or what open() would give a new one. Temp files are created
+    0600, and Hugo copies that into public/, where the web server cannot read it.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def write_text_atomic(path, text):
+    """Replace path with text so that readers and crashes only ever see a complete file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(_temp_prefix(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, new_file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_json(path, data, backups=BACKUP_COUNT, expected_version=False):
+    """
+    Atomically save data to path as indented JSON and return the new file_version().
+    If expected_version is given (None meaning "did not exist") and the file on disk
+    no longer matches it, ConflictError is raised and nothing is written.
+    """
+    text = json.dumps(data, indent=2, ensure_ascii=False)
+    with file_lock(path):
+        if expected_version is not False and file_version(path) != expected_version:
+            raise ConflictError(f"{path} was changed by another program")
+        # Temp files can only be left over from a writer that crashed while holding the lock
+        for orphan in glob.glob(glob.escape(_temp_prefix(path)) + "*.tmp"):
+            os.remove(orphan)
+        rotate_backups(path, backups)
+        write_text_atomic(path, text)
+        return file_version(path)
+
+
+class BackgroundWriter:
+    """
+    Saves JSON files on a worker thread so the caller never waits for disk.
+
+    save() copies the data and returns immediately. While a file is being written,
+    newer saves for it replace each other, so a burst of saves costs at most two
+    writes. on_done(path, version, error) is called on the worker thread after each
+    write. The writer remembers the version of each file it last loaded or wrote
+    and refuses (ConflictError) to overwrite a file someone else changed since.
+    write is the function that does the writing, with write_json()'s signature.
+    """
+
+    def __init__(self, on_done=None, backups=BACKUP_COUNT, write=None):
+        self.on_done = on_done
+        self.backups = backups
+        self.write = write or write_json
+        self.versions = {}  # path -> file_version() we last loaded or wrote
+        self._pending = {}  # path -> (data, force)
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def track(self, path):
+        """Remember the current version of path, e.g. right after loading it."""
+        with self._cond:
+            self.versions[path] = file_version(path)
+
+    def save(self, path, data, force=False):
+        """Queue data to be written to path. force=True overwrites changes made by others."""
+        # Deep copy so the caller can keep editing data. JSON data only holds types
+        # marshal supports, and its C round trip is several times faster than deepcopy.
+        snapshot = marshal.loads(marshal.dumps(data))
+        with self._cond:
+            previous = self._pending.get(path)
+            self._pending[path] = (snapshot, force or (previous is not None and previous[1]))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="BackgroundWriter", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until every queued save has been written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                path = next(iter(self._pending))
+                data, force = self._pending.pop(path)
+                expected = False if force else self.versions.get(path, False)
+                self._busy = True
+
+            version, error = None, None
+            try:
+                version = self.write(path, data, backups=self.backups, expected_version=expected)
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                if error is None:
+                    self.versions[path] = version
+                self._busy = False
+                self._cond.notify_all()
+            if self.on_done:
+                self.on_done(path, version, error)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Date and time helpers shared by the calendar importer and the event editor.
+
+Events store their start as separate "startDate" (YYYY-MM-DD) and "startTime"
+(HH:MM, HH:MM:SS or "TBD") strings. sort_key() is the one ordering both tools
+use, so events.json comes out of the importer in the same order the editor
+shows it, and event_end() mirrors the "upcoming" filter in layouts/index.html.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+# The site's templates compare end times at a fixed -07:00 offset; Arizona has no DST
+ARIZONA = timezone(timedelta(hours=-7))
+
+
+def sort_key(event):
+    """
+    Return (start datetime, title) for ordering events.
+    A missing or TBD time sorts as midnight; events with a malformed date or time sort last.
+    Splits the strings by hand because strptime is several times slower and this
+    runs once per event on every sort.
+    """
+    title = event.get('title', '')
+    date_str = event.get('startDate') or ''
+    time_str = event.get('startTime', '00:00') or ''
+    if 'tbd' in time_str.lower():
+        time_str = '00:00'
+
+    try:
+        year, month, day = date_str.split('-')
+        time_parts = time_str.split(':')
+        if len(time_parts) not in (2, 3):
+            raise ValueError(time_str)
+        start = datetime(int(year), int(month), int(day), *(int(part) for part in time_parts))
+    except ValueError:
+        return (datetime.max, title)
+    return (start, title)
+
+
+def event_end(event):
+    """
+    Return the aware datetime at which an event is over, or None if it has no end date.
+    Same rules as the template: an end date before the start date means the start date,
+    and a missing, TBD or all-day end time means the end of that day, Arizona time.
+    Returns None for malformed values, so such events are never treated as finished.
+    """
+    end_date = event.get('endDate')
+    if not end_date:
+        return None
+    start_date = event.get('startDate')
+    end_time = event.get('endTime') or ''
+    if not end_time or 'tbd' in end_time.lower() or event.get('allDay'):
+        end_time = '23:59:59'
+    elif end_time.count(':') == 1:
+        end_time += ':00'
+
+    try:
+        end_day = datetime.strptime(end_date, '%Y-%m-%d')
+        if start_date and datetime.strptime(start_date, '%Y-%m-%d') > end_day:
+            end_date = start_date
+        return datetime.strptime(f"{end_date}T{end_time}", '%Y-%m-%dT%H:%M:%S').replace(tzinfo=ARIZONA)
+    except ValueError:
+        return None
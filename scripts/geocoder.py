@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Address lookups through OpenStreetMap's Nominatim service, with a local cache.
+
+Results are kept in scripts/.cache/geocode.sqlite, keyed by the normalized
+address, so a venue is only ever looked up once. Addresses Nominatim could not
+find are cached too, and tried again after MISS_TTL_DAYS. Requests share one
+pooled session and go through a token bucket, so no more than one request per
+second is sent, as Nominatim's usage policy asks.
+
+The batch mode adds "lat" and "lon" to the venues (data/venues.json) used by the
+events in events.json. The site's map links then point at the exact spot.
+
+Usage:
+    python geocoder.py venues             # Look up venues without coordinates
+    python geocoder.py lookup "ADDRESS"   # Look up one address
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import event_registry
+import event_snapshot
+import event_store
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "TAT-EventTools/1.0 (+https://takeactiontucson.org)"
+CACHE_FILE = os.path.join(event_store.CACHE_DIR, "geocode.sqlite")
+REQUESTS_PER_SECOND = 1.0  # Nominatim's usage policy
+REQUEST_TIMEOUT = 10
+REQUEST_RETRIES = 2
+MISS_TTL_DAYS = 7  # Addresses that were not found are looked up again after this long
+SKIP_ADDRESSES = {"", "tbd", "virtual", "online", "blank"}  # Placeholders, never looked up
+
+
+def normalize_address(address):
+    """Return the cache key for an address: case, spacing and punctuation runs do not matter."""
+    return " ".join(str(address or "").replace(",", " , ").split()).casefold().replace(" ,", ",")
+
+
+def should_geocode(address):
+    return normalize_address(address) not in SKIP_ADDRESSES
+
+
+class TokenBucket:
+    """Thread-safe rate limiter: acquire() blocks until a request may be sent."""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                time.sleep((1 - self._tokens) / self.rate)
+
+
+class GeocodeCache:
+    """SQLite table of normalized address -> (lat, lon, display name); lat is NULL for misses."""
+
+    def __init__(self, path=CACHE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "address TEXT PRIMARY KEY, lat REAL, lon REAL, display_name TEXT, fetched_at REAL)"
+            )
+
+    def get(self, key):
+        """Return (found, result) for a normalized address; found is False when it is not cached."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT lat, lon, display_name, fetched_at FROM geocode WHERE address = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return False, None
+        lat, lon, display_name, fetched_at = row
+        if lat is None:
+            if time.time() - fetched_at > MISS_TTL_DAYS * 86400:
+                return False, None
+            return True, None
+        return True, {"lat": lat, "lon": lon, "displayName": display_name}
+
+    def put(self, key, result):
+        result = result or {}
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)",
+                (key, result.get("lat"), result.get("lon"), result.get("displayName"), time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def create_session():
+    """Create a pooled session that retries transient errors, honouring Retry-After."""
+    retry = Retry(
+        total=REQUEST_RETRIES,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+class Geocoder:
+    """
+    Cached, rate-limited Nominatim client. geocode() blocks; submit() runs the
+    lookup on a single background thread and returns a Future. With offline=True
+    only cached results are returned.
+    """
+
+    def __init__(self, url=NOMINATIM_URL, cache_path=CACHE_FILE, rate=REQUESTS_PER_SECOND, offline=False):
+        self.url = url
+        self.offline = offline
+        self.cache = GeocodeCache(cache_path)
+        self.limiter = TokenBucket(rate)
+        self.session = create_session()
+        self._executor = None
+        self.lookups = 0  # Requests actually sent
+
+    def geocode(self, address):
+        """
+        Return {"lat", "lon", "displayName"} for an address, or None if it was not
+        found. Network errors are raised and not cached.
+        """
+        if not should_geocode(address):
+            return None
+        key = normalize_address(address)
+        found, result = self.cache.get(key)
+        if found or self.offline:
+            return result
+
+        self.limiter.acquire()
+        self.lookups += 1
+        response = self.session.get(
+            self.url, params={"q": address, "format": "jsonv2", "limit": 1}, timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        matches = response.json()
+        if matches:
+            result = {
+                "lat": float(matches[0]["lat"]),
+                "lon": float(matches[0]["lon"]),
+                "displayName": matches[0].get("display_name", ""),
+            }
+        self.cache.put(key, result)
+        return result
+
+    def submit(self, address):
+        """Look an address up in the background; returns a concurrent.futures.Future."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Geocoder")
+        return self._executor.submit(self.geocode, address)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        self.cache.close()
+
+
+def geocode_venues(events, geocoder, cancel=None):
+    """
+    Add "lat"/"lon" to the registry venues that events use and that have none.
+    Lookups run without holding any lock; venues.json is then reloaded and only
+    venues whose address is unchanged are updated. Setting the threading.Event
+    cancel stops the lookups; what was found so far is still saved. Returns the
+    number updated.
+    """
+    venues = event_registry.load_registries().venues
+    wanted = {}  # venue id -> address looked up
+    for event in events:
+        venue = venues.get(event.get("venueId"))
+        if venue and "lat" not in venue and should_geocode(venue.get("address")):
+            wanted[event["venueId"]] = venue["address"]
+
+    found = {}
+    for venue_id, address in wanted.items():
+        if cancel is not None and cancel.is_set():
+            break
+        try:
+            result = geocoder.geocode(address)
+        except requests.RequestException as e:
+            print(f"Could not geocode '{address}': {e}")
+            break  # The service is unreachable or refusing us; try the rest next run
+        if result:
+            found[venue_id] = (address, result)
+
+    if not found:
+        return 0
+    updated = 0
+    with event_store.file_lock(event_registry.VENUES_FILE):
+        venues.load()
+        for venue_id, (address, result) in found.items():
+            venue = venues.get(venue_id)
+            if venue and normalize_address(venue.get("address")) == normalize_address(address):
+                venues.update(venue_id, dict(venue, lat=result["lat"], lon=result["lon"]))
+                updated += 1
+        venues.save()
+    return updated
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Look up venue coordinates with Nominatim")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("venues", help="Add coordinates to the venues used in events.json")
+    lookup = subparsers.add_parser("lookup", help="Look up one address")
+    lookup.add_argument("address")
+    parser.add_argument("--url", default=NOMINATIM_URL, help="Nominatim search endpoint")
+    parser.add_argument("--offline", action="store_true", help="Only use cached results")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    geocoder = Geocoder(url=args.url, offline=args.offline)
+    try:
+        if args.command == "lookup":
+            result = geocoder.geocode(args.address)
+            print(f"{result['lat']}, {result['lon']}  {result['displayName']}" if result else "Not found.")
+            return 0 if result else 1
+        events = event_snapshot.load_json(event_registry.EVENTS_FILE).get("events", [])
+        updated = geocode_venues(events, geocoder)
+        print(f"Added coordinates to {updated} venues ({geocoder.lookups} lookups sent).")
+        return 0
+    except requests.RequestException as e:
+        print(f"Lookup failed: {e}")
+        return 1
+    finally:
+        geocoder.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
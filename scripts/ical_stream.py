@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for iCalendar (.ics) feeds.
+
+Unfolds the feed line by line and yields one lightweight CalendarEvent per
+VEVENT, so the importer never has to hold a full calendar object graph in
+memory. Events outside the requested date window are dropped as soon as their
+DTSTART has been read, before any text is unescaped or an object is built.
+
+Recurring events (RRULE/RDATE) are expanded lazily, and only inside the window:
+occurrences are generated one at a time from the first one at or after the
+window start, and generation stops at the window end, so an open-ended daily
+rule costs no more memory than a single event. EXDATEs remove occurrences, and
+VEVENTs with a RECURRENCE-ID replace the occurrence they name; they are looked
+up in an index keyed by (UID, RECURRENCE-ID). Each occurrence gets a stable id
+of its own, "UID/20250101T170000Z" (or "UID/20250101" for all-day events), from
+its original start, so it keeps its id when it is moved.
+
+Usage:
+    python ical_stream.py benchmark [--events N] [--source FILE]
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import pytz
+from dateutil.rrule import rruleset, rrulestr
+
+# Properties the importer actually uses; everything else in a VEVENT is skipped.
+WANTED_PROPERTIES = (
+    "UID", "SUMMARY", "DESCRIPTION", "LOCATION", "DTSTART", "DTEND",
+    "DURATION", "SEQUENCE", "LAST-MODIFIED", "STATUS",
+    "RRULE", "RDATE", "EXDATE", "RECURRENCE-ID",
+)
+MULTI_PROPERTIES = ("RDATE", "EXDATE")  # May appear more than once; kept as lists of lines
+MAX_UNBOUNDED_OCCURRENCES = 100  # Occurrences per series when no window end is given
+UNKNOWN_OCCURRENCES = "*"  # Occurrence key recorded for a series that could not be expanded
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+BENCHMARK_SOURCE = os.path.join(SCRIPT_DIR, "debug_calendar.ics")
+BENCHMARK_TIMEZONE = "America/Phoenix"
+BENCHMARK_YEARS = 10  # The scaled feed spreads its events over this many years, ending a year from now
+
+_WANTED_RE = re.compile(r"(%s)[;:]" % "|".join(re.escape(name) for name in WANTED_PROPERTIES), re.IGNORECASE)
+_TEXT_ESCAPES = re.compile(r"\\([\\;,nN])")
+_DURATION_RE = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+_timezones = {}
+
+
+class CalendarEvent:
+    """A single VEVENT with the handful of fields the importer needs."""
+
+    __slots__ = ("uid", "name", "description", "location", "begin", "end",
+                 "all_day", "sequence", "last_modified", "status", "series_uid")
+
+    def __init__(self, uid, name, description, location, begin, end, all_day,
+                 sequence=0, last_modified=None, status=None, series_uid=None):
+        self.uid = uid
+        self.name = name
+        self.description = description
+        self.location = location
+        self.begin = begin
+        self.end = end
+        self.all_day = all_day
+        self.sequence = sequence
+        self.last_modified = last_modified
+        self.status = status
+        self.series_uid = series_uid  # UID of the recurring event this is an occurrence of
+
+    def __repr__(self):
+        return f"CalendarEvent(uid={self.uid!r}, name={self.name!r}, begin={self.begin!r})"
+
+
+def unfold_lines(source):
+    """
+    Yield logical content lines from iCal text or an iterable of physical lines.
+    Continuation lines (starting with a space or tab) are joined onto the
+    previous line as described in RFC 5545 section 3.1.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    current = None
+    for raw in source:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def parse_property(line):
+    """Split a content line into (NAME, {PARAM: value}, value)."""
+    # The value starts at the first colon that is not inside a quoted parameter.
+    split_at = line.find(":")
+    if split_at < 0:
+        return line.upper(), {}, ""
+    if '"' in line[:split_at]:
+        in_quotes = False
+        for i, char in enumerate(line):
+            if char == '"':
+                in_quotes = not in_quotes
+            elif char == ":" and not in_quotes:
+                split_at = i
+                break
+
+    head, value = line[:split_at], line[split_at + 1:]
+    if ";" not in head:
+        return head.upper(), {}, value
+
+    name, *raw_params = head.split(";")
+    params = {}
+    for raw_param in raw_params:
+        key, _, param_value = raw_param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def unescape_text(value):
+    """Undo RFC 5545 TEXT escaping (\\n, \\, \\; and \\\\)."""
+    if "\\" not in value:
+        return value
+    return _TEXT_ESCAPES.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def get_timezone(tzid, default_tz):
+    """Return a pytz timezone for a TZID parameter, falling back to default_tz."""
+    if not tzid:
+        return default_tz
+    if tzid not in _timezones:
+        try:
+            _timezones[tzid] = pytz.timezone(tzid)
+        except pytz.UnknownTimeZoneError:
+            _timezones[tzid] = default_tz
+    return _timezones[tzid]
+
+
+def parse_local_datetime(value, params, default_tz):
+    """
+    Parse a DATE or DATE-TIME value into (naive wall time, its timezone, is_date).
+    Dates are midnight in default_tz; floating times are read as default_tz.
+    """
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime(int(value[0:4]), int(value[4:6]), int(value[6:8])), default_tz, True
+
+    if len(value) < 15 or value[8] != "T":
+        raise ValueError(f"Invalid DATE-TIME value: {value!r}")
+    naive = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                     int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    if value.endswith("Z"):
+        return naive, pytz.utc, False
+    return naive, get_timezone(params.get("TZID"), default_tz), False
+
+
+def parse_datetime(value, params, default_tz):
+    """Parse a DATE or DATE-TIME value into (aware datetime, is_date)."""
+    naive, tz, is_date = parse_local_datetime(value, params, default_tz)
+    return tz.localize(naive), is_date
+
+
+def occurrence_key(begin, all_day):
+    """The RECURRENCE-ID of an occurrence, as used in its id: UTC time, or the date for all-day events."""
+    if all_day:
+        return begin.strftime("%Y%m%d")
+    return begin.astimezone(pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def parse_duration(value):
+    """Parse an RFC 5545 DURATION value into a timedelta."""
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        return None
+    parts = {key: int(val) for key, val in match.groupdict().items() if val and key != "sign"}
+    delta = timedelta(**parts)
+    return -delta if match.group("sign") == "-" else delta
+
+
+def iter_vevent_properties(source):
+    """
+    Yield a {NAME: content line} dict for each VEVENT in the feed; the values of
+    MULTI_PROPERTIES are lists of lines. Only WANTED_PROPERTIES are kept and
+    nested components (VALARM) are skipped;
+    lines are parsed later, and only for events that survive the date filter.
+    """
+    wanted = _WANTED_RE.match
+    props = None
+    nested = 0
+    for line in unfold_lines(source):
+        if props is None:
+            if line == "BEGIN:VEVENT":
+                props = {}
+            continue
+
+        if line.startswith("BEGIN:"):
+            nested += 1
+            continue
+        if line.startswith("END:"):
+            if nested:
+                nested -= 1
+                continue
+            if line == "END:VEVENT":
+                yield props
+                props = None
+            continue
+        if nested:
+            continue
+
+        match = wanted(line)
+        if match:
+            name = match.group(1).upper()
+            if name in MULTI_PROPERTIES:
+                props.setdefault(name, []).append(line)
+            else:
+                props[name] = line
+
+
+def event_end(props, begin, all_day, default_tz):
+    """Return the end of a VEVENT starting at begin, from DTEND or DURATION, or None if it has neither."""
+    if "DTEND" in props:
+        _, end_params, end_value = parse_property(props["DTEND"])
+        end, _ = parse_datetime(end_value, end_params, default_tz)
+        return end
+    if "DURATION" in props:
+        duration = parse_duration(parse_property(props["DURATION"])[2])
+        return begin + duration if duration is not None else None
+    if all_day:
+        return begin + timedelta(days=1)
+    return None
+
+
+def build_event(props, begin, all_day, default_tz, uid=None, end=False, series_uid=None):
+    """
+    Create a CalendarEvent from the raw property lines of one VEVENT.
+    uid and end replace the VEVENT's own, for occurrences of a recurring event.
+    """
+    def raw(name):
+        return parse_property(props[name])[2] if name in props else None
+
+    def text(name):
+        return unescape_text(raw(name)) if name in props else None
+
+    if end is False:
+        end = event_end(props, begin, all_day, default_tz)
+
+    sequence = (raw("SEQUENCE") or "0").strip()
+    return CalendarEvent(
+        uid=uid or raw("UID"),
+        name=text("SUMMARY"),
+        description=text("DESCRIPTION"),
+        location=text("LOCATION"),
+        begin=begin,
+        end=end,
+        all_day=all_day,
+        sequence=int(sequence) if sequence.isdigit() else 0,
+        last_modified=raw("LAST-MODIFIED"),
+        status=raw("STATUS"),
+        series_uid=series_uid,
+    )
+
+
+def _series_dates(lines, tz, default_tz):
+    """Yield each RDATE/EXDATE value of lines as (wall time in tz, is_date). PERIOD values are not supported."""
+    for line in lines:
+        _, params, value = parse_property(line)
+        if params.get("VALUE") == "PERIOD":
+            continue
+        for item in value.split(","):
+            try:
+                naive, value_tz, is_date = parse_local_datetime(item, params, default_tz)
+            except ValueError:
+                continue
+            if not is_date and value_tz is not tz:
+                naive = value_tz.localize(naive).astimezone(tz).replace(tzinfo=None)
+            yield naive, is_date
+
+
+def _rule_with_local_until(rule, tz):
+    """
+    Return an RRULE value with a UTC UNTIL converted to wall time in tz; dateutil
+    needs UNTIL to be naive like the (wall time) start it expands from.
+    """
+    parts = rule.strip().split(";")
+    for index, part in enumerate(parts):
+        name, _, value = part.partition("=")
+        if name.upper() == "UNTIL" and value.upper().endswith("Z") and len(value) >= 16:
+            until = pytz.utc.localize(datetime.strptime(value[:15], "%Y%m%dT%H%M%S"))
+            parts[index] = "UNTIL=" + until.astimezone(tz).strftime("%Y%m%dT%H%M%S")
+    return ";".join(parts)
+
+
+def _rule_start(rule, first, lower):
+    """
+    Return the latest start at or before lower from which a DAILY or WEEKLY
+    RRULE without COUNT expands to the same occurrences as from first, so a
+    rule that has run for years is not stepped through from its first day.
+    Other rules have to start from first.
+    """
+    parts = dict(part.partition("=")[::2] for part in rule.upper().split(";"))
+    step = {"DAILY": 1, "WEEKLY": 7}.get(parts.get("FREQ"))
+    if step is None or "COUNT" in parts or lower is None or lower <= first:
+        return first
+    step *= int(parts.get("INTERVAL") or 1)
+    return first + timedelta(days=(lower - first).days // step * step)
+
+
+def iter_occurrences(props, default_tz, start=None, end=None):
+    """
+    Return a lazy iterator of (occurrence key, begin, end) for the occurrences
+    of a recurring VEVENT (RRULE and/or RDATE) that start inside start..end, in
+    order, leaving out EXDATEs. Occurrences are generated in the event's own
+    timezone, so they keep their wall-clock time across daylight saving
+    changes. Without an end, at most MAX_UNBOUNDED_OCCURRENCES are yielded.
+    The event is parsed before this returns, so a malformed DTSTART or RRULE
+    raises ValueError here and not halfway through the occurrences.
+    """
+    _, params, value = parse_property(props["DTSTART"])
+    first, tz, all_day = parse_local_datetime(value, params, default_tz)
+    first_end = event_end(props, tz.localize(first), all_day, default_tz)
+    length = first_end.astimezone(tz).replace(tzinfo=None) - first if first_end is not None else None
+
+    lower = start.astimezone(tz).replace(tzinfo=None) if start is not None else None
+    series = rruleset()
+    series.rdate(first)  # DTSTART is always the first occurrence
+    if "RRULE" in props:
+        rule = _rule_with_local_until(parse_property(props["RRULE"])[2], tz)
+        series.rrule(rrulestr(rule, dtstart=_rule_start(rule, first, lower)))
+    for naive, _ in _series_dates(props.get("RDATE", []), tz, default_tz):
+        series.rdate(naive)
+    excluded = {occurrence_key(tz.localize(naive), all_day or is_date)
+                for naive, is_date in _series_dates(props.get("EXDATE", []), tz, default_tz)}
+
+    occurrences = iter(series) if lower is None else series.xafter(lower, inc=True)
+    return _expand(occurrences, tz, all_day, length, excluded, end)
+
+
+def _expand(occurrences, tz, all_day, length, excluded, end):
+    """Generator behind iter_occurrences(): turns the rruleset's wall times into occurrences."""
+    for count, naive in enumerate(occurrences):
+        begin = tz.localize(naive)
+        if end is not None and begin > end:
+            break
+        if end is None and count >= MAX_UNBOUNDED_OCCURRENCES:
+            break
+        key = occurrence_key(begin, all_day)
+        if key in excluded:
+            continue
+        yield key, begin, tz.localize(naive + length) if length is not None else None
+
+
+def iter_events(source, default_tz, start=None, end=None, seen_uids=None):
+    """
+    Yield CalendarEvents from iCal text (or an iterable of lines).
+    When start/end are given, only events whose start falls inside
+    start <= begin <= end are built; the rest are discarded after reading DTSTART.
+    If seen_uids is a set, the UID of every VEVENT in the feed is added to it,
+    including events outside the window. For recurring events it gets the ids
+    of the occurrences from a day before start (so the ones earlier today
+    count as still in the feed) to end, and of every moved occurrence. A
+    recurring event that cannot be expanded adds f"{uid}/{UNKNOWN_OCCURRENCES}",
+    meaning that all of its occurrences should be treated as still in the feed.
+
+    Single events are yielded while the feed is read. Recurring events and
+    their overrides are kept as raw property lines until the end of the feed,
+    because an override may come before or after the event it changes, and
+    are then expanded.
+    """
+    series = []  # Raw properties of the recurring VEVENTs
+    overrides = {}  # (UID, occurrence key) -> raw properties of the VEVENT with that RECURRENCE-ID
+    for props in iter_vevent_properties(source):
+        uid = parse_property(props["UID"])[2] if "UID" in props else None
+        if "DTSTART" not in props:
+            if seen_uids is not None and uid:
+                seen_uids.add(uid)
+            continue
+        if "RECURRENCE-ID" in props:
+            _, params, value = parse_property(props["RECURRENCE-ID"])
+            try:
+                recurrence_id, is_date = parse_datetime(value, params, default_tz)
+            except ValueError:
+                continue
+            overrides[(uid, occurrence_key(recurrence_id, is_date))] = props
+            continue
+        if "RRULE" in props or "RDATE" in props:
+            series.append(props)
+            continue
+
+        if seen_uids is not None and uid:
+            seen_uids.add(uid)
+        _, params, value = parse_property(props["DTSTART"])
+        try:
+            begin, all_day = parse_datetime(value, params, default_tz)
+        except ValueError:
+            continue  # Malformed date
+
+        if start is not None and begin < start:
+            continue
+        if end is not None and begin > end:
+            continue
+
+        yield build_event(props, begin, all_day, default_tz)
+
+    for props in series:
+        uid = parse_property(props["UID"])[2] if "UID" in props else None
+        _, params, value = parse_property(props["DTSTART"])
+        try:
+            all_day = parse_local_datetime(value, params, default_tz)[2]
+            occurrences = iter_occurrences(props, default_tz, start and start - timedelta(days=1), end)
+        except ValueError:
+            # Malformed date or RRULE: the series is still in the feed, its occurrences just unknown
+            if seen_uids is not None and uid:
+                seen_uids.add(f"{uid}/{UNKNOWN_OCCURRENCES}")
+            continue
+        for key, begin, occurrence_end in occurrences:
+            if (uid, key) in overrides:
+                continue  # Replaced by the override, handled below
+            if seen_uids is not None:
+                seen_uids.add(f"{uid}/{key}")
+            if start is None or begin >= start:
+                yield build_event(props, begin, all_day, default_tz, uid=f"{uid}/{key}",
+                                  end=occurrence_end, series_uid=uid)
+
+    for (uid, key), props in overrides.items():
+        status = parse_property(props["STATUS"])[2].strip().upper() if "STATUS" in props else ""
+        if status == "CANCELLED":
+            continue  # The occurrence was deleted
+        if seen_uids is not None:
+            seen_uids.add(f"{uid}/{key}")
+        _, params, value = parse_property(props["DTSTART"])
+        try:
+            begin, all_day = parse_datetime(value, params, default_tz)
+        except ValueError:
+            continue
+        if (start is None or begin >= start) and (end is None or begin <= end):
+            yield build_event(props, begin, all_day, default_tz, uid=f"{uid}/{key}", series_uid=uid)
+
+
+def collect_events(source, default_tz, start=None, end=None):
+    """
+    Parse a whole feed and return (events in the window, set of every UID).
+    A plain module-level function so it can run in a worker process.
+    """
+    seen_uids = set()
+    events = list(iter_events(source, default_tz, start=start, end=end, seen_uids=seen_uids))
+    return events, seen_uids
+
+
+def _shift_date_line(line, days):
+    """Move the DATE or DATE-TIME value of a DTSTART/DTEND line by days."""
+    head, _, value = line.rpartition(":")
+    if len(value) == 8:
+        return f"{head}:{(datetime.strptime(value, '%Y%m%d') + timedelta(days=days)):%Y%m%d}"
+    shifted = datetime.strptime(value[:15], "%Y%m%dT%H%M%S") + timedelta(days=days)
+    return f"{head}:{shifted:%Y%m%dT%H%M%S}{value[15:]}"
+
+
+def scaled_feed(source, count, now):
+    """
+    Return the text of a feed with count VEVENTs, made by repeating the
+    VEVENTs of source with new UIDs and spreading the copies evenly over
+    BENCHMARK_YEARS years of history and the year after now, like a calendar
+    that has been in use for a long time.
+    """
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    lines = list(unfold_lines(text))
+    first = lines.index("BEGIN:VEVENT")
+    header = lines[:first]
+    blocks, block = [], None
+    for line in lines[first:]:
+        if line == "BEGIN:VEVENT":
+            block = [line]
+        elif block is not None:
+            block.append(line)
+            if line == "END:VEVENT":
+                blocks.append(block)
+                block = None
+    starts = [datetime.strptime(line.rpartition(":")[2][:8], "%Y%m%d")
+              for block in blocks for line in block if line.startswith("DTSTART")]
+    origin = now.replace(tzinfo=None) - timedelta(days=365 * (BENCHMARK_YEARS - 1)) - min(starts)
+    step = 365 * BENCHMARK_YEARS / max(1, count // len(blocks))
+
+    out = header[:]
+    for number in range(count):
+        copy, block = divmod(number, len(blocks))
+        days = origin.days + int(copy * step)
+        for line in blocks[block]:
+            if line.startswith(("DTSTART", "DTEND")):
+                line = _shift_date_line(line, days)
+            elif line.startswith("UID"):
+                line = f"UID:{copy}-{line[4:]}"
+            out.append(line)
+    out.append("END:VCALENDAR")
+    return "\r\n".join(out) + "\r\n"
+
+
+def _write_scaled_feed(source, count, now):
+    """Write scaled_feed() to a temporary file; returns (path, UIDs of the recurring events in it)."""
+    text = scaled_feed(source, count, now)
+    with tempfile.NamedTemporaryFile("w", suffix=".ics", encoding="utf-8", newline="", delete=False) as f:
+        f.write(text)
+    series_uids = {props["UID"].partition(":")[2] for props in iter_vevent_properties(text)
+                   if "RRULE" in props or "RDATE" in props}
+    return f.name, series_uids
+
+
+def _in_fresh_process(function, *args):
+    """
+    Run function in a new process and return its result. Linux carries a
+    process's peak RSS over fork and exec, so the parent is kept small: the
+    feed is built in a child of its own too.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(function, *args).result()
+
+
+def _measure(method, path, start, end, series_uids):
+    """
+    Parse the feed at path with method in this (fresh) process. Returns
+    (seconds, peak RSS in MB, single events in the window, occurrences of
+    recurring events in the window); ics does not expand recurring events,
+    so it reports no occurrences and leaves the series (series_uids) out.
+    """
+    import resource  # Unix only, like the benchmark
+
+    began = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    tz = pytz.timezone(BENCHMARK_TIMEZONE)
+    if method == "stream":
+        events = collect_events(text, tz, start, end)[0]
+    elif method == "ics":
+        from ics import Calendar
+        events = [event for event in Calendar(text).events if start <= event.begin.datetime <= end]
+    else:
+        events = []  # Baseline: reading the file only
+    seconds = time.perf_counter() - began
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    if method == "stream":
+        occurrences = sum(1 for event in events if event.series_uid)
+        return seconds, peak, len(events) - occurrences, occurrences
+    return seconds, peak, sum(1 for event in events if event.uid not in series_uids), 0
+
+
+def benchmark(count, source=BENCHMARK_SOURCE):
+    """
+    Compare parse time and peak RSS of the streaming parser with the ics
+    library's Calendar on a feed of count events. Each parse runs in a fresh
+    process, so the peaks do not include each other.
+    """
+    tz = pytz.timezone(BENCHMARK_TIMEZONE)
+    start = datetime.now(tz)
+    end = start + timedelta(days=120)
+    path, series_uids = _in_fresh_process(_write_scaled_feed, source, count, start)
+    try:
+        methods = ["baseline", "stream"]
+        try:
+            import ics  # noqa: F401 - only needed for the comparison
+            methods.append("ics")
+        except ImportError:
+            print("The ics library is not installed, so only the streaming parser is timed (pip install ics).")
+
+        print(f"{count} events, {os.path.getsize(path) / 1e6:.1f} MB feed")
+        results = {method: _in_fresh_process(_measure, method, path, start, end, series_uids) for method in methods}
+        base_rss = results["baseline"][1]
+        for method in methods[1:]:
+            seconds, peak, single, occurrences = results[method]
+            print(f"{method:7} {seconds * 1000:9.0f} ms  peak RSS {peak:7.1f} MB "
+                  f"(+{peak - base_rss:.1f} MB over reading the file)  {single} events in the window"
+                  + (f" + {occurrences} occurrences of recurring events" if occurrences else ""))
+        if "ics" in results and results["ics"][2] != results["stream"][2]:
+            print("The parsers found a different number of events in the window!")
+            return 1
+        return 0
+    finally:
+        os.remove(path)
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Streaming iCalendar reader")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bench = subparsers.add_parser("benchmark", help="Compare the streaming parser with ics.Calendar on a large feed")
+    bench.add_argument("--events", type=int, default=50000, help="Number of events in the scaled-up feed")
+    bench.add_argument("--source", default=BENCHMARK_SOURCE, help="Feed whose events are repeated")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    return benchmark(args.events, args.source)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Turn event images into small, web-ready derivatives.
+
+Each source image is rotated according to its EXIF orientation, stripped of
+EXIF and other metadata, and saved as AVIF, WebP and JPEG at a few fixed widths
+in static/images/derived/. File names start with a hash of the source bytes,
+so ingesting the same picture twice costs nothing and a replaced picture never
+reuses a cached URL. The record returned for each image is stored on the event
+as "imageVariants" and lists every file with its dimensions, so the templates
+can emit srcset attributes.
+
+Usage:
+    python image_pipeline.py ingest themes/mcp-theme/assets/images/photo.jpg
+    python image_pipeline.py backfill [--workers N] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps, features
+
+import event_archive
+import event_feed
+import event_snapshot
+import event_store
+
+# Build paths relative to the script's location
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+
+IMAGE_DIR = os.path.join(BASE_DIR, "themes/mcp-theme/assets/images")  # Originals, as uploaded
+DERIVED_DIR = os.path.join(BASE_DIR, "static/images/derived")
+DERIVED_URL = "/images/derived"
+EVENTS_FILE = os.path.join(BASE_DIR, "themes/mcp-theme/data/events.json")
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".bmp", ".tif", ".tiff"}
+
+WIDTHS = (400, 800, 1200)  # 400 for desktop list thumbnails, 800 for phones, 1200 for the lightbox
+# Format name -> (file extension, Pillow save options), best compression first
+FORMATS = {
+    "avif": ("avif", {"quality": 60, "speed": 6}),
+    "webp": ("webp", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def available_formats():
+    """Return the formats this Pillow build can write; AVIF needs Pillow 11.3+ or pillow-avif-plugin."""
+    return [name for name in FORMATS if name == "jpeg" or features.check(name)]
+
+
+def source_hash(path):
+    """Return a short hash of the file's bytes, used to name its derivatives."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def target_widths(width):
+    """Return the widths to generate for an image that is width pixels wide."""
+    widths = [w for w in WIDTHS if w < width]
+    # Never upscale, but always produce at least one variant at the original size
+    if len(widths) < len(WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def _save_atomic(image, path, image_format, options):
+    """Save image so that a crash never leaves a partial file under the final name."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, format=image_format, **options)
+        os.chmod(tmp_path, event_store.new_file_mode(path))  # mkstemp's 0600 would follow the file into public/
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def ingest_image(path, force=False, digest=None):
+    """
+    Generate the derivatives of one image and return its variants record:
+    {"hash", "width", "height", "<format>": [{"src", "width", "height"}, ...]}.
+    Files that already exist are reused unless force is set.
+    """
+    digest = digest or source_hash(path)
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)  # Apply the camera's rotation
+        # A CMYK or greyscale profile would be wrong once the pixels are converted to RGB
+        icc_profile = original.info.get("icc_profile") if original.mode in ("RGB", "RGBA") else None
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    image.info = {}  # Drop EXIF, comments and other metadata
+    if icc_profile:
+        image.info["icc_profile"] = icc_profile
+
+    record = {"hash": digest, "width": image.width, "height": image.height}
+    formats = available_formats()
+    for name in formats:
+        record[name] = []
+
+    for width in target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = None
+        for name in formats:
+            extension, options = FORMATS[name]
+            filename = f"{digest}-{width}.{extension}"
+            output_path = os.path.join(DERIVED_DIR, filename)
+            if force or not os.path.exists(output_path):
+                if resized is None:
+                    resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+                frame = resized
+                if name == "jpeg" and has_alpha:
+                    # JPEG has no transparency; flatten onto white like the site background
+                    frame = Image.new("RGB", resized.size, (255, 255, 255))
+                    frame.paste(resized, mask=resized.getchannel("A"))
+                if icc_profile:
+                    options = dict(options, icc_profile=icc_profile)
+                _save_atomic(frame, output_path, name.upper(), options)
+            record[name].append({"src": f"{DERIVED_URL}/{filename}", "width": width, "height": height})
+    return record
+
+
+def _ingest_worker(args):
+    path, force, digest = args
+    try:
+        return path, ingest_image(path, force=force, digest=digest), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def ingest_many(paths, workers=None, force=False):
+    """
+    Ingest several images across worker processes and return ({path: record}, {path: error}).
+    Byte-identical files are only processed once.
+    """
+    by_digest = {}
+    for path in paths:
+        by_digest.setdefault(source_hash(path), []).append(path)
+
+    records, errors = {}, {}
+    jobs = [(same_paths[0], force, digest) for digest, same_paths in by_digest.items()]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (_, _, digest), (_, record, error) in zip(jobs, pool.map(_ingest_worker, jobs)):
+            for path in by_digest[digest]:
+                if error is None:
+                    records[path] = record
+                else:
+                    errors[path] = error
+    return records, errors
+
+
+def image_url_to_path(url):
+    """Map an event's "image" value (e.g. /images/store/ab12.jpg) to the original in the assets directory."""
+    relative = (url or "").lstrip("/")
+    if relative.startswith("images/"):
+        relative = relative[len("images/"):]
+    return os.path.abspath(os.path.join(IMAGE_DIR, relative))
+
+
+def data_files():
+    """Return every data file that holds events: events.json and the archive partitions."""
+    return [EVENTS_FILE] + event_archive.partition_files()
+
+
+def attach_variants(records_by_path, event_files=None):
+    """Store the records on every event whose image is one of the ingested files. Returns the count."""
+    updated = 0
+    for event_file in event_files or data_files():
+        if not os.path.exists(event_file):
+            continue
+        with event_store.file_lock(event_file):
+            data = event_snapshot.load_json(event_file)
+            changed = False
+            for event in data.get("events", []):
+                if not event.get("image"):
+                    continue
+                record = records_by_path.get(image_url_to_path(event["image"]))
+                if record and event.get("imageVariants") != record:
+                    event["imageVariants"] = record
+                    changed = True
+                    updated += 1
+            if changed:
+                event_feed.save_events(event_file, data)  # The feed and month shards show the variants too
+    return updated
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate resized web derivatives of event images")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Process one image, print its variants record and update events using it")
+    ingest.add_argument("image", help="Image file to process")
+    ingest.add_argument("--force", action="store_true", help="Regenerate files that already exist")
+
+    backfill = subparsers.add_parser("backfill", help="Process every image in the assets directory and update the events")
+    backfill.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    backfill.add_argument("--force", action="store_true", help="Regenerate files that already exist")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    print(f"Writing {', '.join(available_formats())} derivatives to {DERIVED_DIR}")
+
+    if args.command == "ingest":
+        record = ingest_image(args.image, force=args.force)
+        print(json.dumps(record, indent=2))
+        updated = attach_variants({os.path.abspath(args.image): record})
+        print(f"Updated {updated} events.")
+        return 0
+
+    paths = sorted(
+        os.path.abspath(os.path.join(directory, name))
+        for directory, _, names in os.walk(IMAGE_DIR) for name in names
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )
+    print(f"Processing {len(paths)} images...")
+    records, errors = ingest_many(paths, workers=args.workers, force=args.force)
+    for path, error in sorted(errors.items()):
+        print(f"Error processing {os.path.basename(path)}: {error}")
+    updated = attach_variants(records)
+    print(f"Processed {len(records)} images, updated {updated} events.")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Content-addressed storage for event images.
+
+An image added to the store is saved once as themes/mcp-theme/assets/images/store/
+<hash><ext>, where the hash is taken from its bytes, and events refer to it by
+that URL. Adding the same picture again, under any name, reuses the existing
+file. A perceptual hash (dHash) of every image is also kept so the editor can
+point out near-duplicates, such as a re-saved or resized copy of a flyer that is
+already in the store.
+
+Usage:
+    python image_store.py add path/to/flyer.jpg
+    python image_store.py migrate     # Move every event's image into the store
+    python image_store.py gc [--delete]
+    python image_store.py verify
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from PIL import Image, ImageOps
+
+import event_feed
+import event_snapshot
+import event_store
+import image_pipeline
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+
+IMAGE_DIR = image_pipeline.IMAGE_DIR
+STORE_DIR = os.path.join(IMAGE_DIR, "store")
+STORE_URL = "/images/store"
+STATIC_IMAGE_DIR = os.path.join(BASE_DIR, "static/images")  # Served as-is, referenced from templates by name
+HASH_CACHE_FILE = os.path.join(event_store.CACHE_DIR, "image_hashes.json")
+
+# Images referenced from code rather than from an event (import-calendar.py's DEFAULT_IMAGE)
+PINNED_IMAGES = {"/images/demo.png"}
+EXTENSION_ALIASES = {".jpeg": ".jpg", ".tif": ".tiff"}
+DHASH_SIZE = 8  # 8x8 gradient bits = 64-bit hash
+NEAR_DUPLICATE_BITS = 6  # Hashes differing in at most this many bits are the same picture
+
+
+def store_url(digest, extension):
+    """Return the event "image" URL of a stored file."""
+    return f"{STORE_URL}/{digest}{extension}"
+
+
+def perceptual_hash(path):
+    """
+    Return the 64-bit difference hash of an image: one bit per pair of neighbouring
+    pixels in a tiny greyscale copy, set when brightness increases to the right.
+    Resizing, recompression and small colour changes leave most bits unchanged.
+    """
+    with Image.open(path) as image:
+        image.draft("L", (DHASH_SIZE * 8, DHASH_SIZE * 8))  # JPEGs decode straight at a reduced scale
+        small = ImageOps.exif_transpose(image).convert("L").resize(
+            (DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(DHASH_SIZE):
+            bits = bits << 1 | (pixels[offset + col] < pixels[offset + col + 1])
+    return bits
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class HashCache:
+    """Remembers each file's content and perceptual hash until its mtime or size changes."""
+
+    def __init__(self, path=None):
+        self.path = path or HASH_CACHE_FILE
+        self.changed = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def hashes(self, path):
+        """Return (content hash, perceptual hash or None if the file is not a readable image)."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2], entry[3]
+        digest = image_pipeline.source_hash(path)
+        try:
+            dhash = perceptual_hash(path)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            dhash = None
+        self.entries[path] = [stat.st_mtime_ns, stat.st_size, digest, dhash]
+        self.changed = True
+        return digest, dhash
+
+    def save(self):
+        if self.changed:
+            # Drop entries for files that no longer exist
+            self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+            event_store.write_json(self.path, self.entries, backups=0)
+            self.changed = False
+
+
+def stored_images():
+    """Return the paths of every file in the store."""
+    if not os.path.isdir(STORE_DIR):
+        return []
+    return sorted(os.path.join(STORE_DIR, name) for name in os.listdir(STORE_DIR) if not name.startswith("."))
+
+
+def similar_images(path, cache):
+    """
+    Return [(stored path, distance)] for stored images that look like path but are
+    not byte-identical to it, closest first.
+    """
+    digest, dhash = cache.hashes(path)
+    if dhash is None:
+        return []
+    matches = []
+    for stored in stored_images():
+        stored_digest, stored_dhash = cache.hashes(stored)
+        if stored_digest == digest or stored_dhash is None:
+            continue
+        distance = hamming_distance(dhash, stored_dhash)
+        if distance <= NEAR_DUPLICATE_BITS:
+            matches.append((stored, distance))
+    return sorted(matches, key=lambda match: match[1])
+
+
+def add_image(path, cache=None):
+    """Copy path into the store, unless it is already there, and return its URL."""
+    digest = cache.hashes(path)[0] if cache else image_pipeline.source_hash(path)
+    extension = os.path.splitext(path)[1].lower()
+    extension = EXTENSION_ALIASES.get(extension, extension)
+    destination = os.path.join(STORE_DIR, digest + extension)
+    if not os.path.exists(destination):
+        os.makedirs(STORE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=STORE_DIR, prefix=".", suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(path, tmp_path)
+            os.chmod(tmp_path, event_store.new_file_mode(destination))  # Not mkstemp's 0600
+            os.replace(tmp_path, destination)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return store_url(digest, extension)
+
+
+def iter_event_images(event_files=None):
+    """Yield (event file, event) for every event that has an image."""
+    for event_file in event_files or image_pipeline.data_files():
+        if not os.path.exists(event_file):
+            continue
+        for event in event_snapshot.load_json(event_file).get("events", []):
+            if event.get("image"):
+                yield event_file, event
+
+
+def referenced_images(event_files=None):
+    """Return the asset paths of every image an event (or the code) refers to."""
+    urls = {event["image"] for _, event in iter_event_images(event_files)} | PINNED_IMAGES
+    return {image_pipeline.image_url_to_path(url) for url in urls}
+
+
+def migrate(event_files=None, cache=None):
+    """Move the images of all events into the store and point the events at it. Returns the count."""
+    updated = 0
+    for event_file in event_files or image_pipeline.data_files():
+        if not os.path.exists(event_file):
+            continue
+        with event_store.file_lock(event_file):
+            data = event_snapshot.load_json(event_file)
+            changed = False
+            for event in data.get("events", []):
+                url = event.get("image")
+                if not url or url.startswith(STORE_URL + "/") or url in PINNED_IMAGES:
+                    continue
+                path = image_pipeline.image_url_to_path(url)
+                if not os.path.exists(path):
+                    print(f"Skipping {event.get('id')}: {url} does not exist")
+                    continue
+                event["image"] = add_image(path, cache)
+                changed = True
+                updated += 1
+            if changed:
+                event_feed.save_events(event_file, data)  # Also rewrites feed.json
+    return updated
+
+
+def scan(cache):
+    """Return [(path, content hash, perceptual hash)] for every original image and static image."""
+    entries = []
+    for root in (IMAGE_DIR, STATIC_IMAGE_DIR):
+        for directory, subdirs, names in os.walk(root):
+            # Derivatives are named after their source, they are not separate images
+            subdirs[:] = [d for d in subdirs if os.path.join(directory, d) != image_pipeline.DERIVED_DIR]
+            for name in sorted(names):
+                if os.path.splitext(name)[1].lower() in image_pipeline.IMAGE_EXTENSIONS:
+                    path = os.path.join(directory, name)
+                    entries.append((path, *cache.hashes(path)))
+    return entries
+
+
+def duplicate_groups(entries):
+    """Group byte-identical files. Returns a list of path lists with two or more entries."""
+    by_digest = {}
+    for path, digest, _ in entries:
+        by_digest.setdefault(digest, []).append(path)
+    return [paths for paths in by_digest.values() if len(paths) > 1]
+
+
+def near_duplicate_groups(entries):
+    """Group visually similar, but not identical, images. Each group lists one path per distinct file."""
+    unique = {}
+    for path, digest, dhash in entries:
+        if dhash is not None:
+            unique.setdefault(digest, (path, dhash))
+    items = list(unique.values())
+
+    # Union-find over every pair that is close enough
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(items)):
+        for j in range(i + 1, len(items)):
+            if hamming_distance(items[i][1], items[j][1]) <= NEAR_DUPLICATE_BITS:
+                parent[find(i)] = find(j)
+
+    groups = {}
+    for i, (path, _) in enumerate(items):
+        groups.setdefault(find(i), []).append(path)
+    return [paths for paths in groups.values() if len(paths) > 1]
+
+
+def _relative(path):
+    return os.path.relpath(path, BASE_DIR)
+
+
+def _size(paths):
+    return sum(os.path.getsize(path) for path in paths)
+
+
+def gc(delete=False, event_files=None):
+    """Report orphaned and duplicated images; with delete, remove orphans from the assets directory."""
+    cache = HashCache()
+    entries = scan(cache)
+    referenced = referenced_images(event_files)
+    referenced_digests = {cache.hashes(path)[0] for path in referenced if os.path.exists(path)}
+
+    # Only the assets directory is checked for orphans: static images are linked from templates by name
+    orphans = [path for path, _, _ in entries
+               if path.startswith(IMAGE_DIR + os.sep) and os.path.abspath(path) not in referenced]
+    derived = []
+    if os.path.isdir(image_pipeline.DERIVED_DIR):
+        derived = [os.path.join(image_pipeline.DERIVED_DIR, name) for name in sorted(os.listdir(image_pipeline.DERIVED_DIR))
+                   if name.partition("-")[0] not in referenced_digests]
+
+    for paths in duplicate_groups(entries):
+        print(f"Identical ({os.path.getsize(paths[0]):,} bytes each): {', '.join(_relative(p) for p in paths)}")
+    for paths in near_duplicate_groups(entries):
+        print(f"Look alike: {', '.join(_relative(p) for p in paths)}")
+    print(f"{len(orphans)} original images ({_size(orphans):,} bytes) are not used by any event.")
+    print(f"{len(derived)} derived files ({_size(derived):,} bytes) belong to no used image.")
+
+    if delete:
+        for path in orphans + derived:
+            os.remove(path)
+        print(f"Deleted {len(orphans) + len(derived)} files.")
+    cache.save()
+    return 0
+
+
+def verify(event_files=None):
+    """Check that stored files match their names and that every event's files exist. Returns problems found."""
+    cache = HashCache()
+    problems = []
+    for path in stored_images():
+        if cache.hashes(path)[0] != os.path.splitext(os.path.basename(path))[0]:
+            problems.append(f"{_relative(path)} does not match its hash; the file was modified")
+    for event_file, event in iter_event_images(event_files):
+        label = f"{os.path.basename(event_file)}: {event.get('id')}"
+        if not os.path.exists(image_pipeline.image_url_to_path(event["image"])):
+            problems.append(f"{label} uses missing image {event['image']}")
+        for name in image_pipeline.FORMATS:
+            for variant in (event.get("imageVariants") or {}).get(name, []):
+                variant_path = os.path.join(image_pipeline.DERIVED_DIR, os.path.basename(variant["src"]))
+                if not os.path.exists(variant_path):
+                    problems.append(f"{label} uses missing derivative {variant['src']}")
+    cache.save()
+    for problem in problems:
+        print(problem)
+    print(f"{len(problems)} problems found.")
+    return problems
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Manage the content-addressed event image store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add = subparsers.add_parser("add", help="Add an image to the store and print its URL")
+    add.add_argument("image", help="Image file to add")
+    subparsers.add_parser("migrate", help="Move every event's image into the store")
+    collect = subparsers.add_parser("gc", help="Report unused and duplicated images")
+    collect.add_argument("--delete", action="store_true", help="Delete the unused originals and derivatives")
+    subparsers.add_parser("verify", help="Check the store and the images events refer to")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+
+    if args.command == "add":
+        cache = HashCache()
+        for path, distance in similar_images(args.image, cache):
+            print(f"Looks like {_relative(path)} ({distance} bits differ)")
+        print(add_image(args.image, cache))
+        cache.save()
+        return 0
+    if args.command == "migrate":
+        cache = HashCache()
+        updated = migrate(cache=cache)
+        cache.save()
+        print(f"Moved the images of {updated} events into the store. Run 'gc' to find what is left over.")
+        return 0
+    if args.command == "gc":
+        return gc(delete=args.delete)
+    return 1 if verify() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
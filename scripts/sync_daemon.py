@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Keeps the site in step with Google Calendar from one long-running process.
+
+Instead of a scheduler starting import-calendar.py and then always rebuilding
+the site, the daemon stays up with its modules loaded and one pooled HTTP
+session, and polls the feeds with calendar_sync.sync():
+
+- During ACTIVE_HOURS (local time) it polls every ACTIVE_INTERVAL seconds,
+  overnight every IDLE_INTERVAL. Each poll that finds nothing new doubles the
+  wait, up to BACKOFF_LIMIT times the base; a change or a new period resets
+  it. Failed polls back off the same way.
+- After each poll it fingerprints the generated data files and the images
+  (WATCHED_DIRS, which also catches saves and uploads in the event editor)
+  and runs Hugo only when the fingerprint differs from the one of the last
+  successful build. The fingerprint of the last build is kept in
+  BUILD_STATE_FILE, so a restart does not rebuild an unchanged site.
+- A small HTTP server on localhost answers /health (JSON) and /metrics
+  (Prometheus text format).
+
+SIGTERM or Ctrl+C stops it; a sync in progress is cancelled unless it has
+started saving.
+
+Usage:
+    python sync_daemon.py                   # Poll, build into public/, serve /health on port 8787
+    python sync_daemon.py --once            # One poll and build if needed, then exit
+    python sync_daemon.py --no-build --port 0
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytz
+
+import calendar_sync
+import event_feed
+import event_store
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir))
+
+# Everything Hugo reads that the importer or the editor writes: the data files,
+# the uploaded images Hugo resizes, and the image variants served as they are
+IMAGE_DIR = os.path.join(BASE_DIR, "themes/mcp-theme/assets/images")
+STATIC_IMAGE_DIR = os.path.join(BASE_DIR, "static/images")
+WATCHED_DIRS = (os.path.dirname(event_feed.EVENTS_FILE), event_feed.SHARD_DIR, IMAGE_DIR, STATIC_IMAGE_DIR)
+BUILD_STATE_FILE = os.path.join(calendar_sync.CACHE_DIR, "daemon_build.json")
+HUGO_COMMAND = "hugo --minify"
+BUILD_TIMEOUT = 600
+
+ACTIVE_HOURS = (7, 22)  # Local hours [start, end) when events are added and edited the most
+ACTIVE_INTERVAL = 5 * 60
+IDLE_INTERVAL = 30 * 60
+BACKOFF_LIMIT = 4  # The wait grows to at most this many times the base interval
+HEALTH_HOST = "127.0.0.1"
+HEALTH_PORT = 8787
+UNHEALTHY_FAILURES = 3  # /health reports 503 after this many failed polls in a row
+
+
+def log(message=""):
+    """Print a line with a timestamp."""
+    print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {message}", flush=True)
+
+
+@dataclass
+class DaemonStats:
+    """Counters and timings reported by /health and /metrics."""
+    started: float = field(default_factory=time.time)
+    polls: int = 0
+    polls_changed: int = 0
+    poll_failures: int = 0
+    failures_in_a_row: int = 0
+    events_added: int = 0
+    events_updated: int = 0
+    events_deleted: int = 0
+    builds: int = 0
+    builds_skipped: int = 0
+    build_failures: int = 0
+    last_poll: float = 0.0  # Unix time
+    last_poll_seconds: float = 0.0
+    last_build: float = 0.0
+    last_build_seconds: float = 0.0
+    last_error: str = ""
+    next_poll: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def health(self):
+        """Return (HTTP status, JSON-ready dict)."""
+        with self.lock:
+            healthy = self.failures_in_a_row < UNHEALTHY_FAILURES
+            status = {
+                "status": "ok" if healthy else "failing",
+                "uptimeSeconds": round(time.time() - self.started),
+                "lastPoll": _iso(self.last_poll),
+                "lastBuild": _iso(self.last_build),
+                "nextPoll": _iso(self.next_poll),
+                "failuresInARow": self.failures_in_a_row,
+                "lastError": self.last_error or None,
+            }
+        return (200 if healthy else 503), status
+
+    def metrics(self):
+        """Return the counters in the Prometheus text format."""
+        with self.lock:
+            values = (
+                ("polls_total", "counter", "Calendar polls", self.polls),
+                ("polls_changed_total", "counter", "Polls that changed events.json", self.polls_changed),
+                ("poll_failures_total", "counter", "Polls that failed or had a failing feed", self.poll_failures),
+                ("events_added_total", "counter", "Events added", self.events_added),
+                ("events_updated_total", "counter", "Events updated from the calendar", self.events_updated),
+                ("events_deleted_total", "counter", "Events removed from the calendar", self.events_deleted),
+                ("builds_total", "counter", "Hugo builds run", self.builds),
+                ("builds_skipped_total", "counter", "Polls after which the data was unchanged", self.builds_skipped),
+                ("build_failures_total", "counter", "Hugo builds that failed", self.build_failures),
+                ("last_poll_timestamp_seconds", "gauge", "Unix time of the last poll", self.last_poll),
+                ("last_poll_duration_seconds", "gauge", "Duration of the last poll", self.last_poll_seconds),
+                ("last_build_timestamp_seconds", "gauge", "Unix time of the last build", self.last_build),
+                ("last_build_duration_seconds", "gauge", "Duration of the last build", self.last_build_seconds),
+                ("next_poll_timestamp_seconds", "gauge", "Unix time of the next poll", self.next_poll),
+            )
+        lines = []
+        for name, kind, help_text, value in values:
+            lines += [f"# HELP calendar_sync_{name} {help_text}", f"# TYPE calendar_sync_{name} {kind}",
+                      f"calendar_sync_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds") if timestamp else None
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Serves GET /health and /metrics from the server's stats."""
+
+    def do_GET(self):
+        stats = self.server.stats
+        if self.path == "/health":
+            status, body = stats.health()
+            self._reply(status, "application/json", json.dumps(body, indent=2))
+        elif self.path == "/metrics":
+            self._reply(200, "text/plain; version=0.0.4", stats.metrics())
+        else:
+            self._reply(404, "text/plain", "Not found\n")
+
+    def _reply(self, status, content_type, text):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would drown the sync output
+
+
+def start_health_server(stats, port, host=HEALTH_HOST):
+    """Serve /health and /metrics on a background thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, name="health-server", daemon=True).start()
+    return server
+
+
+class Fingerprinter:
+    """Hashes the files under some directories, rereading only files whose size or mtime changed."""
+
+    def __init__(self, directories=WATCHED_DIRS):
+        self.directories = directories
+        self._hashes = {}  # Path -> ((size, mtime_ns), sha1 of the content)
+
+    def _file_hash(self, path):
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != key:
+            with open(path, "rb") as f:
+                cached = self._hashes[path] = (key, hashlib.sha1(f.read()).hexdigest())
+        return cached[1]
+
+    def fingerprint(self):
+        """Return one hash over the relative paths and contents of every file."""
+        digest = hashlib.sha1()
+        seen = set()
+        for directory in self.directories:
+            for root, dirs, files in os.walk(directory):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".tmp"):
+                        continue  # Half-written by event_store
+                    path = os.path.join(root, name)
+                    try:
+                        file_hash = self._file_hash(path)
+                    except FileNotFoundError:
+                        continue  # Replaced while we were walking; the next poll sees it
+                    seen.add(path)
+                    digest.update(f"{os.path.relpath(path, BASE_DIR)}\0{file_hash}\n".encode("utf-8"))
+        for path in set(self._hashes) - seen:
+            del self._hashes[path]
+        return digest.hexdigest()
+
+
+def load_built_fingerprint():
+    """Return the data fingerprint of the last successful build, or None."""
+    try:
+        with open(BUILD_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("fingerprint")
+    except (json.JSONDecodeError, FileNotFoundError):
+        return None
+
+
+def save_built_fingerprint(fingerprint):
+    event_store.write_json(BUILD_STATE_FILE, {"fingerprint": fingerprint,
+                                              "built": datetime.now().isoformat(timespec="seconds")}, backups=0)
+
+
+def build_site(command):
+    """Run Hugo in the project root; returns True on success."""
+    try:
+        result = subprocess.run(command, cwd=BASE_DIR, capture_output=True, text=True, timeout=BUILD_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        log(f"Hugo did not finish within {BUILD_TIMEOUT} seconds.")
+        return False
+    if result.returncode != 0:
+        log(f"Hugo failed with exit status {result.returncode}:")
+        for line in (result.stderr or result.stdout).strip().splitlines()[-20:]:
+            log(f"  {line}")
+        return False
+    return True
+
+
+def is_active(now, active_hours=ACTIVE_HOURS):
+    """True if local time now is inside the active hours."""
+    return active_hours[0] <= now.hour < active_hours[1]
+
+
+def poll_interval(now, quiet_polls, active_hours=ACTIVE_HOURS):
+    """
+    Return the seconds to wait before the next poll at local time now, after
+    quiet_polls polls in a row without changes (or with errors). The wait is
+    cut short where the active hours start or end, so the new pace applies
+    from then on.
+    """
+    start, end = active_hours
+    active = is_active(now, active_hours)
+    base = ACTIVE_INTERVAL if active else IDLE_INTERVAL
+    interval = base * min(2 ** quiet_polls, BACKOFF_LIMIT)
+
+    boundary = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(hours=end if active else start)
+    if boundary <= now:
+        boundary += timedelta(days=1)
+    return min(interval, max(1, (boundary - now).total_seconds()))
+
+
+class SyncDaemon:
+    """The poll, fingerprint and build loop."""
+
+    def __init__(self, hugo_command=None, active_hours=ACTIVE_HOURS, geocode=True, quiet=False):
+        self.hugo_command = hugo_command
+        self.active_hours = active_hours
+        self.geocode = geocode
+        self.sync_log = (lambda message="": None) if quiet else log
+        self.stats = DaemonStats()
+        self.stop = threading.Event()
+        self.session = calendar_sync.create_session(calendar_sync.MAX_CONCURRENT_FEEDS)
+        self.fingerprinter = Fingerprinter()
+        self.built_fingerprint = load_built_fingerprint()
+        self.quiet_polls = 0
+
+    def poll(self):
+        """Sync once; returns True if events.json changed and no feed failed."""
+        started = time.monotonic()
+        error = None
+        delta = None
+        try:
+            delta = calendar_sync.sync(geocode=self.geocode, log=self.sync_log, cancel=self.stop,
+                                       session=self.session)
+            if delta.failed_feeds:
+                error = f"Feeds failed: {', '.join(delta.failed_feeds)}"
+        except calendar_sync.SyncCancelled:
+            return False
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        with self.stats.lock:
+            stats = self.stats
+            stats.polls += 1
+            stats.last_poll = time.time()
+            stats.last_poll_seconds = time.monotonic() - started
+            if delta is not None:
+                stats.polls_changed += delta.changed
+                stats.events_added += len(delta.added)
+                stats.events_updated += len(delta.updated)
+                stats.events_deleted += len(delta.deleted)
+            if error:
+                stats.poll_failures += 1
+                stats.failures_in_a_row += 1
+                stats.last_error = error
+            else:
+                stats.failures_in_a_row = 0
+
+        if error:
+            log(f"Poll failed: {error}")
+        elif delta.changed:
+            log(f"Poll: {len(delta.added)} added, {len(delta.updated)} updated, {len(delta.deleted)} removed, "
+                f"{len(delta.archived)} archived ({self.stats.last_poll_seconds:.1f}s).")
+        else:
+            log(f"Poll: no changes ({self.stats.last_poll_seconds:.1f}s).")
+        return delta is not None and delta.changed and not error
+
+    def build_if_changed(self):
+        """Run Hugo if the data files differ from the last successful build; returns True if it built."""
+        fingerprint = self.fingerprinter.fingerprint()
+        if fingerprint == self.built_fingerprint:
+            with self.stats.lock:
+                self.stats.builds_skipped += 1
+            return False
+        if not self.hugo_command:
+            self.built_fingerprint = fingerprint  # --no-build: only track it for the metrics
+            return False
+
+        log(f"Data changed; running {shlex.join(self.hugo_command)}...")
+        started = time.monotonic()
+        succeeded = build_site(self.hugo_command)
+        with self.stats.lock:
+            self.stats.builds += 1
+            self.stats.last_build = time.time()
+            self.stats.last_build_seconds = time.monotonic() - started
+            if not succeeded:
+                self.stats.build_failures += 1
+        if succeeded:
+            self.built_fingerprint = fingerprint
+            save_built_fingerprint(fingerprint)
+            log(f"Site built in {self.stats.last_build_seconds:.1f}s.")
+        return succeeded
+
+    def run_once(self):
+        changed = self.poll()
+        if not self.stop.is_set():
+            self.build_if_changed()
+        return changed
+
+    def run(self):
+        """Poll and build until stop is set."""
+        tz = pytz.timezone(calendar_sync.TIMEZONE)
+        active = None
+        try:
+            while not self.stop.is_set():
+                now = datetime.now(tz)
+                if is_active(now, self.active_hours) != active:
+                    active = is_active(now, self.active_hours)
+                    self.quiet_polls = 0  # Start each period at its base pace
+                changed = self.run_once()
+                self.quiet_polls = 0 if changed else self.quiet_polls + 1
+                interval = poll_interval(datetime.now(tz), self.quiet_polls, self.active_hours)
+                with self.stats.lock:
+                    self.stats.next_poll = time.time() + interval
+                log(f"Next poll in {timedelta(seconds=round(interval))}.")
+                self.stop.wait(interval)
+        finally:
+            self.session.close()
+        log("Stopped.")
+
+
+def parse_hours(value):
+    """Parse "7-22" into (7, 22)."""
+    try:
+        start, end = (int(part) for part in value.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START-END hours, e.g. 7-22, not {value!r}")
+    if not 0 <= start < end <= 24:
+        raise argparse.ArgumentTypeError(f"hours must satisfy 0 <= START < END <= 24, not {value!r}")
+    return start, end
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Poll the calendar feeds and rebuild the site when the data changes")
+    parser.add_argument("--once", action="store_true", help="Poll once, build if needed and exit")
+    parser.add_argument("--hugo-command", default=HUGO_COMMAND,
+                        help=f"Command that builds the site, run in the project root (default: {HUGO_COMMAND!r})")
+    parser.add_argument("--no-build", action="store_true", help="Only sync; never run Hugo")
+    parser.add_argument("--active-hours", type=parse_hours, default=ACTIVE_HOURS, metavar="START-END",
+                        help=f"Local hours with frequent polling (default: {ACTIVE_HOURS[0]}-{ACTIVE_HOURS[1]})")
+    parser.add_argument("--port", type=int, default=HEALTH_PORT,
+                        help=f"Port for /health and /metrics on {HEALTH_HOST}; 0 disables them (default: {HEALTH_PORT})")
+    parser.add_argument("--no-geocode", action="store_true", help="Do not look up coordinates for new venues")
+    parser.add_argument("--quiet", action="store_true", help="Only print one line per poll and build")
+    return parser.parse_args()
+
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    hugo_command = None if args.no_build else shlex.split(args.hugo_command)
+    if hugo_command and shutil.which(hugo_command[0]) is None:
+        print(f"Error: {hugo_command[0]} not found. Install Hugo, pass --hugo-command, or use --no-build.")
+        return 1
+
+    daemon = SyncDaemon(hugo_command, args.active_hours, geocode=not args.no_geocode, quiet=args.quiet)
+    if args.once:
+        daemon.run_once()
+        return 1 if daemon.stats.failures_in_a_row or daemon.stats.build_failures else 0
+
+    server = None
+    if args.port:
+        server = start_health_server(daemon.stats, args.port)
+        log(f"Serving /health and /metrics on http://{HEALTH_HOST}:{args.port}")
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.stop.set())
+    try:
+        daemon.run()
+    finally:
+        if server is not None:
+            server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
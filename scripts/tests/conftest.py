@@ -0,0 +1,49 @@
+"""Makes the modules in scripts/ importable from the tests, and keeps them away from the site's data."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import calendar_sync  # noqa: E402
+import event_archive  # noqa: E402
+import event_feed  # noqa: E402
+import event_registry  # noqa: E402
+import event_snapshot  # noqa: E402
+import event_store  # noqa: E402
+import geocoder  # noqa: E402
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """
+    Point the data files, the feed and the caches of the scripts into tmp_path
+    and return the path of the temporary events.json.
+    """
+    data_dir = tmp_path / "data"
+    cache_dir = tmp_path / "cache"
+    data_dir.mkdir()
+    events_file = data_dir / "events.json"
+    monkeypatch.setattr(calendar_sync, "OUTPUT_FILE", str(events_file))
+    monkeypatch.setattr(calendar_sync, "FEEDS_FILE", str(tmp_path / "feeds.json"))
+    monkeypatch.setattr(calendar_sync, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(calendar_sync, "FEED_CACHE_DIR", str(cache_dir / "feeds"))
+    monkeypatch.setattr(calendar_sync, "SYNC_STATE_FILE", str(cache_dir / "sync_state.json"))
+    monkeypatch.setattr(event_feed, "EVENTS_FILE", str(events_file))
+    monkeypatch.setattr(event_feed, "FEED_FILE", str(data_dir / "feed.json"))
+    monkeypatch.setattr(event_feed, "SHARD_DIR", str(tmp_path / "static" / "data" / "events"))
+    monkeypatch.setattr(event_feed, "MONTH_DIR", str(data_dir / "event_shards"))
+    monkeypatch.setattr(event_registry, "ORGANIZERS_FILE", str(data_dir / "organizers.json"))
+    monkeypatch.setattr(event_registry, "VENUES_FILE", str(data_dir / "venues.json"))
+    monkeypatch.setattr(event_registry, "EVENTS_FILE", str(events_file))
+    monkeypatch.setattr(event_archive, "ARCHIVE_DIR", str(data_dir / "archive"))
+    monkeypatch.setattr(event_archive, "MANIFEST_FILE", str(data_dir / "archive" / "manifest.json"))
+    monkeypatch.setattr(event_archive, "LEGACY_FILE", str(data_dir / "completed_events.json"))
+    monkeypatch.setattr(event_store, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(event_store, "BACKUP_DIR", str(cache_dir / "backups"))
+    monkeypatch.setattr(event_store, "LOCK_DIR", str(cache_dir / "locks"))
+    monkeypatch.setattr(event_snapshot, "SNAPSHOT_DIR", str(cache_dir / "snapshots"))
+    monkeypatch.setattr(geocoder, "CACHE_FILE", str(cache_dir / "geocode.sqlite"))
+    return events_file
@@ -0,0 +1,144 @@
+"""Tests for add_events_to_calendar, against an in-memory calendar instead of the Google API."""
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import add_events_to_calendar as uploader
+
+
+def http_error(status):
+    return HttpError(httplib2.Response({"status": status}), b'{"error": {}}')
+
+
+class FakeRequest:
+    """Stands in for the HttpRequest returned by service.events().insert()/update()."""
+
+    def __init__(self, method, event_id, body):
+        self.method, self.event_id, self.body = method, event_id, body
+
+
+class FakeBatch:
+    """Stands in for BatchHttpRequest: collects requests and answers them through the calendar."""
+
+    def __init__(self, calendar, callback):
+        self.calendar, self.callback, self.requests = calendar, callback, []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        assert len(self.requests) <= uploader.BATCH_SIZE
+        self.calendar.batches.append([request.method for _, request in self.requests])
+        if self.calendar.reject_batches:
+            self.calendar.reject_batches -= 1
+            raise http_error(429)
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, self.calendar.answer(request), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+
+class FakeCalendar:
+    """
+    The parts of the Calendar API service the uploader uses. Created events are
+    kept in self.stored; rate_limited maps event ids to how many 429s they get
+    before they go through, reject_batches is how many batches fail as a whole.
+    """
+
+    def __init__(self):
+        self.stored = {}
+        self.batches = []
+        self.rate_limited = {}
+        self.reject_batches = 0
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId, body):
+        assert calendarId == uploader.CALENDAR_ID
+        return FakeRequest("insert", body["id"], body)
+
+    def update(self, calendarId, eventId, body):
+        assert calendarId == uploader.CALENDAR_ID
+        return FakeRequest("update", eventId, body)
+
+    def answer(self, request):
+        if self.rate_limited.get(request.event_id):
+            self.rate_limited[request.event_id] -= 1
+            raise http_error(429)
+        if request.method == "insert" and request.event_id in self.stored:
+            raise http_error(409)
+        if request.method == "update" and request.event_id not in self.stored:
+            raise http_error(404)
+        self.stored[request.event_id] = request.body
+        return dict(request.body, htmlLink=f"https://calendar.test/{request.event_id}")
+
+
+def rows(count, location="Downtown"):
+    return [{"summary": f"Event {number}", "start_date": "2026-11-01", "start_time": f"{number % 24:02d}:00",
+             "end_date": "2026-11-01", "end_time": f"{number % 24:02d}:30", "location": location,
+             "organizer": "Take Action Tucson"} for number in range(count)]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the backoff delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(uploader.time, "sleep", delays.append)
+    return delays
+
+
+def test_uploads_in_chunks_of_batch_size(sleeps):
+    service = FakeCalendar()
+    uploader.upsert_events(service, (uploader.create_event(row) for row in rows(120)))
+    assert [len(batch) for batch in service.batches] == [50, 50, 20]
+    assert len(service.stored) == 120
+    assert sleeps == []
+
+
+def test_rate_limited_calls_are_retried_with_backoff(sleeps):
+    service = FakeCalendar()
+    events = [uploader.create_event(row) for row in rows(10)]
+    service.rate_limited = {events[2]["id"]: 2, events[7]["id"]: 1}
+    uploader.upsert_events(service, events)
+    assert sleeps == [1, 2]
+    # Only the rate-limited calls are sent again
+    assert [len(batch) for batch in service.batches] == [10, 2, 1]
+    assert len(service.stored) == 10
+
+
+def test_rejected_batch_is_retried_as_a_whole(sleeps):
+    service = FakeCalendar()
+    service.reject_batches = 1
+    uploader.upsert_events(service, [uploader.create_event(row) for row in rows(5)])
+    assert sleeps == [1]
+    assert [len(batch) for batch in service.batches] == [5, 5]
+    assert len(service.stored) == 5
+
+
+def test_gives_up_after_max_retries(sleeps, capsys):
+    service = FakeCalendar()
+    event = uploader.create_event(rows(1)[0])
+    service.rate_limited = {event["id"]: uploader.MAX_RETRIES + 1}
+    uploader.upsert_events(service, [event])
+    assert sleeps == [2 ** attempt for attempt in range(uploader.MAX_RETRIES)]
+    assert service.stored == {}
+    assert "Error creating event Event 0" in capsys.readouterr().out
+
+
+def test_rerun_updates_events_under_the_same_ids(sleeps):
+    service = FakeCalendar()
+    uploader.upsert_events(service, [uploader.create_event(row) for row in rows(3)])
+    ids = sorted(service.stored)
+    assert ids == sorted(uploader.event_key(row) for row in rows(3))
+
+    uploader.upsert_events(service, [uploader.create_event(row) for row in rows(3, location="Library")])
+    assert sorted(service.stored) == ids  # Updated, not duplicated
+    assert {event["location"] for event in service.stored.values()} == {"Library"}
+    assert {event["status"] for event in service.stored.values()} == {"confirmed"}
+    assert service.batches[-2:] == [["insert"] * 3, ["update"] * 3]
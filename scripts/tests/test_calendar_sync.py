@@ -0,0 +1,262 @@
+"""Tests for calendar_sync."""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytz
+
+import calendar_sync
+import event_archive
+import event_feed
+import event_snapshot
+from ical_stream import CalendarEvent
+
+TZ = pytz.timezone(calendar_sync.TIMEZONE)
+
+
+def quadratic_match(existing_events, cal_events, tz):
+    """
+    The matcher before the (date, HH:MM) index: every JSON event against every
+    calendar event. Each calendar event's date, time and title are worked out
+    once up front instead of once per pair, which gives the same answers in a
+    fraction of the time.
+    """
+    cal_keys = []
+    for cal_event in cal_events:
+        start_dt_cal = cal_event.begin.astimezone(tz)
+        cal_keys.append((cal_event, start_dt_cal.strftime("%Y-%m-%d"), start_dt_cal.strftime("%H:%M:%S")[:5],
+                         cal_event.name.lower() if cal_event.name else ""))
+
+    pairs = []
+    matched_cal_events_by_uid = set()
+    for event_json in existing_events:
+        if event_json.get("calendarUid"):
+            continue
+        json_date = event_json.get("startDate")
+        json_time = event_json.get("startTime", "")
+        json_title = event_json.get("title", "").lower()
+        if len(json_time) < 5:
+            continue  # Compare only the HH:MM part, which a shorter time does not have
+
+        for cal_event, cal_date, cal_time, cal_title in cal_keys:
+            if cal_event.uid in matched_cal_events_by_uid:
+                continue
+            if json_date == cal_date and json_time[:5] == cal_time and json_title in cal_title:
+                pairs.append((event_json, cal_event))
+                matched_cal_events_by_uid.add(cal_event.uid)
+                break
+    return pairs
+
+
+def generated_events(count, seed=7):
+    """
+    Return (JSON events, calendar events) crowded into few (date, HH:MM) slots,
+    with UTC and local start times, seconds, repeated UIDs, missing titles,
+    already tagged JSON events and TBD, short and seconds-bearing start times.
+    """
+    rng = random.Random(seed)
+    words = ["rally", "Rally", "march", "vote", "town hall", "Postcard party", "book club", ""]
+    days = [datetime(2026, 11, 1) + timedelta(days=n) for n in range(5)]
+    times = [(9, 0), (9, 30), (18, 0), (18, 30)]
+
+    cal_events = []
+    for number in range(count):
+        day, (hour, minute) = rng.choice(days), rng.choice(times)
+        begin = TZ.localize(day.replace(hour=hour, minute=minute, second=rng.choice([0, 0, 45])))
+        if rng.random() < 0.5:
+            begin = begin.astimezone(pytz.utc)
+        name = None if rng.random() < 0.05 else f"{rng.choice(words)} {rng.choice(words)}".strip()
+        uid = f"uid-{rng.randrange(count)}" if rng.random() < 0.1 else f"uid-{number}"  # Some UIDs repeat
+        cal_events.append(CalendarEvent(uid, name, "", "", begin, begin + timedelta(hours=1), False))
+
+    json_events = []
+    for number in range(count):
+        day, (hour, minute) = rng.choice(days), rng.choice(times)
+        event = {"id": f"event-{number:05d}", "startDate": day.strftime("%Y-%m-%d"),
+                 "startTime": rng.choice([f"{hour:02d}:{minute:02d}", f"{hour:02d}:{minute:02d}:00",
+                                          f"{hour}:{minute:02d}", "TBD", ""])}
+        if rng.random() < 0.9:
+            event["title"] = rng.choice(words).upper() if rng.random() < 0.3 else rng.choice(words)
+        if rng.random() < 0.1:
+            event["calendarUid"] = f"uid-tagged-{number}"
+        json_events.append(event)
+    return json_events, cal_events
+
+
+def as_ids(pairs):
+    return [(event_json["id"], id(cal_event)) for event_json, cal_event in pairs]
+
+
+def test_indexed_matching_matches_quadratic_matcher():
+    json_events, cal_events = generated_events(20000)  # 20k x 20k
+    expected = quadratic_match(json_events, cal_events, TZ)
+    assert len(expected) > 4000  # The data must exercise the matcher
+    assert as_ids(calendar_sync.match_untagged_events(json_events, cal_events, TZ)) == as_ids(expected)
+
+
+def test_duplicate_slot_uses_each_calendar_event_once():
+    begin = TZ.localize(datetime(2026, 11, 3, 18, 0))
+    first = CalendarEvent("a", "Rally at the Capitol", "", "", begin, None, False)
+    second = CalendarEvent("b", "Rally downtown", "", "", begin.astimezone(pytz.utc), None, False)
+    json_events = [
+        {"id": "event-1", "title": "rally", "startDate": "2026-11-03", "startTime": "18:00"},
+        {"id": "event-2", "title": "Rally", "startDate": "2026-11-03", "startTime": "18:00:00"},
+        {"id": "event-3", "title": "rally", "startDate": "2026-11-03", "startTime": "18:00"},
+        {"id": "event-4", "title": "rally", "startDate": "2026-11-03", "startTime": "TBD"},
+    ]
+    pairs = calendar_sync.match_untagged_events(json_events, [first, second], TZ)
+    assert [(event["id"], cal_event.uid) for event, cal_event in pairs] == [("event-1", "a"), ("event-2", "b")]
+
+
+def ical_feed(*events):
+    """Return an .ics feed of (uid, title, days from now) events at 18:00 UTC."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//tests//EN"]
+    for uid, title, days in events:
+        start = (datetime.now(pytz.utc) + timedelta(days=days)).replace(hour=18, minute=0, second=0)
+        lines += ["BEGIN:VEVENT", f"UID:{uid}", f"SUMMARY:{title}",
+                  f"DTSTART:{start:%Y%m%dT%H%M%SZ}", f"DTEND:{start + timedelta(hours=1):%Y%m%dT%H%M%SZ}",
+                  "END:VEVENT"]
+    return "\r\n".join(lines + ["END:VCALENDAR", ""])
+
+
+class FeedServer(ThreadingHTTPServer):
+    """Serves {path: (delay in seconds, .ics text)}; other paths are 404. Records when each request ran."""
+
+    def __init__(self, feeds):
+        super().__init__(("127.0.0.1", 0), FeedHandler)
+        self.feeds = feeds
+        self.requests = {}  # path -> (started, finished)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        started = time.monotonic()
+        delay, body = self.server.feeds.get(self.path, (0, None))
+        time.sleep(delay)
+        if body is None:
+            self.send_error(404)
+        else:
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/calendar; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        self.server.requests[self.path] = (started, time.monotonic())
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_sync_fetches_feeds_concurrently_and_reports_failed_feeds(site):
+    server = FeedServer({
+        "/slow.ics": (1.0, ical_feed(("slow-1", "Slow rally", 2), ("shared", "Listed by both", 3))),
+        "/fast.ics": (0, ical_feed(("fast-1", "Fast rally", 1), ("shared", "Copy in the second feed", 3))),
+    })
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    feeds = [{"name": "Slow", "url": server.url("/slow.ics")},
+             {"name": "Broken", "url": server.url("/missing.ics")},
+             {"name": "Fast", "url": server.url("/fast.ics")}]
+    with open(calendar_sync.FEEDS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"feeds": feeds}, f)
+    try:
+        delta = calendar_sync.sync(geocode=False, log=lambda message: None)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # The fast feed was fetched while the slow one was still being served
+    slow_finished = server.requests["/slow.ics"][1]
+    assert server.requests["/fast.ics"][0] < slow_finished
+    assert server.requests["/missing.ics"][0] < slow_finished
+
+    assert delta.failed_feeds == ["Broken"]
+    events = {event["calendarUid"]: event for event in event_snapshot.load_json(str(site))["events"]}
+    assert sorted(events) == ["fast-1", "shared", "slow-1"]
+    assert events["slow-1"]["source"] == "Slow" and events["fast-1"]["source"] == "Fast"
+    # The slow feed comes first in feeds.json, so its copy wins although it arrived last
+    assert events["shared"]["title"] == "Listed by both" and events["shared"]["source"] == "Slow"
+
+
+def test_next_event_id_skips_archived_ids(site):
+    event_archive.archive_events([{"id": "event-012", "title": "Old rally", "startDate": "2024-05-01"},
+                                  {"id": "evt_20240501120000000000", "title": "Added in the editor",
+                                   "startDate": "2024-05-02"}])
+    live = [{"id": "event-003"}, {"id": None}, {"title": "No id yet"}]
+    assert calendar_sync.get_next_event_id(live) == 13
+    assert calendar_sync.get_next_event_id([]) == 13
+
+
+def test_series_that_cannot_be_expanded_keeps_its_occurrences(site, tmp_path):
+    first_day = datetime.now(TZ) + timedelta(days=1)
+    series = ["BEGIN:VCALENDAR", "BEGIN:VEVENT", "UID:weekly@test", "SUMMARY:Weekly vigil",
+              f"DTSTART;TZID={calendar_sync.TIMEZONE}:{first_day:%Y%m%d}T170000", "RRULE:FREQ=WEEKLY;COUNT=3",
+              "END:VEVENT", "END:VCALENDAR", ""]
+    ics_file = tmp_path / "calendar.ics"
+
+    def sync(rule):
+        series[5] = rule
+        ics_file.write_text("\r\n".join(series), encoding="utf-8")
+        return calendar_sync.sync(ical_file=str(ics_file), geocode=False, log=lambda message: None)
+
+    def imported_uids():
+        return sorted(event["calendarUid"] for event in event_snapshot.load_json(str(site))["events"])
+
+    assert len(sync("RRULE:FREQ=WEEKLY;COUNT=3").added) == 3
+    occurrences = imported_uids()
+    assert sync("RRULE:FREQ=SOMETIMES").deleted == []
+    assert imported_uids() == occurrences
+    assert len(sync("RRULE:FREQ=WEEKLY;COUNT=2").deleted) == 1  # A series that parses can still lose occurrences
+
+
+def test_edits_are_applied_from_feeds_without_last_modified(site, tmp_path):
+    day = datetime.now(TZ) + timedelta(days=2)
+    ics_file = tmp_path / "calendar.ics"
+
+    def sync(summary):
+        ics_file.write_text("\r\n".join([
+            "BEGIN:VCALENDAR", "BEGIN:VEVENT", "UID:plain@test", f"SUMMARY:{summary}",
+            f"DTSTART;TZID={calendar_sync.TIMEZONE}:{day:%Y%m%d}T180000",
+            f"DTEND;TZID={calendar_sync.TIMEZONE}:{day:%Y%m%d}T190000",
+            "END:VEVENT", "END:VCALENDAR", ""]), encoding="utf-8")  # No SEQUENCE or LAST-MODIFIED
+        return calendar_sync.sync(ical_file=str(ics_file), geocode=False, log=lambda message: None)
+
+    assert len(sync("Town hall").added) == 1
+    assert sync("Town hall").updated == []
+    updates = sync("Town hall (moved online)").updated
+    assert [(update.uid, update.fields) for update in updates] == [("plain@test", {"title": "Town hall (moved online)"})]
+    assert [event["title"] for event in event_snapshot.load_json(str(site))["events"]] == ["Town hall (moved online)"]
+
+
+def test_unchanged_feeds_leave_events_json_alone_until_an_event_ends(site, monkeypatch):
+    unchanged = {"feed": {"name": "Main", "url": "https://calendar.test/main.ics"}, "ical_data": None,
+                 "validators": None, "events": [], "uids": set(), "error": None}
+    monkeypatch.setattr(calendar_sync, "load_feeds", lambda: [unchanged["feed"]])
+    monkeypatch.setattr(calendar_sync, "load_all_feeds", lambda *args, **kwargs: [unchanged])  # Every feed: 304
+    calls = []
+    update_events_file = calendar_sync.update_events_file
+    monkeypatch.setattr(calendar_sync, "update_events_file",
+                        lambda *args, **kwargs: calls.append("update") or update_events_file(*args, **kwargs))
+    monkeypatch.setattr(calendar_sync, "geocode_venues", lambda offline: calls.append("geocode"))
+
+    day = datetime.now(TZ) + timedelta(days=2)
+    upcoming = {"id": "event-001", "title": "Rally", "startDate": f"{day:%Y-%m-%d}", "startTime": "18:00",
+                "endDate": f"{day:%Y-%m-%d}", "endTime": "19:00"}
+    event_feed.save_events(str(site), {"events": [upcoming]})
+    assert not calendar_sync.sync(log=lambda message: None).changed
+    assert calls == []
+
+    # An event that has ended still gets archived
+    ended = dict(upcoming, id="event-002", startDate="2020-01-01", endDate="2020-01-01")
+    event_feed.save_events(str(site), {"events": [upcoming, ended]})
+    assert calendar_sync.sync(log=lambda message: None).archived == ["event-002"]
+    assert calls == ["update", "geocode"]
+    assert not calendar_sync.sync(log=lambda message: None).changed
+    assert calls == ["update", "geocode"]
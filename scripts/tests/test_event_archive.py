@@ -0,0 +1,86 @@
+"""Tests for event_archive."""
+
+import json
+import os
+
+import event_archive
+
+
+def archived(event_id, start_date, title="Rally"):
+    return {"id": event_id, "title": title, "startDate": start_date, "startTime": "18:00"}
+
+
+def partition_titles(name):
+    return [event.get("title") for event in event_archive.read_partition(name)]
+
+
+def test_events_are_partitioned_by_start_month(site):
+    events = [archived("event-003", "2026-11-20"), archived("event-001", "2026-10-02"),
+              archived("event-002", "2026-11-03"), archived("event-004", "TBD")]
+    assert event_archive.archive_events(events) == 4
+    assert [os.path.basename(path) for path in event_archive.partition_files()] == [
+        "2026-10.json", "2026-11.json", "undated.json"]
+    assert [event["id"] for event in event_archive.read_partition("2026-11")] == ["event-002", "event-003"]
+
+    with open(event_archive.MANIFEST_FILE, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["ids"] == {"event-001": "2026-10", "event-002": "2026-11", "event-003": "2026-11",
+                               "event-004": "undated"}
+    assert {name: info["count"] for name, info in manifest["partitions"].items()} == {
+        "2026-10": 1, "2026-11": 2, "undated": 1}
+
+
+def test_archiving_twice_adds_nothing(site):
+    without_id = {"title": "Postcard party", "startDate": "2026-11-05", "startTime": "10:00"}
+    events = [archived("event-001", "2026-11-03"), dict(without_id)]
+    assert event_archive.archive_events(events) == 2
+    version = os.stat(event_archive.partition_path("2026-11")).st_mtime_ns
+
+    # The same id, and an id-less event with the same contents, in a later run
+    assert event_archive.archive_events(events + [archived("event-001", "2026-11-03"), dict(without_id)]) == 0
+    assert os.stat(event_archive.partition_path("2026-11")).st_mtime_ns == version  # Not rewritten
+
+    # A new id-less event listed twice in one run is archived once
+    later = dict(without_id, startTime="11:00")
+    assert event_archive.archive_events([dict(without_id), later, dict(later)]) == 1
+    assert partition_titles("2026-11") == ["Rally", "Postcard party", "Postcard party"]
+
+
+def test_hand_edit_that_keeps_the_size_is_noticed(site):
+    event_archive.archive_events([archived("event-001", "2026-11-03"), archived("event-002", "2026-11-04")])
+    path = event_archive.partition_path("2026-11")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    size, mtime = os.path.getsize(path), os.stat(path).st_mtime_ns
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace('"event-002"', '"event-009"'))
+    os.utime(path, ns=(mtime + 1_000_000, mtime + 1_000_000))  # Even on file systems with coarse timestamps
+    assert os.path.getsize(path) == size
+
+    manifest, corrected = event_archive.load_manifest()
+    assert corrected
+    assert manifest["ids"] == {"event-001": "2026-11", "event-009": "2026-11"}
+    assert event_archive.archive_events([archived("event-002", "2026-11-04")]) == 1  # No longer archived
+
+
+def test_update_archived_rewrites_only_changed_partitions(site):
+    event_archive.archive_events([archived("event-001", "2026-10-02"), archived("event-002", "2026-11-03"),
+                                  {"title": "No id", "startDate": "2026-11-04"}])
+    october = os.stat(event_archive.partition_path("2026-10")).st_mtime_ns
+
+    def rename_november(events):
+        changed = 0
+        for event in events:
+            if event["startDate"].startswith("2026-11"):
+                event["title"] += " (archived)"
+                changed += 1
+        return changed
+
+    assert event_archive.update_archived(rename_november) == 2
+    assert partition_titles("2026-11") == ["Rally (archived)", "No id (archived)"]
+    assert os.stat(event_archive.partition_path("2026-10")).st_mtime_ns == october
+
+    manifest, corrected = event_archive.load_manifest()
+    assert not corrected  # The manifest was updated along with the partition
+    assert list(manifest["hashes"].values()) == ["2026-11"]  # Only the edited event's new hash
+    assert event_archive.archive_events([{"title": "No id (archived)", "startDate": "2026-11-04"}]) == 0
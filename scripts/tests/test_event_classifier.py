@@ -0,0 +1,69 @@
+"""Tests for event_classifier and the rules in classifier_rules.json."""
+
+import pytest
+
+import event_classifier
+import event_registry
+
+
+@pytest.fixture
+def classifier():
+    return event_classifier.load_classifier()
+
+
+def test_highest_priority_rule_decides_the_category(classifier):
+    # protest (40) beats civic (30), whatever order the keywords appear in
+    assert classifier.classify({"title": "Voter registration drive and rally"}) == {
+        "category": "protest", "tags": ["activism", "protest"], "eventType": ["In-Person", "Demonstrations"],
+        "featured": True}
+    assert classifier.classify({"title": "Book club", "description": "Planning meeting first"})["category"] == "education"
+    assert classifier.classify({"title": "Potluck"}) == {"category": "general", "tags": [], "eventType": ["In-Person"],
+                                                         "featured": False}
+
+
+def test_equal_priorities_keep_file_order():
+    rules = [{"name": "first", "keywords": ["park"], "category": "outdoors"},
+             {"name": "second", "keywords": ["park"], "category": "family"},
+             {"name": "types only", "priority": 99, "keywords": ["park"], "eventType": ["Outdoor"]}]
+    result = event_classifier.Classifier(rules).classify({"title": "Picnic in the park"})
+    assert (result["category"], result["eventType"]) == ("outdoors", ["Outdoor"])
+
+
+def test_virtual_events_lose_the_in_person_type(classifier):
+    assert classifier.classify({"title": "Rally on Zoom"})["eventType"] == ["Demonstrations", "Virtual"]
+    assert classifier.classify({"title": "Town hall", "location": {"name": "Zoom", "address": ""}})["eventType"] == [
+        "Virtual"]
+    assert classifier.classify({"title": "A virtual town hall"})["eventType"] == ["Virtual"]
+    assert classifier.classify({"title": "Phone bank", "description": "Online-only this week"})["eventType"] == [
+        "Virtual"]
+    # "virtually" is not "virtual"
+    assert classifier.classify({"title": "March", "description": "Parking is virtually impossible, take the bus"}
+                               )["eventType"] == ["In-Person", "Demonstrations"]
+
+
+def test_invalid_rules_are_reported():
+    with pytest.raises(ValueError, match="unknown fields"):
+        event_classifier.Classifier([{"name": "bad", "keywords": ["x"], "fields": ["summary"]}])
+    with pytest.raises(ValueError, match="needs keywords or patterns"):
+        event_classifier.Classifier([{"name": "empty", "category": "x"}])
+    with pytest.raises(ValueError, match="invalid pattern"):
+        event_classifier.Classifier([{"name": "broken", "patterns": ["(unclosed"]}])
+
+
+def test_classify_events_keeps_values_set_in_the_editor(site, classifier):
+    registries = event_registry.load_registries()
+    edited = {"id": "event-001", "title": "Rally on Zoom", "category": "education", "eventType": ["In-Person"],
+              "tags": [], "featured": False}
+    untouched = {"id": "event-002", "title": "Voter registration", "eventType": ""}
+    events = [dict(edited), dict(untouched)]
+
+    assert event_classifier.classify_events(events, classifier, registries) == 2
+    # Only the empty and missing keys were filled in
+    assert events[0] == dict(edited, tags=["activism", "protest"])
+    assert events[1] == dict(untouched, category="civic", tags=["voting", "democracy"], eventType=["In-Person"],
+                             featured=True)
+    assert event_classifier.classify_events(events, classifier, registries) == 0
+
+    assert event_classifier.classify_events(events, classifier, registries, overwrite=True) == 1
+    assert events[0] == dict(edited, category="protest", tags=["activism", "protest"],
+                             eventType=["Demonstrations", "Virtual"], featured=True)
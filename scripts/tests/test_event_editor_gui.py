@@ -0,0 +1,54 @@
+"""Tests for the parts of event_editor_gui that do not need a display."""
+
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import event_archive
+import event_editor_gui
+import event_store
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 11, 3, 18, 0, 0, 5)
+
+
+def test_new_event_id_skips_live_and_archived_ids(site, monkeypatch):
+    monkeypatch.setattr(event_editor_gui, "datetime", FrozenDatetime)
+    event_archive.archive_events([{"id": "evt_20261103180000000006", "startDate": "2026-11-03"}])
+    editor = SimpleNamespace(event_positions={"evt_20261103180000000005": 0})
+    assert event_editor_gui.EventEditor.new_event_id(editor) == "evt_20261103180000000007"
+
+
+class FakeRoot:
+    def __init__(self):
+        self.calls = []
+
+    def withdraw(self):
+        self.calls.append("withdraw")
+
+    def destroy(self):
+        self.calls.append("destroy")
+
+
+def test_closing_during_an_update_does_not_block():
+    editor = event_editor_gui.EventEditor.__new__(event_editor_gui.EventEditor)
+    release = threading.Event()
+    editor.update_thread = threading.Thread(target=release.wait, daemon=True)
+    editor.update_thread.start()
+    editor.update_cancel = threading.Event()
+    editor.closing = False
+    editor.root = FakeRoot()
+    editor.writer = event_store.BackgroundWriter()
+    editor.geocoder = None
+
+    editor.on_close()  # Returns at once although the update is still running
+    assert editor.update_cancel.is_set()
+    assert editor.root.calls == ["withdraw"]
+
+    release.set()  # The update stops; _poll_update then reports it as finished
+    editor._update_finished(None, event_editor_gui.calendar_sync.SyncCancelled())
+    assert editor.root.calls == ["withdraw", "destroy"]
+    assert editor.update_thread is None
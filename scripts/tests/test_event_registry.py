@@ -0,0 +1,31 @@
+"""Tests for event_registry."""
+
+import event_registry
+
+
+def store(location, registries, event_id="event-1"):
+    return event_registry.store_event({"id": event_id, "location": location}, registries)
+
+
+def test_venues_in_different_towns_stay_apart(site):
+    registries = event_registry.load_registries()
+    tucson = store({"name": "Main Library", "address": "101 N Stone Ave", "city": "Tucson", "state": "AZ"},
+                   registries)
+    phoenix = store({"name": "Main Library", "address": "101 N Stone Ave", "city": "Phoenix", "state": "AZ"},
+                    registries)
+    again = store({"name": "main library ", "address": "101 N  Stone Ave", "city": "tucson", "state": "AZ"},
+                  registries)
+    assert tucson["venueId"] != phoenix["venueId"]
+    assert again["venueId"] == tucson["venueId"]
+    registries.save()
+
+    venues = event_registry.load_registries().venues
+    assert venues.get(phoenix["venueId"])["city"] == "Phoenix"
+    assert venues.get(tucson["venueId"])["city"] == "Tucson"
+
+
+def test_location_with_only_a_town_is_empty(site):
+    registries = event_registry.load_registries()
+    stored = store({"name": "", "address": "", "city": "Tucson", "state": "AZ"}, registries)
+    assert "venueId" not in stored and "location" not in stored
+    assert registries.venues.records == {}
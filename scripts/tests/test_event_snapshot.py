@@ -0,0 +1,46 @@
+"""Tests for event_snapshot."""
+
+import json
+import os
+
+import event_snapshot
+
+DATA = {
+    "calendar": {"name": "Take Action Tucson", "lastUpdated": "2026-11-01T12:00:00Z"},
+    "events": [
+        {"id": "event-001", "title": "Rally", "venueId": "venue-library", "organizerIds": ["org-tat"],
+         "eventType": ["Rally"], "featured": True, "capacity": 1, "imageVariants": {"width": 800}},
+        {"id": "event-002", "title": "Rally", "venueId": "venue-library", "organizerIds": ["org-tat"],
+         "eventType": ["Rally"], "featured": 1, "capacity": True, "imageVariants": {"width": 800}},
+        {"title": "No id, other key order", "id": None, "cost": 2.5},
+    ],
+}
+
+
+def test_snapshot_round_trips_and_follows_the_json_file(site):
+    path = str(site)
+    event_snapshot.write_json(path, DATA)
+    assert os.path.exists(event_snapshot.snapshot_path(path))
+    loaded = event_snapshot.load_json(path)
+    assert loaded == DATA
+    assert [list(event) for event in loaded["events"]] == [list(event) for event in DATA["events"]]
+    assert [type(event.get("featured")) for event in loaded["events"]] == [bool, int, type(None)]
+
+    # Loaded events do not share their nested objects
+    loaded["events"][0]["organizerIds"].append("org-other")
+    assert loaded["events"][1]["organizerIds"] == ["org-tat"]
+
+    # A hand edit is picked up instead of the snapshot
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"events": [{"id": "event-003"}]}, f)
+    assert event_snapshot.load_json(path) == {"events": [{"id": "event-003"}]}
+
+
+def test_snapshot_of_an_older_format_is_ignored(site):
+    path = str(site)
+    event_snapshot.write_json(path, DATA)
+    with open(event_snapshot.snapshot_path(path), "r+b") as f:
+        f.write(b"EVSNAP2\n")
+    assert event_snapshot.load_json(path) == DATA
+    with open(event_snapshot.snapshot_path(path), "rb") as f:
+        assert f.read(len(event_snapshot.SNAPSHOT_MAGIC)) == event_snapshot.SNAPSHOT_MAGIC  # Rebuilt
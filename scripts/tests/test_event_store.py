@@ -0,0 +1,170 @@
+"""Tests for event_store."""
+
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+import event_store
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Rewrites argv[1] with two alternating versions until it is killed. With
+# argv[3] == "pause", it stops inside the first write, after the temp file has
+# been written but before it replaces the real one, and says so.
+WRITER = """
+import os
+import sys
+import time
+import event_store
+path, cache, mode = sys.argv[1:4]
+event_store.BACKUP_DIR, event_store.LOCK_DIR = cache + "/backups", cache + "/locks"
+versions = [{"version": name, "events": [{"id": n, "title": name * 40} for n in range(20000)]} for name in ("old", "new")]
+event_store.write_json(path, versions[0], backups=2)
+if mode == "pause":
+    def fsync(fd):
+        print("writing", flush=True)
+        time.sleep(60)
+    os.fsync = fsync
+print("ready", flush=True)
+for number in range(1, 1000000):
+    event_store.write_json(path, versions[number % 2], backups=2)
+"""
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Keep backups and locks in tmp_path; returns the cache directory."""
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(event_store, "BACKUP_DIR", str(cache / "backups"))
+    monkeypatch.setattr(event_store, "LOCK_DIR", str(cache / "locks"))
+    return cache
+
+
+def finished_pid():
+    """Return the pid of a process that has exited."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_sigkill_mid_write_leaves_a_complete_file(store, tmp_path):
+    path = str(tmp_path / "events.json")
+    rng = random.Random(3)
+    for mode in ["pause"] * 3 + ["loop"] * 5:
+        writer = subprocess.Popen([sys.executable, "-c", WRITER, path, str(store), mode],
+                                  cwd=SCRIPTS_DIR, stdout=subprocess.PIPE, text=True)
+        assert writer.stdout.readline() == "ready\n"
+        if mode == "pause":
+            assert writer.stdout.readline() == "writing\n"
+            assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+        else:
+            time.sleep(rng.uniform(0, 0.3))  # Anywhere in the loop
+        writer.send_signal(signal.SIGKILL)
+        writer.wait()
+        writer.stdout.close()
+
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["version"] in ("old", "new") and len(data["events"]) == 20000
+
+        # The killed writer's lock is recovered, and its temp file cleaned up, by the next write
+        event_store.write_json(path, {"version": "after"}, backups=0)
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_lock_of_a_dead_process_is_taken_over(store, tmp_path):
+    path = str(tmp_path / "events.json")
+    os.makedirs(event_store.LOCK_DIR)
+    with open(event_store._lock_path(path), "w") as f:
+        f.write(str(finished_pid()))
+    started = time.monotonic()
+    with event_store.file_lock(path, timeout=5):
+        with open(event_store._lock_path(path)) as f:
+            assert f.read() == str(os.getpid())
+    assert time.monotonic() - started < 1
+    assert not os.path.exists(event_store._lock_path(path))
+
+
+def test_lock_of_a_live_process_is_respected(store, tmp_path):
+    path = str(tmp_path / "events.json")
+    os.makedirs(event_store.LOCK_DIR)
+    sleeper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        with open(event_store._lock_path(path), "w") as f:
+            f.write(str(sleeper.pid))
+        with pytest.raises(event_store.LockTimeout):
+            with event_store.file_lock(path, timeout=0.2):
+                pass
+    finally:
+        sleeper.kill()
+        sleeper.wait()
+    with event_store.file_lock(path, timeout=5):
+        pass
+
+
+def test_lock_without_pid_expires(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(event_store.os, "name", "nt")  # Where pids cannot be checked, only age counts
+    path = str(tmp_path / "events.json")
+    os.makedirs(event_store.LOCK_DIR)
+    lock_path = event_store._lock_path(path)
+    open(lock_path, "w").close()
+    with pytest.raises(event_store.LockTimeout):
+        with event_store.file_lock(path, timeout=0.2):
+            pass
+    old = time.time() - event_store.LOCK_STALE_SECONDS - 1
+    os.utime(lock_path, (old, old))
+    with event_store.file_lock(path, timeout=5):
+        pass
+
+
+def test_write_json_refuses_to_overwrite_a_changed_file(store, tmp_path):
+    path = str(tmp_path / "events.json")
+    version = event_store.write_json(path, {"events": []})
+    with pytest.raises(event_store.ConflictError):
+        event_store.write_json(path, {"events": [1]}, expected_version=None)  # "Did not exist"
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"events": ["changed by hand"]}')
+    with pytest.raises(event_store.ConflictError):
+        event_store.write_json(path, {"events": [2]}, expected_version=version)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"events": ["changed by hand"]}
+
+    new_version = event_store.write_json(path, {"events": [3]}, expected_version=event_store.file_version(path))
+    assert new_version == event_store.file_version(path)
+
+
+def test_background_writer_reports_conflicts(store, tmp_path):
+    path = str(tmp_path / "events.json")
+    event_store.write_json(path, {"events": []})
+    results = []
+    writer = event_store.BackgroundWriter(on_done=lambda path, version, error: results.append(error), backups=0)
+    writer.track(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"events": ["changed by hand"]}')
+
+    writer.save(path, {"events": ["editor"]})
+    assert writer.flush(timeout=10)
+    assert isinstance(results[-1], event_store.ConflictError)
+
+    writer.save(path, {"events": ["editor"]}, force=True)
+    assert writer.flush(timeout=10)
+    assert results[-1] is None
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"events": ["editor"]}
+
+
+def test_write_json_keeps_the_file_mode(store, tmp_path):
+    path = str(tmp_path / "events.json")
+    event_store.write_json(path, {"events": []})
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~event_store.UMASK  # As open() would create it, not 0600
+
+    os.chmod(path, 0o664)
+    event_store.write_json(path, {"events": [1]})
+    assert os.stat(path).st_mode & 0o777 == 0o664
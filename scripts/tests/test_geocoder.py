@@ -0,0 +1,139 @@
+"""Tests for geocoder, against a local stand-in for Nominatim."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import event_registry
+import geocoder
+
+PLACES = {"123 main st, tucson, az": ("32.2226", "-110.9747"), "1 university blvd": ("32.2319", "-110.9501")}
+
+
+class NominatimHandler(BaseHTTPRequestHandler):
+    """Answers /search?q=... from PLACES (matched case-insensitively), recording each query and when it arrived."""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)["q"][0]
+        self.server.queries.append((time.monotonic(), query))
+        place = PLACES.get(" ".join(query.split()).casefold())
+        body = json.dumps([{"lat": place[0], "lon": place[1], "display_name": query}] if place else []).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def nominatim():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), NominatimHandler)
+    server.queries = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_normalize_address():
+    assert geocoder.normalize_address("  123  Main St ,Tucson,   AZ ") == "123 main st, tucson, az"
+    assert not geocoder.should_geocode(" TBD ")
+
+
+def test_cache_hits_skip_the_service(nominatim, tmp_path):
+    cache_path = str(tmp_path / "geocode.sqlite")
+    lookup = geocoder.Geocoder(url=nominatim.url, cache_path=cache_path, rate=100)
+    try:
+        first = lookup.geocode("123 Main St, Tucson, AZ")
+        assert (first["lat"], first["lon"]) == (32.2226, -110.9747)
+        assert lookup.geocode("123  MAIN st ,Tucson,AZ") == first  # Same address, written differently
+        assert lookup.geocode("Nowhere Lane") is None
+        assert lookup.geocode("nowhere lane") is None  # Misses are cached too
+        assert lookup.geocode("Online") is None  # Placeholders are never looked up
+    finally:
+        lookup.close()
+    assert [query for _, query in nominatim.queries] == ["123 Main St, Tucson, AZ", "Nowhere Lane"]
+
+    # The cache outlives the process; offline lookups only use it
+    offline = geocoder.Geocoder(url=nominatim.url, cache_path=cache_path, offline=True)
+    try:
+        assert offline.geocode("123 main st, tucson, az") == first
+        assert offline.geocode("1 University Blvd") is None
+    finally:
+        offline.close()
+    assert len(nominatim.queries) == 2
+
+
+def test_requests_are_at_least_a_second_apart(nominatim, tmp_path):
+    lookup = geocoder.Geocoder(url=nominatim.url, cache_path=str(tmp_path / "geocode.sqlite"))
+    try:
+        futures = [lookup.submit(address) for address in ("123 Main St, Tucson, AZ", "1 University Blvd", "Nowhere")]
+        assert [future.result(timeout=10) is not None for future in futures] == [True, True, False]
+    finally:
+        lookup.close()
+    arrivals = [arrived for arrived, _ in nominatim.queries]
+    # The token bucket spaces the sends; allow a few milliseconds of jitter in delivering them
+    assert all(later - earlier >= 1 / geocoder.REQUESTS_PER_SECOND - 0.01
+               for earlier, later in zip(arrivals, arrivals[1:]))
+
+
+def test_geocode_venues_adds_coordinates_to_the_registry(site, nominatim, tmp_path):
+    registries = event_registry.load_registries()
+    locations = [
+        {"name": "Library", "address": "123 Main St, Tucson, AZ"},
+        {"name": "Campus", "address": "1 University Blvd"},
+        {"name": "Somewhere", "address": "Nowhere Lane"},
+        {"name": "Zoom", "address": "Online"},
+        {"name": "Known", "address": "5 Known Rd", "lat": 1.0, "lon": 2.0},
+        {"name": "Library", "address": "123 Main St, Tucson, AZ"},  # Second event at the same venue
+    ]
+    events = [event_registry.store_event({"id": f"event-{number}", "location": location}, registries)
+              for number, location in enumerate(locations)]
+    registries.save()
+
+    lookup = geocoder.Geocoder(url=nominatim.url, cache_path=str(tmp_path / "geocode.sqlite"), rate=100)
+    try:
+        assert geocoder.geocode_venues(events, lookup) == 2
+    finally:
+        lookup.close()
+    assert sorted(query for _, query in nominatim.queries) == ["1 University Blvd", "123 Main St, Tucson, AZ",
+                                                                "Nowhere Lane"]
+
+    venues = event_registry.load_registries().venues
+    coordinates = {venues.get(event["venueId"])["name"]: (venues.get(event["venueId"]).get("lat"),
+                                                          venues.get(event["venueId"]).get("lon"))
+                   for event in events}
+    assert coordinates == {"Library": (32.2226, -110.9747), "Campus": (32.2319, -110.9501),
+                           "Somewhere": (None, None), "Zoom": (None, None), "Known": (1.0, 2.0)}
+
+
+def test_geocode_venues_stops_when_cancelled(site, nominatim, tmp_path):
+    registries = event_registry.load_registries()
+    events = [event_registry.store_event({"id": f"event-{number}", "location": {"name": name, "address": address}},
+                                         registries)
+              for number, (name, address) in enumerate([("Library", "123 Main St, Tucson, AZ"),
+                                                        ("Campus", "1 University Blvd")])]
+    registries.save()
+
+    cancel = threading.Event()
+    lookup = geocoder.Geocoder(url=nominatim.url, cache_path=str(tmp_path / "geocode.sqlite"), rate=100)
+    original_geocode = lookup.geocode
+
+    def geocode_then_cancel(address):
+        cancel.set()  # As if Cancel was pressed during the first lookup
+        return original_geocode(address)
+
+    lookup.geocode = geocode_then_cancel
+    try:
+        assert geocoder.geocode_venues(events, lookup, cancel=cancel) == 1  # The first result is still saved
+    finally:
+        lookup.close()
+    assert len(nominatim.queries) == 1
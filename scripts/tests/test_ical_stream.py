@@ -0,0 +1,65 @@
+"""Tests for ical_stream."""
+
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+import ical_stream
+
+TZ = pytz.timezone("America/Phoenix")
+
+
+def feed(*events):
+    """Return an .ics feed of VEVENTs given as lists of property lines."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for properties in events:
+        lines += ["BEGIN:VEVENT"] + properties + ["END:VEVENT"]
+    return "\r\n".join(lines + ["END:VCALENDAR", ""])
+
+
+def daily_since_2015(*extra):
+    return ["UID:daily@test", "SUMMARY:Daily vigil", "DTSTART;TZID=America/Phoenix:20150101T170000",
+            "DTEND;TZID=America/Phoenix:20150101T180000", "RRULE:FREQ=DAILY"] + list(extra)
+
+
+def test_daily_rule_expands_only_inside_the_window():
+    start = TZ.localize(datetime(2026, 11, 1, 12, 0))
+    end = start + timedelta(days=120)
+    moved = ["UID:daily@test", "RECURRENCE-ID;TZID=America/Phoenix:20261110T170000", "SUMMARY:Moved vigil",
+             "DTSTART;TZID=America/Phoenix:20261110T190000", "DTEND;TZID=America/Phoenix:20261110T200000"]
+    text = feed(daily_since_2015("EXDATE;TZID=America/Phoenix:20261105T170000"), moved)
+
+    began = time.perf_counter()
+    seen = set()
+    events = list(ical_stream.iter_events(text, TZ, start=start, end=end, seen_uids=seen))
+    assert time.perf_counter() - began < 1  # Not stepped through from 2015
+
+    begins = [event.begin for event in events]
+    assert min(begins) == TZ.localize(datetime(2026, 11, 1, 17, 0))
+    assert max(begins) <= end
+    assert len(events) == 120 - 1  # One a day, one left out by EXDATE
+    assert TZ.localize(datetime(2026, 11, 5, 17, 0)) not in begins
+    moved_event = next(event for event in events if event.uid == "daily@test/20261111T000000Z")
+    assert (moved_event.name, moved_event.begin) == ("Moved vigil", TZ.localize(datetime(2026, 11, 10, 19, 0)))
+    assert {event.series_uid for event in events} == {"daily@test"}
+    # The ids of the day before the window count as still in the feed
+    assert "daily@test/20261101T000000Z" in seen and "daily@test/20261031T000000Z" not in seen
+
+
+def test_unbounded_expansion_is_capped():
+    occurrences = ical_stream.iter_occurrences(
+        {"DTSTART": "DTSTART;TZID=America/Phoenix:20150101T170000", "RRULE": "RRULE:FREQ=DAILY"}, TZ)
+    assert len(list(occurrences)) == ical_stream.MAX_UNBOUNDED_OCCURRENCES
+
+
+def test_malformed_rule_keeps_the_series_in_the_feed():
+    start = TZ.localize(datetime(2026, 11, 1, 12, 0))
+    single = ["UID:single@test", "SUMMARY:Rally", "DTSTART:20261102T010000Z"]
+    broken = ["UID:broken@test", "SUMMARY:Broken", "DTSTART;TZID=America/Phoenix:20261101T170000",
+              "RRULE:FREQ=SOMETIMES"]
+    seen = set()
+    events = list(ical_stream.iter_events(feed(broken, single), TZ, start=start, end=start + timedelta(days=30),
+                                          seen_uids=seen))
+    assert [event.uid for event in events] == ["single@test"]
+    assert seen == {"single@test", f"broken@test/{ical_stream.UNKNOWN_OCCURRENCES}"}
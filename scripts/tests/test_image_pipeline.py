@@ -0,0 +1,82 @@
+"""Tests for image_pipeline."""
+
+import json
+import os
+
+import pytest
+from PIL import Image
+
+import event_feed
+import event_store
+import image_pipeline
+
+RECORD = {"hash": "0123456789abcdef", "width": 1200, "height": 800,
+          "webp": [{"src": "/images/derived/0123456789abcdef-400.webp", "width": 400, "height": 267}],
+          "jpeg": [{"src": "/images/derived/0123456789abcdef-400.jpg", "width": 400, "height": 267}]}
+
+
+def upcoming_event(image):
+    return {"id": "event-001", "title": "Rally", "startDate": "2099-11-03", "startTime": "18:00",
+            "endDate": "2099-11-03", "endTime": "19:00", "image": image, "eventType": ["Rally"]}
+
+
+def test_attach_variants_updates_the_feed_and_month_shards(site, tmp_path, monkeypatch):
+    monkeypatch.setattr(image_pipeline, "IMAGE_DIR", str(tmp_path / "images"))
+    event_feed.save_events(str(site), {"events": [upcoming_event("/images/flyer.jpg")]})
+
+    records = {image_pipeline.image_url_to_path("/images/flyer.jpg"): RECORD}
+    assert image_pipeline.attach_variants(records, event_files=[str(site)]) == 1
+    assert image_pipeline.attach_variants(records, event_files=[str(site)]) == 0  # Already there
+
+    with open(event_feed.FEED_FILE, encoding="utf-8") as f:
+        assert json.load(f)["upcoming"][0]["data"]["imageVariants"] == RECORD
+    with open(os.path.join(event_feed.MONTH_DIR, "2099-11.json"), encoding="utf-8") as f:
+        assert json.load(f)["events"][0]["imageVariants"] == RECORD
+
+
+@pytest.fixture
+def derived(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_pipeline, "DERIVED_DIR", str(tmp_path / "derived"))
+    return tmp_path / "derived"
+
+
+def test_ingest_image_rotates_strips_and_never_upscales(derived, tmp_path):
+    # 1000x600, red along the top; EXIF orientation 6 means "rotate 90 degrees clockwise to display"
+    image = Image.new("RGBA", (1000, 600), (0, 0, 255, 255))
+    image.paste((255, 0, 0, 255), (0, 0, 1000, 100))
+    image.putpixel((999, 599), (0, 0, 255, 0))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010F] = "Camera maker"
+    source = str(tmp_path / "flyer.png")
+    image.save(source, exif=exif)
+
+    record = image_pipeline.ingest_image(source)
+    digest = image_pipeline.source_hash(source)
+    assert (record["hash"], record["width"], record["height"]) == (digest, 600, 1000)
+    formats = image_pipeline.available_formats()
+    assert "webp" in formats and "jpeg" in formats
+    for name in formats:
+        extension = image_pipeline.FORMATS[name][0]
+        # 400 and the original 600, never 800 or 1200
+        assert record[name] == [
+            {"src": f"/images/derived/{digest}-400.{extension}", "width": 400, "height": 667},
+            {"src": f"/images/derived/{digest}-600.{extension}", "width": 600, "height": 1000},
+        ]
+
+    for name in os.listdir(derived):
+        path = derived / name
+        assert os.stat(path).st_mode & 0o777 == 0o666 & ~event_store.UMASK
+        with Image.open(path) as output:
+            assert "exif" not in output.info and not output.getexif()
+            assert output.width in (400, 600)
+            if output.width == 600:
+                rgb = output.convert("RGB")
+                # The red top edge is now the right edge
+                assert rgb.getpixel((590, 500))[0] > 200 and rgb.getpixel((10, 500))[2] > 200
+
+    # The transparent corner survives in WebP and is flattened onto white in JPEG
+    with Image.open(derived / f"{digest}-600.webp") as webp:
+        assert webp.mode == "RGBA" and webp.getpixel((0, 999))[3] < 50
+    with Image.open(derived / f"{digest}-600.jpg") as jpeg:
+        assert jpeg.mode == "RGB" and min(jpeg.getpixel((0, 999))) > 200
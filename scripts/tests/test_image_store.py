@@ -0,0 +1,103 @@
+"""Tests for image_store."""
+
+import json
+import os
+import random
+
+import pytest
+from PIL import Image
+
+import event_feed
+import event_store
+import image_pipeline
+import image_store
+
+
+def test_migrate_points_the_feed_at_the_store(site, tmp_path, monkeypatch):
+    image_dir = tmp_path / "images"
+    monkeypatch.setattr(image_pipeline, "IMAGE_DIR", str(image_dir))
+    monkeypatch.setattr(image_store, "STORE_DIR", str(image_dir / "store"))
+    image_dir.mkdir()
+    (image_dir / "flyer.JPEG").write_bytes(b"not really a jpeg")
+    events = [{"id": "event-001", "title": "Rally", "startDate": "2099-11-03", "startTime": "18:00",
+               "image": "/images/flyer.JPEG"},
+              {"id": "event-002", "title": "March", "startDate": "2099-11-04", "startTime": "18:00",
+               "image": "/images/missing.png"}]
+    event_feed.save_events(str(site), {"events": events})
+
+    assert image_store.migrate(event_files=[str(site)]) == 1
+    digest = image_pipeline.source_hash(str(image_dir / "flyer.JPEG"))
+    assert (image_dir / "store" / f"{digest}.jpg").exists()
+
+    with open(event_feed.FEED_FILE, encoding="utf-8") as f:
+        images = [entry["data"]["image"] for entry in json.load(f)["upcoming"]]
+    assert images == [f"/images/store/{digest}.jpg", "/images/missing.png"]
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    """Point the assets, store, static and derived directories and the hash cache into tmp_path."""
+    image_dir = tmp_path / "images"
+    monkeypatch.setattr(image_pipeline, "IMAGE_DIR", str(image_dir))
+    monkeypatch.setattr(image_store, "IMAGE_DIR", str(image_dir))
+    monkeypatch.setattr(image_store, "STORE_DIR", str(image_dir / "store"))
+    monkeypatch.setattr(image_store, "STATIC_IMAGE_DIR", str(tmp_path / "static_images"))
+    monkeypatch.setattr(image_store, "HASH_CACHE_FILE", str(tmp_path / "image_hashes.json"))
+    monkeypatch.setattr(image_pipeline, "DERIVED_DIR", str(tmp_path / "derived"))
+    for directory in ("images", "static_images", "derived"):
+        (tmp_path / directory).mkdir()
+    return image_dir
+
+
+def flyer(seed, size=(640, 480)):
+    """A picture made of 12x9 random grey blocks; different seeds look nothing alike."""
+    rng = random.Random(seed)
+    blocks = Image.new("L", (12, 9))
+    blocks.putdata([rng.randrange(256) for _ in range(12 * 9)])
+    return blocks.resize(size, Image.Resampling.NEAREST).convert("RGB")
+
+
+def test_resized_copy_is_a_near_duplicate(images, tmp_path):
+    flyer(1).save(images / "flyer.png")
+    flyer(1).resize((320, 240), Image.Resampling.LANCZOS).save(tmp_path / "flyer-small.jpg", quality=70)
+    flyer(2).save(tmp_path / "other.png")
+    cache = image_store.HashCache()
+
+    url = image_store.add_image(str(images / "flyer.png"), cache)
+    stored = image_pipeline.image_url_to_path(url)
+    assert os.stat(stored).st_mode & 0o777 == 0o666 & ~event_store.UMASK
+    assert image_store.add_image(str(images / "flyer.png"), cache) == url  # Stored once
+
+    matches = image_store.similar_images(str(tmp_path / "flyer-small.jpg"), cache)
+    assert [path for path, _ in matches] == [stored]
+    assert matches[0][1] <= image_store.NEAR_DUPLICATE_BITS
+    assert image_store.similar_images(str(tmp_path / "other.png"), cache) == []
+    assert image_store.similar_images(str(images / "flyer.png"), cache) == []  # Identical is not "similar"
+
+    entries = [(path, *cache.hashes(path)) for path in
+               (stored, str(images / "flyer.png"), str(tmp_path / "flyer-small.jpg"), str(tmp_path / "other.png"))]
+    assert image_store.duplicate_groups(entries) == [[stored, str(images / "flyer.png")]]
+    assert image_store.near_duplicate_groups(entries) == [[stored, str(tmp_path / "flyer-small.jpg")]]
+
+
+def test_gc_deletes_only_orphans_and_their_derivatives(site, images, tmp_path):
+    used, orphan = images / "used.png", images / "orphan.png"
+    flyer(1).save(used)
+    flyer(2).save(orphan)
+    flyer(3).save(images / "demo.png")  # Pinned: used by the importer, not by an event
+    flyer(4).save(tmp_path / "static_images" / "logo.png")  # Static images are linked from templates by name
+    derived_dir = tmp_path / "derived"
+    for path in (used, orphan):
+        for name in ("400.webp", "400.jpg"):
+            (derived_dir / f"{image_pipeline.source_hash(str(path))}-{name}").write_bytes(b"derivative")
+    event_feed.save_events(str(site), {"events": [{"id": "event-001", "title": "Rally", "startDate": "2099-11-03",
+                                                    "startTime": "18:00", "image": "/images/used.png"}]})
+
+    assert image_store.gc(event_files=[str(site)]) == 0
+    assert orphan.exists() and len(os.listdir(derived_dir)) == 4  # Only reported
+
+    assert image_store.gc(delete=True, event_files=[str(site)]) == 0
+    assert sorted(os.listdir(images)) == ["demo.png", "used.png"]
+    assert os.listdir(tmp_path / "static_images") == ["logo.png"]
+    used_digest = image_pipeline.source_hash(str(used))
+    assert sorted(os.listdir(derived_dir)) == [f"{used_digest}-400.jpg", f"{used_digest}-400.webp"]
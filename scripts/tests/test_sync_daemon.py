@@ -0,0 +1,31 @@
+"""Tests for sync_daemon."""
+
+import os
+
+import sync_daemon
+
+
+def test_watches_the_images_hugo_publishes():
+    assert sync_daemon.IMAGE_DIR in sync_daemon.WATCHED_DIRS
+    assert sync_daemon.STATIC_IMAGE_DIR in sync_daemon.WATCHED_DIRS
+
+
+def test_fingerprint_changes_with_images(tmp_path):
+    data, images = tmp_path / "data", tmp_path / "images"
+    data.mkdir()
+    (images / "store").mkdir(parents=True)
+    (data / "events.json").write_text('{"events": []}')
+    fingerprinter = sync_daemon.Fingerprinter((str(data), str(images)))
+    empty = fingerprinter.fingerprint()
+
+    (images / "store" / "flyer.jpg").write_bytes(b"first")
+    added = fingerprinter.fingerprint()
+    assert added != empty
+    (images / ".flyer.jpg.123.tmp").write_bytes(b"half written")
+    assert fingerprinter.fingerprint() == added
+
+    (images / "store" / "flyer.jpg").write_bytes(b"second!")
+    assert fingerprinter.fingerprint() not in (empty, added)
+    os.remove(images / "store" / "flyer.jpg")
+    os.remove(images / ".flyer.jpg.123.tmp")
+    assert fingerprinter.fingerprint() == empty
@@ -0,0 +1,88 @@
+"""Tests for thumbnail_cache."""
+
+import os
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+import thumbnail_cache
+
+SIZE = (200, 150)
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Record the path of every source decoded by make_thumbnail."""
+    paths = []
+    make_thumbnail = thumbnail_cache.make_thumbnail
+
+    def recording(path, size):
+        paths.append(os.path.basename(path))
+        return make_thumbnail(path, size)
+
+    monkeypatch.setattr(thumbnail_cache, "make_thumbnail", recording)
+    return paths
+
+
+def photo(tmp_path, name, colour="red"):
+    path = tmp_path / name
+    Image.new("RGB", (800, 600), colour).save(path)
+    return str(path)
+
+
+def test_load_decodes_each_version_of_a_file_once(tmp_path, decodes):
+    path = photo(tmp_path, "flyer.png")
+    directory = str(tmp_path / "thumbnails")
+    cache = thumbnail_cache.ThumbnailCache(directory)
+    first = cache.load(path, SIZE)
+    assert first.size == (200, 150)
+    assert cache.load(path, SIZE) is first  # From memory
+    assert cache.get_cached(path, SIZE) is first
+
+    reopened = thumbnail_cache.ThumbnailCache(directory)  # As after restarting the editor
+    assert reopened.get_cached(path, SIZE) is None
+    assert list(reopened.load(path, SIZE).getdata()) == list(first.getdata())  # From disk
+    assert decodes == ["flyer.png"]
+
+    key = thumbnail_cache.cache_key(path, SIZE)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # Replaced by a new version
+    assert thumbnail_cache.cache_key(path, SIZE) != key
+    reopened.load(path, SIZE)
+    assert decodes == ["flyer.png", "flyer.png"]
+    assert thumbnail_cache.cache_key(path, (400, 300)) != thumbnail_cache.cache_key(path, SIZE)
+
+
+def test_prefetch_does_not_queue_duplicates(tmp_path, decodes, monkeypatch):
+    paths = {name: photo(tmp_path, f"{name}.png", colour) for name, colour in
+             (("current", "red"), ("next", "green"), ("previous", "blue"), ("known", "white"))}
+    cache = thumbnail_cache.ThumbnailCache(str(tmp_path / "thumbnails"))
+    cache.load(paths["known"], SIZE)
+
+    # Hold the worker in the first decode while the prefetches are queued
+    decoding, release = threading.Event(), threading.Event()
+    make_thumbnail = thumbnail_cache.make_thumbnail
+
+    def held(path, size):
+        decoding.set()
+        release.wait(10)
+        return make_thumbnail(path, size)
+
+    monkeypatch.setattr(thumbnail_cache, "make_thumbnail", held)
+    done = threading.Event()
+    cache.request(paths["current"], SIZE, lambda image, error: done.set())
+    assert decoding.wait(10)
+
+    cache.prefetch([paths["next"], paths["previous"], paths["next"], paths["known"]], SIZE)
+    cache.prefetch([paths["previous"], paths["next"]], SIZE)  # The editor moved on before they were made
+    assert [job[1] for job in cache._queue] == [paths["next"], paths["previous"]]
+
+    release.set()
+    assert done.wait(10)
+    deadline = time.monotonic() + 10
+    while not (cache.get_cached(paths["next"], SIZE) and cache.get_cached(paths["previous"], SIZE)):
+        assert time.monotonic() < deadline, "The prefetched thumbnails were not made"
+        time.sleep(0.01)
+    assert sorted(decodes) == ["current.png", "known.png", "next.png", "previous.png"]
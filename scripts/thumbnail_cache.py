@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Preview thumbnails for the event editor, cached in memory and on disk.
+
+Decoding a multi-megabyte photo takes hundreds of milliseconds, so thumbnails
+are made on a worker thread and saved under scripts/.cache/thumbnails, keyed by
+the source's path, modification time, size and the requested box. JPEGs are
+decoded directly at a reduced scale with Pillow's draft(). Neighbouring events
+can be prefetched so that stepping through the list rarely waits for a decode.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+
+from PIL import Image, ImageOps
+
+import event_store
+
+THUMBNAIL_DIR = os.path.join(event_store.CACHE_DIR, "thumbnails")
+MEMORY_ITEMS = 32  # Thumbnails kept decoded in memory
+MAX_DISK_ITEMS = 1000  # Older files are removed when the cache is opened
+
+
+def cache_key(path, size):
+    """Return the cache key for a thumbnail of path that fits in size, or None if path is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def make_thumbnail(path, size):
+    """Decode path and shrink it to fit within size, keeping the aspect ratio."""
+    with Image.open(path) as image:
+        image.draft(None, size)  # JPEG only: let the decoder downscale by up to 8x
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA", "L"):
+            has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+        return image
+
+
+class ThumbnailCache:
+    """
+    Hands out thumbnails from memory, from the disk cache or by decoding the
+    source on a single worker thread. request() jumps the queue, prefetch()
+    waits behind it. Callbacks run on the worker thread.
+    """
+
+    def __init__(self, directory=THUMBNAIL_DIR, memory_items=MEMORY_ITEMS):
+        self.directory = directory
+        self.memory_items = memory_items
+        self._memory = OrderedDict()  # key -> PIL image, least recently used first
+        self._queue = deque()  # (key, path, size, callback)
+        self._cond = threading.Condition()
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+        self._prune()
+
+    def get_cached(self, path, size):
+        """Return the thumbnail if it is already in memory, without touching the disk."""
+        key = cache_key(path, size)
+        with self._cond:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+            return image
+
+    def load(self, path, size):
+        """Return the thumbnail, reading or creating it as needed. Blocks the caller."""
+        key = cache_key(path, size)
+        if key is None:
+            raise FileNotFoundError(path)
+        with self._cond:
+            image = self._memory.get(key)
+        if image is None:
+            image = self._read_disk(key)
+            if image is None:
+                image = make_thumbnail(path, size)
+                self._write_disk(key, image)
+            self._remember(key, image)
+        return image
+
+    def request(self, path, size, callback):
+        """Load a thumbnail in the background and call callback(image, error) with the result."""
+        self._enqueue(path, size, callback, urgent=True)
+
+    def prefetch(self, paths, size):
+        """Warm the cache for paths after any outstanding requests."""
+        for path in paths:
+            self._enqueue(path, size, None, urgent=False)
+
+    def _enqueue(self, path, size, callback, urgent):
+        key = cache_key(path, size)
+        with self._cond:
+            if callback is None and (key is None or key in self._memory
+                                     or any(job[0] == key for job in self._queue)):
+                return  # Nothing to warm
+            job = (key, path, size, callback)
+            if urgent:
+                self._queue.appendleft(job)
+            else:
+                self._queue.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ThumbnailCache", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue)
+                key, path, size, callback = self._queue.popleft()
+            image, error = None, None
+            try:
+                image = self.load(path, size)
+            except Exception as e:
+                error = e
+            if callback:
+                callback(image, error)
+
+    def _remember(self, key, image):
+        with self._cond:
+            self._memory[key] = image
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key + ".png")
+
+    def _read_disk(self, key):
+        try:
+            with Image.open(self._disk_path(key)) as image:
+                image.load()
+                return image
+        except (OSError, ValueError):
+            return None  # Not cached yet, or a damaged file that will be rewritten
+
+    def _write_disk(self, key, image):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            image.save(tmp_path, format="PNG", compress_level=1)  # Favour speed, the files are small
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not cache thumbnail: {e}")
+
+    def _prune(self):
+        """Remove the least recently written thumbnails beyond MAX_DISK_ITEMS."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                os.remove(entry.path)
+            elif entry.is_file():
+                entries.append((entry.stat().st_mtime, entry.path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - MAX_DISK_ITEMS)]:
+            os.remove(path)
@@ -11,7 +11,7 @@ fi
 
 # Check if Python dependencies are installed
 echo "Checking Python dependencies..."
-python3 -c "import requests, icalendar, pytz" 2>/dev/null
+python3 -c "import requests, pytz, dateutil" 2>/dev/null
 if [ $? -ne 0 ]; then
     echo "Installing Python dependencies..."
     pip3 install -r scripts/requirements.txt
@@ -20,7 +20,7 @@ fi
 # Run the import script
 echo "Fetching events from Google Calendar..."
 cd scripts
-python3 import-calendar.py
+python3 import-calendar.py "$@" || exit $?
 cd ..
 
 echo "Calendar update complete!"
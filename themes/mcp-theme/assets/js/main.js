@@ -176,6 +176,7 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 
     function filterAndRenderEvents(filter) {
+        currentFilter = filter;
         const desktopEvents = document.querySelectorAll('#desktop-events-list .event-list-item');
         const mobileEvents = document.querySelectorAll('#mobile-events-list .event-card-wrapper');
         
@@ -199,6 +200,9 @@ document.addEventListener('DOMContentLoaded', function() {
             adjustEventTitleSizes();
             reCheckAndInitialize();
         }, 50);
+
+        // The filtered list may now be too short to reach the sentinel
+        loadMoreIfVisible();
     }
 
     /**
@@ -344,6 +348,228 @@ document.addEventListener('DOMContentLoaded', function() {
         reCheckAndInitialize();
     }, 500);
 
+    /**
+     * Lazy loading of later months.
+     * The page only contains the first month of events. The rest are JSON
+     * shards written by scripts/event_feed.py and published by the home
+     * template: /data/events/index.json
+     * lists the months in order, with their event counts per type, and each
+     * month's events are in their own file. When the sentinel below the list
+     * comes into view, the next month that has events for the current filter
+     * is fetched and drawn with the same markup as the Hugo template.
+     */
+    const sentinel = document.getElementById('events-sentinel');
+    const emailIconTemplate = document.getElementById('email-icon-template');
+    let currentFilter = 'all';
+    let shardIndex = null;
+    const firstMonth = sentinel ? sentinel.dataset.loadedMonth : '';
+    const loadedMonths = new Set([firstMonth]);
+    let renderedCount = sentinel ? parseInt(sentinel.dataset.renderedCount, 10) || 0 : 0;
+    let shardLoading = false;
+
+    function escapeHtml(value) {
+        return String(value == null ? '' : value)
+            .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+    }
+
+    // Same result as Hugo's urlize for the map search links
+    function urlize(value) {
+        return encodeURI(String(value).trim().toLowerCase().replace(/[^\w\s-]/g, '').replace(/\s+/g, '-'));
+    }
+
+    function mapUrls(location) {
+        if (location.lat && location.lon) {
+            const point = `${location.lat},${location.lon}`;
+            return {
+                osm: `https://www.openstreetmap.org/?mlat=${location.lat}&mlon=${location.lon}#map=17/${location.lat}/${location.lon}`,
+                google: `https://www.google.com/maps/search/?api=1&query=${point}`,
+                apple: `http://maps.apple.com/?ll=${point}&q=${urlize(location.name || '')}`
+            };
+        }
+        const encodedAddress = urlize(location.address);
+        return {
+            osm: `https://www.openstreetmap.org/search?query=${encodedAddress}`,
+            google: `https://www.google.com/maps/search/?api=1&query=${encodedAddress}`,
+            apple: `http://maps.apple.com/?q=${encodedAddress}`
+        };
+    }
+
+    function pictureHtml(event, sizes, className) {
+        const classAttr = className ? ` class="${className}"` : '';
+        const variants = event.imageVariants;
+        if (!variants || !variants.jpeg || !variants.jpeg.length) {
+            // Asset images were resized by the home template when it published the shard
+            const lightbox = event.imageLightbox ? ` data-lightbox-src="${escapeHtml(event.imageLightbox)}"` : '';
+            const size = event.imageWidth ? ` width="${event.imageWidth}" height="${event.imageHeight}"` : '';
+            return `<img src="${escapeHtml(event.image)}"${lightbox}${size} alt="${escapeHtml(event.title)}"${classAttr} loading="lazy">`;
+        }
+        const srcset = list => list.map(v => `${escapeHtml(v.src)} ${v.width}w`).join(', ');
+        const jpeg = variants.jpeg;
+        const largest = (variants.webp && variants.webp.length ? variants.webp : jpeg).slice(-1)[0];
+        const sources = ['avif', 'webp'].filter(format => variants[format])
+            .map(format => `<source type="image/${format}" srcset="${srcset(variants[format])}" sizes="${sizes}">`).join('');
+        return `<picture>${sources}<img src="${escapeHtml(jpeg[0].src)}" srcset="${srcset(jpeg)}" sizes="${sizes}" ` +
+            `data-lightbox-src="${escapeHtml(largest.src)}" width="${jpeg[0].width}" height="${jpeg[0].height}" ` +
+            `alt="${escapeHtml(event.title)}"${classAttr} loading="lazy"></picture>`;
+    }
+
+    function locationHtml(location, mobile) {
+        if (!location || !location.name) {
+            return '';
+        }
+        const suffix = mobile ? '-mobile' : '';
+        const hasAddress = location.address && location.address.toLowerCase() !== 'virtual';
+        let lines = '';
+        if (hasAddress) {
+            const parts = location.address.split(',');
+            lines = `<div class="address-line">${escapeHtml(parts[0])}</div>` +
+                `<div class="address-line">${escapeHtml(parts.slice(1, 3).join(', '))}</div>`;
+        }
+        let links = '';
+        if (hasAddress) {
+            const maps = mapUrls(location);
+            const anchors = ['osm', 'google', 'apple'].map(name =>
+                `<a href="${escapeHtml(maps[name])}" target="_blank" rel="noopener noreferrer">${name === 'osm' ? 'OSM' : name[0].toUpperCase() + name.slice(1)}</a>`
+            ).join('');
+            links = `<div class="map-links-container${suffix}"><span class="map-links-label">Map Links:</span>` +
+                `<div class="${mobile ? 'map-links-mobile' : 'map-links-list'}">${anchors}</div></div>`;
+        }
+        const name = mobile
+            ? `<div class="location-name mb-0">${escapeHtml(location.name)}</div>`
+            : `<p class="location-name mb-0">${escapeHtml(location.name)}</p>`;
+        const details = `<div class="location-and-address${suffix}"><strong class="location-label">Location:</strong>` +
+            `<div class="location-name-and-address-lines${suffix}">${name}${lines}</div></div>`;
+        return mobile
+            ? `<div class="location-block-mobile mb-1"><div class="location-info-mobile">${details}</div>${links}</div>`
+            : `<div class="location-block">${details}${links}</div>`;
+    }
+
+    function organizersHtml(organizers) {
+        const emailIcon = emailIconTemplate ? emailIconTemplate.innerHTML : '';
+        return (organizers || []).filter(o => o && o.name).map(o => {
+            const name = escapeHtml(o.name);
+            const label = o.website
+                ? `<a href="${escapeHtml(o.website)}" target="_blank" rel="noopener noreferrer" title="Visit ${name}'s Website">${name}</a>`
+                : name;
+            const email = o.email
+                ? ` <a href="mailto:${escapeHtml(o.email)}" title="Email ${name}" class="text-decoration-none">${emailIcon}</a>`
+                : '';
+            return `<p class="mb-1"><strong>Organizer:</strong> ${label}${email}</p>`;
+        }).join('');
+    }
+
+    function desktopEventHtml(event, alt, month) {
+        return `<div class="event-list-item${alt ? ' event-list-item--alt' : ''}" data-month="${month}" data-event-types="${escapeHtml(event.types)}" data-end-datetime="${escapeHtml(event.end)}">` +
+            `<div class="event-date-column"><div class="event-day-of-week">${escapeHtml(event.weekday)}</div>` +
+            `<div class="event-date-large"><span class="month">${escapeHtml(event.month)}</span><span class="day">${escapeHtml(event.day)}</span></div>` +
+            `<div class="event-time">${escapeHtml(event.time)}</div></div>` +
+            `<div class="event-info"><h3 class="event-title">${escapeHtml(event.title)}</h3>` +
+            `<div class="event-content-wrapper">${locationHtml(event.location, false)}${organizersHtml(event.organizers)}` +
+            `<div class="event-description-wrapper"><p class="event-description">${event.description}</p></div></div>` +
+            `<div class="expand-indicator"></div></div>` +
+            `<div class="event-image-right">${pictureHtml(event, '200px', 'event-photo')}</div></div>`;
+    }
+
+    function mobileEventHtml(event, alt, month) {
+        return `<div class="col-md-6 event-card-wrapper" data-month="${month}" data-event-types="${escapeHtml(event.types)}" data-end-datetime="${escapeHtml(event.end)}">` +
+            `<div class="card event-card${alt ? ' event-card--alt' : ''}"><div class="event-banner">` +
+            `<h3 class="event-banner-title">${escapeHtml(event.title)}</h3>` +
+            `<div class="event-banner-date"><span class="event-banner-dayofweek">${escapeHtml(event.weekday)}</span>` +
+            `<span class="event-banner-monthday">${escapeHtml(event.month)} ${escapeHtml(event.day)}</span></div>` +
+            `<div class="event-banner-time"><span class="event-banner-datetime">${escapeHtml(event.timeShort)}</span></div></div>` +
+            `<div class="event-image">${pictureHtml(event, '100vw', '')}</div>` +
+            `<div class="card-body event-details"><div class="event-content-wrapper-mobile">` +
+            `${locationHtml(event.location, true)}${organizersHtml(event.organizers)}` +
+            `<div class="event-description-wrapper-mobile"><p class="event-description">${event.description}</p></div></div>` +
+            `<div class="expand-indicator-mobile"></div></div></div></div>`;
+    }
+
+    function nextMonth() {
+        if (!shardIndex) {
+            return null;
+        }
+        return shardIndex.months.find(m => m.month > firstMonth && !loadedMonths.has(m.month) &&
+            (currentFilter === 'all' || (m.types && m.types[currentFilter]))) || null;
+    }
+
+    // Months skipped by a filter can be loaded later, so keep each list in month order
+    function insertInOrder(list, month, html) {
+        const later = [...list.children].find(el => el.dataset.month && el.dataset.month > month);
+        if (later) {
+            later.insertAdjacentHTML('beforebegin', html);
+        } else {
+            list.insertAdjacentHTML('beforeend', html);
+        }
+    }
+
+    async function loadNextShard() {
+        if (shardLoading || !sentinel) {
+            return;
+        }
+        shardLoading = true;
+        try {
+            if (!shardIndex) {
+                const response = await fetch(sentinel.dataset.shardIndex);
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                shardIndex = await response.json();
+            }
+            const month = nextMonth();
+            if (!month) {
+                return;
+            }
+            const response = await fetch(month.url);
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            const shard = await response.json();
+            const now = Date.now() / 1000;
+            let desktopHtml = '';
+            let mobileHtml = '';
+            shard.events.filter(event => !event.endUnix || event.endUnix > now).forEach(event => {
+                const alt = renderedCount % 2 === 1;
+                desktopHtml += desktopEventHtml(event, alt, month.month);
+                mobileHtml += mobileEventHtml(event, alt, month.month);
+                renderedCount += 1;
+            });
+            loadedMonths.add(month.month);
+            insertInOrder(document.getElementById('desktop-events-list'), month.month, desktopHtml);
+            insertInOrder(document.getElementById('mobile-events-list'), month.month, mobileHtml);
+            filterAndRenderEvents(currentFilter);
+        } catch (e) {
+            console.error('Could not load more events:', e);
+            if (observer) {
+                observer.disconnect(); // Do not retry on every scroll
+            }
+            shardIndex = { months: [] };
+        } finally {
+            shardLoading = false;
+        }
+        loadMoreIfVisible();
+    }
+
+    function loadMoreIfVisible() {
+        if (sentinel && !shardLoading && sentinel.getBoundingClientRect().top < window.innerHeight + 400) {
+            loadNextShard();
+        }
+    }
+
+    const observer = sentinel && 'IntersectionObserver' in window
+        ? new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNextShard();
+            }
+        }, { rootMargin: '400px 0px' })
+        : null;
+    if (observer) {
+        observer.observe(sentinel);
+    } else if (sentinel) {
+        window.addEventListener('scroll', loadMoreIfVisible, { passive: true });
+        loadMoreIfVisible();
+    }
+
     // Re-check and re-initialize after filtering or resizing,
     // as visibility and overflow can change.
     function reCheckAndInitialize() {